@@ -12,11 +12,20 @@ from openai import OpenAI
 import os
 from dotenv import load_dotenv
 
+from article_store import ArticleStore
+from url_canonical import UrlAliasMap
+
 class ActionableInsightsAnalyzer:
-    def __init__(self, openai_api_key: Optional[str] = None):
+    def __init__(self, openai_api_key: Optional[str] = None, article_store: Optional[ArticleStore] = None,
+                 url_aliases: Optional[UrlAliasMap] = None):
         """Initialize actionable insights analyzer"""
         load_dotenv()
         
+        # Locally stored article text, used when a story has no usable summary (e.g. backfills); it is
+        # keyed by canonical URL, so story links are resolved through the alias map first
+        self.article_store = article_store or ArticleStore()
+        self.url_aliases = url_aliases or UrlAliasMap()
+        
         api_key = openai_api_key or os.getenv('OPENAI_API_KEY')
         if not api_key:
             raise ValueError("OpenAI API key required for insights analysis")
@@ -56,6 +65,12 @@ class ActionableInsightsAnalyzer:
         article_summary = story_data.get('article_summary', '')
         comments_analysis = story_data.get('comments_analysis', {})
         
+        # Fall back to an excerpt of the stored article text before giving up on a story
+        if not article_summary or article_summary in ["No article summary available", "Article content too short to summarize effectively."]:
+            stored_text = self.article_store.get_text(self.url_aliases.resolve(url)) if url else None
+            if stored_text and len(stored_text) >= 200:
+                article_summary = stored_text[:3000]
+        
         # Skip analysis for stories without substantial content
         if not article_summary or article_summary in ["No article summary available", "Article content too short to summarize effectively."]:
             return {"has_insights": False, "reason": "Insufficient content for analysis"}
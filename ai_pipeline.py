@@ -5,17 +5,39 @@ Uses local embeddings for initial filtering, OpenAI only for final analysis
 """
 
 import os
+import copy
 import json
 import hashlib
-import pickle
+import time
+import queue
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
 import numpy as np
-from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
-from openai import OpenAI
 from dotenv import load_dotenv
 
+from fetch_state import FetchStateStore
+from article_fetcher import AsyncArticleFetcher
+from content_extractor import extract_with_selectors
+from domain_strategies import DomainStrategyCache
+from article_store import ArticleStore
+from url_canonical import UrlAliasMap, extract_rel_canonical
+from summary_cache import SummaryCache, CachePolicy
+from shared_cache import SharedAICache
+from interest_embeddings import InterestEmbeddingCache
+from relevance_engine import RelevanceEngine, RelevanceTable
+from embedding_quantisation import DEFAULT_EMBEDDING_PRECISION, encode_vector, decode_vector
+from embedding_backends import load_encoder, load_sample_story_texts
+from ai_resources import get_database, get_embedding_model, get_openai_client
+from content_sniffer import (classify_url, arxiv_abs_url, extract_pdf_text, fetch_video_metadata, describe_media,
+                             is_metadata_only)
+
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+# Bump when _story_text changes, so vectors stored in the story_embeddings table are re-encoded
+STORY_EMBEDDING_VERSION = '1'
+
 class CostOptimisedAI:
     def __init__(self, openai_api_key: Optional[str] = None, cache_dir: str = ".ai_cache"):
         """Initialize the cost-optimised AI pipeline"""
@@ -26,41 +48,97 @@ class CostOptimisedAI:
         if not api_key:
             raise ValueError("OpenAI API key is required")
         
-        self.openai_client = OpenAI(api_key=api_key)
+        # Client and model are shared by every pipeline in the process (see ai_resources)
+        self.openai_client = get_openai_client(api_key)
         
-        # Initialize local embedding model (lightweight and fast)
+        # Initialize local embedding model (lightweight and fast); EMBEDDING_BACKEND=onnx runs it
+        # with ONNX Runtime instead of PyTorch
         print("🔄 Loading local embedding model...")
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')  # 22MB model, very fast
-        print("✅ Local embedding model loaded")
+        self.embedding_model = get_embedding_model(EMBEDDING_MODEL_NAME)  # 22MB model, very fast
+        print(f"✅ Local embedding model loaded ({self.embedding_model.backend} backend)")
         
-        # Set up caching
+        # Set up caching (relative to this module, so the dashboard, which runs from dashboard/,
+        # and the scraper share one cache directory)
+        if not os.path.isabs(cache_dir):
+            cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), cache_dir)
         self.cache_dir = cache_dir
         os.makedirs(cache_dir, exist_ok=True)
         
+        # Recently encoded story vectors, keyed by the encoded text, so each story is encoded once (in
+        # batches) however many users it is matched against; LRU-bounded because the pipeline is shared
+        # by every request of a long-running process (see ai_resources)
+        self.story_embeddings = OrderedDict()
+        self.story_embedding_cache_size = int(os.getenv('STORY_EMBEDDING_CACHE_SIZE', '20000'))
+        # Untuned default (sentence-transformers' own); benchmark_story_encoding measures it per host
+        self.story_encode_batch_size = int(os.getenv('STORY_ENCODE_BATCH_SIZE', '32'))
+        # Guards the story vector map and the counters below, which request threads update concurrently
+        self._lock = threading.Lock()
+        self.stories_encoded = 0
+        self.story_embedding_reuses = 0
+        
+        # Scores all stories against all users' interests in one matrix operation; stored story vectors
+        # and the stacked keyword matrix use EMBEDDING_PRECISION (float32, float16 or int8)
+        self.embedding_precision = DEFAULT_EMBEDDING_PRECISION
+        self.relevance_engine = RelevanceEngine(precision=self.embedding_precision)
+        
+        # Keyword embeddings per user interest set, re-encoded only after an interest edit
+        self.interest_embedding_cache = InterestEmbeddingCache(
+            os.path.join(cache_dir, "interest_embeddings.db"), model_name=EMBEDDING_MODEL_NAME
+        )
+        
         # Load user interests from database (fallback to defaults if database not available)
         self.user_interests = self._load_interests_from_database()
         
         # Pre-compute interest embeddings for fast comparison
         self._compute_interest_embeddings()
         
-        # Load cached article summaries
+        # Alias -> canonical URL map (rel=canonical targets, redirects) behind every URL cache key
+        self.url_aliases = UrlAliasMap(os.path.join(cache_dir, "url_aliases.json"))
+        self.resolve_url_aliases = os.getenv('URL_CANONICAL_RESOLVE', 'false').lower() == 'true'
+        
+        # 'local' (SQLite files in cache_dir) or 'database' (shared ai_cache table in DATABASE_URL,
+        # one warm cache for every process and replica)
+        self.cache_backend = os.getenv('AI_CACHE_BACKEND', 'local').lower()
+        self.cache_db = self._connect_cache_database() if self.cache_backend == 'database' else None
+        
+        # Load cached article summaries, comment analyses and relevance refinements
         self.article_cache = self._load_article_cache()
+        self.comment_cache = self._open_ai_cache("comment_analysis", "comment_analyses.db")
+        # Share of comment fingerprints that must match for a thread's cached analysis to be reused
+        self.comment_similarity_threshold = float(os.getenv('COMMENT_CACHE_SIMILARITY', '0.6'))
+        self.comment_cache_rejects = 0
+        self.relevance_cache = self._open_ai_cache("relevance_refinement", "relevance_refinements.db")
+        
+        # ETag/Last-Modified/body hash per URL, so expired summaries of unchanged articles are kept
+        self.fetch_state = FetchStateStore(os.path.join(cache_dir, "fetch_state.db"))
+        
+        # Pooled async article downloads with a per-page byte budget
+        self.article_fetcher = AsyncArticleFetcher(fetch_state=self.fetch_state)
+        
+        # 'density' (single-pass text/link density scoring) or 'selectors' (legacy CSS selector loop)
+        self.content_extractor = os.getenv('CONTENT_EXTRACTOR', 'density').lower()
+        
+        # Extracted article text, kept so later stages and backfills do not re-fetch pages
+        self.article_store = ArticleStore(os.path.join(cache_dir, "articles"))
+        
+        # Which extraction strategy worked per domain, so repeat sites skip straight to it
+        self.domain_strategies = DomainStrategyCache(os.path.join(cache_dir, "domain_strategies.json"))
         
         # Cost tracking
         self.api_calls_saved = 0
+        self.fresh_summary_urls = set()  # Articles summarised by OpenAI (not from cache) in this run
         self.api_calls_made = 0
     
+    def _count(self, counter: str, amount: int = 1):
+        """Add to a cost metric (request threads of a shared pipeline update them concurrently)"""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+    
     def _load_interests_from_database(self) -> Dict:
         """Load user interests from database, fallback to defaults if not available"""
         try:
-            # Import here to avoid circular imports
-            import sys
-            import os
-            sys.path.append(os.path.join(os.path.dirname(__file__), 'dashboard'))
-            from database import DatabaseManager
-            
             # Try to load from database
-            db = DatabaseManager()
+            db = get_database()
             interest_weights = db.get_interest_weights()
             
             if not interest_weights:
@@ -83,7 +161,8 @@ class CostOptimisedAI:
             print("   Using default interests")
             return self._get_default_interests()
     
-    def _get_default_interests(self) -> Dict:
+    @staticmethod
+    def _get_default_interests() -> Dict:
         """Get default interests as fallback"""
         return {
             "high_priority": [
@@ -104,17 +183,13 @@ class CostOptimisedAI:
         """Pre-compute embeddings for user interests"""
         print("🔄 Computing interest embeddings...")
         
-        self.interest_embeddings = {}
         # Single weight for all interests - no priority system
         self.single_weight = 1.0
         
-        for category, keywords in self.user_interests.items():
-            embeddings = self.embedding_model.encode(keywords)
-            self.interest_embeddings[category] = {
-                'embeddings': embeddings,
-                'keywords': keywords,
-                'weight': self.single_weight  # Always 1.0
-            }
+        # Keywords already in the shared vocabulary are not re-encoded
+        self.interest_embeddings = self.interest_embedding_cache.get_or_compute(
+            "global", self.user_interests, self.embedding_model.encode
+        )
         
         print("✅ Interest embeddings computed")
     
@@ -125,47 +200,168 @@ class CostOptimisedAI:
         self._compute_interest_embeddings()
         print("✅ Interests refreshed successfully")
     
-    def _load_article_cache(self) -> Dict:
-        """Load cached article summaries"""
-        cache_file = os.path.join(self.cache_dir, "article_summaries.pkl")
-        if os.path.exists(cache_file):
-            try:
-                with open(cache_file, 'rb') as f:
-                    cache = pickle.load(f)
-                print(f"✅ Loaded {len(cache)} cached article summaries")
-                return cache
-            except Exception as e:
-                print(f"⚠️ Error loading article cache: {e}")
-        return {}
-    
-    def _save_article_cache(self):
-        """Save article summaries to cache"""
-        cache_file = os.path.join(self.cache_dir, "article_summaries.pkl")
+    def _connect_cache_database(self):
+        """DatabaseManager for the shared AI cache, None (local caches) if the database is unavailable"""
         try:
-            with open(cache_file, 'wb') as f:
-                pickle.dump(self.article_cache, f)
+            db = get_database()
+            print(f"✅ Using shared AI cache in the {db.db_type} database")
+            return db
         except Exception as e:
-            print(f"⚠️ Error saving article cache: {e}")
+            print(f"⚠️ Shared AI cache unavailable, using local caches: {e}")
+            self.cache_backend = 'local'
+            return None
+    
+    def _open_ai_cache(self, namespace: str, filename: str, policy: Optional[CachePolicy] = None):
+        """A cache of AI results: the shared database table when configured, else a local SQLite file"""
+        policy = policy or CachePolicy.from_env("ARTICLE_CACHE")
+        if self.cache_db is not None:
+            return SharedAICache(self.cache_db, namespace, policy=policy)
+        return SummaryCache(os.path.join(self.cache_dir, filename), policy=policy)
+    
+    def _load_article_cache(self):
+        """Open the article summary cache (entries are read on demand, not loaded up front)"""
+        if self.cache_db is not None:
+            return SharedAICache(self.cache_db, "article_summary", policy=CachePolicy.from_env("ARTICLE_CACHE"))
+        cache = SummaryCache(
+            os.path.join(self.cache_dir, "article_summaries.db"),
+            legacy_pickle=os.path.join(self.cache_dir, "article_summaries.pkl"),
+            key_func=self._url_cache_key,
+            policy=CachePolicy.from_env("ARTICLE_CACHE")
+        )
+        print(f"✅ Opened article summary cache ({len(cache)} cached summaries)")
+        return cache
+    
+    def _url_cache_key(self, url: str) -> str:
+        """Cache key for a URL: hash of its canonical form, so tracking/scheme/slash variants share an entry"""
+        return self._get_content_hash(self.url_aliases.resolve(url))
+    
+    def _record_url_aliases(self, url: str, page: Dict):
+        """Map the requested URL onto where redirects and rel=canonical say the article really lives"""
+        if not self.resolve_url_aliases:
+            return
+        previous_key = self._url_cache_key(url)
+        final_url = page.get('final_url')
+        if final_url and self.url_aliases.record(url, final_url):
+            print(f"🔗 Redirect alias: {url[:50]} -> {final_url[:50]}")
+        if page.get('kind') == 'html' and page.get('text'):
+            canonical_url = extract_rel_canonical(page['text'], final_url or url)
+            if canonical_url and self.url_aliases.record(url, canonical_url):
+                print(f"🔗 Canonical alias: {url[:50]} -> {canonical_url[:50]}")
+        
+        # Carry a summary cached under the alias over to the canonical key
+        new_key = self._url_cache_key(url)
+        if new_key != previous_key and previous_key in self.article_cache and new_key not in self.article_cache:
+            self.article_cache[new_key] = self.article_cache.pop(previous_key)
     
     def _get_content_hash(self, content: str) -> str:
         """Generate hash for content to enable caching"""
         return hashlib.md5(content.encode()).hexdigest()[:12]
     
-    def is_relevant_story_local(self, story_data: Dict, user_interests: Optional[Dict] = None) -> Tuple[bool, float, str]:
+    @staticmethod
+    def _story_text(story_data: Dict) -> str:
+        """Text a story is matched on: its title plus the URL's domain"""
+        title = story_data.get('title', '')
+        url = story_data.get('url', '')
+        domain = url.split('//')[1].split('/')[0] if '//' in url else ''
+        return f"{title} {domain}"
+    
+    def encode_stories(self, stories: List[Dict]) -> np.ndarray:
+        """
+        Embeddings of the stories, one row each
+        Stories not yet encoded this run go through a single batched encode call
+        """
+        texts = [self._story_text(story) for story in stories]
+        vectors = {}
+        with self._lock:
+            for text in dict.fromkeys(texts):
+                if text in self.story_embeddings:
+                    self.story_embeddings.move_to_end(text)
+                    vectors[text] = self.story_embeddings[text]
+            missing = [text for text in dict.fromkeys(texts) if text not in vectors]
+            self.story_embedding_reuses += len(texts) - len(missing)
+        
+        if missing:
+            # Encoded outside the lock, so other requests are not held up by the model
+            start = time.time()
+            encoded = self.embedding_model.encode(missing, batch_size=self.story_encode_batch_size,
+                                                  convert_to_numpy=True)
+            vectors.update(zip(missing, encoded))
+            with self._lock:
+                self.story_embeddings.update(zip(missing, encoded))
+                while len(self.story_embeddings) > self.story_embedding_cache_size:
+                    self.story_embeddings.popitem(last=False)
+                self.stories_encoded += len(missing)
+            if len(missing) > 1:
+                print(f"🧮 Encoded {len(missing)} stories in {time.time() - start:.2f}s "
+                      f"(batch size {self.story_encode_batch_size})")
+        
+        if not texts:
+            return np.zeros((0, self.embedding_model.get_sentence_embedding_dimension()), dtype=np.float32)
+        return np.stack([vectors[text] for text in texts])
+    
+    def store_story_embeddings(self, db, stories: List[Dict]) -> int:
+        """
+        Persist the vectors of stories already in the database (rows with their 'id') into story_embeddings,
+        so history-wide relevance never encodes them again; returns how many were written
+        """
+        stories = [story for story in stories if story.get('id') is not None]
+        if not stories:
+            return 0
+        embeddings = self.encode_stories(stories)
+        db.store_story_embeddings(
+            [(story['id'], encode_vector(vector, self.embedding_precision), len(vector))
+             for story, vector in zip(stories, embeddings)],
+            EMBEDDING_MODEL_NAME, STORY_EMBEDDING_VERSION, encoding=self.embedding_precision
+        )
+        return len(stories)
+    
+    def load_story_embeddings(self, db, stories: List[Dict]) -> np.ndarray:
+        """
+        Embeddings of database stories (rows with their 'id'), read in bulk from story_embeddings
+        Stories stored before ingest-time encoding (or under another model/version) are encoded in one batch
+        and written back
+        """
+        stored = db.get_story_embeddings([story['id'] for story in stories], EMBEDDING_MODEL_NAME, STORY_EMBEDDING_VERSION)
+        missing = [story for story in stories if story['id'] not in stored]
+        if missing:
+            print(f"🧮 Backfilling embeddings for {len(missing)} of {len(stories)} stories")
+            self.store_story_embeddings(db, missing)
+            stored.update(db.get_story_embeddings([story['id'] for story in missing],
+                                                  EMBEDDING_MODEL_NAME, STORY_EMBEDDING_VERSION))
+        
+        if not stories:
+            return np.zeros((0, self.embedding_model.get_sentence_embedding_dimension()), dtype=np.float32)
+        return np.stack([decode_vector(*stored[story['id']]) for story in stories])
+    
+    def score_relevance_for_users(self, stories: List[Dict], users_interests: List[Tuple[str, object]],
+                                  story_embeddings: Optional[np.ndarray] = None) -> RelevanceTable:
+        """
+        Local relevance of every story for every user at once (same scores and reasoning as
+        is_relevant_story_local); users_interests holds (user_id, interests), empty interests use the defaults
+        Pass story_embeddings (e.g. from load_story_embeddings) to skip encoding the stories
+        """
+        users = [
+            (user_id, self._compute_user_interest_embeddings(interests, user_id) if interests else self.interest_embeddings)
+            for user_id, interests in users_interests
+        ]
+        if story_embeddings is None:
+            story_embeddings = self.encode_stories(stories)
+        table = self.relevance_engine.score(story_embeddings, users)
+        
+        # Every story the local filter rejects is an OpenAI call saved, as in is_relevant_story_local
+        self._count('api_calls_saved', int((~table.relevant).sum()))
+        print(f"🧮 Scored {len(stories)} stories for {len(users)} users: {int(table.relevant.sum())} relevant pairs")
+        return table
+    
+    def is_relevant_story_local(self, story_data: Dict, user_interests: Optional[Dict] = None,
+                                user_id: Optional[str] = None) -> Tuple[bool, float, str]:
         """
         Fast local relevance filtering using embeddings
         Now supports user-specific interests for multi-user filtering
         Returns (is_relevant, confidence_score, reasoning)
         """
-        title = story_data.get('title', '')
-        url = story_data.get('url', '')
-        
-        # Combine title and URL domain for analysis
-        domain = url.split('//')[1].split('/')[0] if '//' in url else ''
-        text_to_analyze = f"{title} {domain}"
-        
-        # Get embedding for the story
-        story_embedding = self.embedding_model.encode([text_to_analyze])
+        # Get embedding for the story (already encoded if the run batch-encoded its stories)
+        story_embedding = self.encode_stories([story_data])
         
         max_similarity = 0.0
         best_match = ""
@@ -176,8 +372,8 @@ class CostOptimisedAI:
         if user_interests:
             # Recompute embeddings for user-specific interests
             print(f"🔍 Using user-specific interests: {user_interests}")
-            interests_to_use = self._compute_user_interest_embeddings(user_interests)
-            print(f"✅ Computed embeddings for {len(interests_to_use)} categories")
+            interests_to_use = self._compute_user_interest_embeddings(user_interests, user_id)
+            print(f"✅ Loaded embeddings for {len(interests_to_use)} categories")
         else:
             print(f"⚠️ Using default interests (no user interests provided)")
         
@@ -208,7 +404,7 @@ class CostOptimisedAI:
             print(f"✅ Local filter: RELEVANT - {reasoning}")
         else:
             print(f"❌ Local filter: NOT RELEVANT - {reasoning}")
-            self.api_calls_saved += 1  # Saved an OpenAI call
+            self._count('api_calls_saved')  # Saved an OpenAI call
         
         return is_relevant, max_similarity, reasoning
     
@@ -231,6 +427,13 @@ class CostOptimisedAI:
             else:
                 interest_desc = "AI/ML, tech startups, software development, mathematics, behavioral economics"
             
+            # Same story, same interests: reuse the earlier verdict
+            cache_key = self._get_content_hash(f"{title}|{url}|{interest_desc}")
+            cached_entry = self.relevance_cache.get(cache_key)
+            if cached_entry:
+                self._count('api_calls_saved')
+                return cached_entry['is_relevant']
+            
             prompt = f"""
             Quick relevance check for someone interested in: {interest_desc}.
             
@@ -253,9 +456,16 @@ class CostOptimisedAI:
             result = response.choices[0].message.content.strip().upper()
             is_relevant = result == "YES"
             
-            self.api_calls_made += 1
+            self._count('api_calls_made')
             print(f"🤖 AI refinement: {'RELEVANT' if is_relevant else 'NOT RELEVANT'} (local score: {local_score:.3f})")
             
+            if result in ("YES", "NO"):
+                self.relevance_cache[cache_key] = {
+                    'url': url,
+                    'is_relevant': is_relevant,
+                    'cached_at': datetime.now().isoformat()
+                }
+            
             return is_relevant
             
         except Exception as e:
@@ -267,60 +477,182 @@ class CostOptimisedAI:
         """
         Get article summary with intelligent caching
         """
-        # Generate cache key from URL
-        url_hash = self._get_content_hash(url)
-        
         # Check cache first (unless forced refresh)
-        if not force_refresh and url_hash in self.article_cache:
-            cached_entry = self.article_cache[url_hash]
+        if not force_refresh:
+            cached_summary = self._get_fresh_cached_summary(url)
+            if cached_summary is not None:
+                return cached_summary
+        
+        # Videos, podcasts, binaries (and non-arXiv PDFs without pypdf) are recognised from the URL and never downloaded
+        url_kind = classify_url(url)
+        if is_metadata_only(url_kind) and not arxiv_abs_url(url):
+            return self._summarise_without_fetch(url, url_kind)
+        
+        try:
+            page = self.article_fetcher.fetch_one(self._fetch_url_for(url), conditional=not force_refresh)
+        except Exception as e:
+            print(f"❌ Error getting article summary for {url}: {e}")
+            return None
+        return self._summarise_fetched_page(url, page)
+    
+    def get_article_summaries_batch(self, urls: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Summaries for every article of a run
+        Uncached articles are downloaded concurrently on a background thread and each one is
+        summarised as soon as its page arrives, instead of after a serial crawl
+        """
+        summaries = {}
+        to_fetch = []
+        for url in dict.fromkeys(urls):
+            cached_summary = self._get_fresh_cached_summary(url)
+            url_kind = classify_url(url)
+            if cached_summary is not None:
+                summaries[url] = cached_summary
+            elif is_metadata_only(url_kind) and not arxiv_abs_url(url):
+                summaries[url] = self._summarise_without_fetch(url, url_kind)
+            else:
+                to_fetch.append(url)
+        
+        if not to_fetch:
+            return summaries
+        
+        print(f"🌐 Fetching {len(to_fetch)} articles concurrently...")
+        start = time.time()
+        pages = queue.Queue()
+        # arXiv PDFs are fetched as their abstract page, map results back to every story URL that
+        # shares it (e.g. arxiv.org/pdf/X and arxiv.org/abs/X)
+        source_urls = {}
+        for url in to_fetch:
+            source_urls.setdefault(self._fetch_url_for(url), []).append(url)
+        fetch_thread = self.article_fetcher.fetch_in_background(list(source_urls), pages.put)
+        
+        remaining = len(source_urls)
+        while remaining:
+            try:
+                page = pages.get(timeout=1)
+            except queue.Empty:
+                if not fetch_thread.is_alive():
+                    break
+                continue
+            remaining -= 1
+            url, *other_urls = source_urls[page['url']]
+            summary = self._summarise_fetched_page(url, page)
+            summaries[url] = summary
+            for other_url in other_urls:
+                summaries[other_url] = summary
+                if summary is not None:
+                    self.article_cache[self._url_cache_key(other_url)] = {
+                        'url': other_url,
+                        'summary': summary,
+                        'cached_at': datetime.now().isoformat()
+                    }
+        
+        fetch_thread.join()
+        self.domain_strategies.flush()
+        print(f"✅ Summarised {len(to_fetch)} articles in {time.time() - start:.1f}s "
+              f"(fetcher: {self.article_fetcher.metrics()})")
+        return summaries
+    
+    def _fetch_url_for(self, url: str) -> str:
+        """The URL to download for a story link (the abstract page for arXiv PDFs)"""
+        if classify_url(url) == 'pdf':
+            return arxiv_abs_url(url) or url
+        return url
+    
+    def _summarise_without_fetch(self, url: str, kind: str) -> Optional[str]:
+        """Metadata-only handling for media links (and PDFs pypdf cannot read); binaries are skipped outright"""
+        if kind == 'binary':
+            print(f"⏭️ Skipping binary download: {url[:50]}...")
+            return None
+        
+        metadata = fetch_video_metadata(url) if kind == 'video' else {}
+        summary = describe_media(kind, metadata)
+        self._count('api_calls_saved')
+        
+        self.article_cache[self._url_cache_key(url)] = {
+            'url': url,
+            'summary': summary,
+            'cached_at': datetime.now().isoformat()
+        }
+        print(f"🎬 {kind.title()} link, metadata-only summary: {summary[:100]}")
+        return summary
+    
+    def get_article_text(self, url: str) -> Optional[str]:
+        """Extracted text of a previously fetched article, read from the local store"""
+        return self.article_store.get_text(self.url_aliases.resolve(url))
+    
+    def _get_fresh_cached_summary(self, url: str) -> Optional[str]:
+        """Cached summary for a URL if it is less than 7 days old"""
+        url_hash = self._url_cache_key(url)
+        cached_entry = self.article_cache.get(url_hash)
+        if cached_entry:
             cache_date = datetime.fromisoformat(cached_entry['cached_at'])
             
             # Use cache if less than 7 days old
             if datetime.now() - cache_date < timedelta(days=7):
                 print(f"📋 Using cached summary for {url[:50]}...")
-                self.api_calls_saved += 1
+                self._count('api_calls_saved')
                 return cached_entry['summary']
+        return None
+    
+    def _extract_article_content(self, html: str, url: str) -> str:
+        """Pull the readable text out of an article page"""
+        if self.content_extractor == 'selectors':
+            return extract_with_selectors(html)
+        return self.domain_strategies.extract(url, html)
+    
+    def _summarise_fetched_page(self, url: str, page: Dict) -> Optional[str]:
+        """Summarise a page returned by the article fetcher and cache the result"""
+        self._record_url_aliases(url, page)
+        
+        # Generate cache key from the canonical URL
+        url_hash = self._url_cache_key(url)
         
-        # Get fresh summary using existing logic from scraper
         try:
-            import requests
-            from bs4 import BeautifulSoup
+            if page.get('error'):
+                raise RuntimeError(page['error'])
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-            }
-            response = requests.get(url, headers=headers, timeout=15)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
-            
-            # Try to find main content
-            content = ""
-            content_selectors = [
-                'article', '[role="main"]', 'main', '.content', '.post-content', 
-                '.article-content', '.entry-content', '.post-body',
-                '.story', '.article', '.text', '.body', '.main-content',
-                '#content', '#main', '#article', '#story', '#post',
-                '.container .text', '.wrapper .content', '.page-content'
-            ]
+            cached_entry = self.article_cache.get(url_hash) if not page.get('changed', True) else None
+            if cached_entry:
+                # Article is unchanged since it was summarised, extend the cached summary's life
+                print(f"♻️ Article unchanged, reusing summary for {url[:50]}...")
+                cached_entry['cached_at'] = datetime.now().isoformat()
+                self.article_cache[url_hash] = cached_entry
+                self._count('api_calls_saved')
+                return cached_entry['summary']
             
-            content_found = False
-            for selector in content_selectors:
-                elements = soup.select(selector)
-                if elements:
-                    content = " ".join([elem.get_text() for elem in elements])
-                    content_found = True
-                    break
+            # The response's Content-Type decides the handler when the URL gave no hint
+            kind = page.get('kind') or 'html'
+            if is_metadata_only(kind):
+                return self._summarise_without_fetch(url, kind)
             
-            if not content_found:
-                paragraphs = soup.find_all('p')
-                content = " ".join([p.get_text() for p in paragraphs])
+            stored_text = None
+            if page.get('text') is None and page.get('pdf_bytes') is None:
+                # 304 for an article we hold no summary for: use the stored text, else download it in full
+                stored_text = self.article_store.get_text(self.url_aliases.resolve(url))
+                if stored_text is None:
+                    page = self.article_fetcher.fetch_one(page['url'], conditional=False)
+                    if page.get('error'):
+                        raise RuntimeError(page['error'])
             
-            content = ' '.join(content.split())
+            if stored_text is not None:
+                content = stored_text
+            elif kind == 'pdf':
+                # Only the first pages are read (the download itself is capped at PDF_MAX_BYTES)
+                content = extract_pdf_text(page.get('pdf_bytes'))
+                print(f"📑 PDF: extracted {len(content)} characters from the first pages")
+            else:
+                content = self._extract_article_content(page['text'], page['url'])
+            
+            if stored_text is None and len(content) >= 20:
+                self.article_store.put(self.url_aliases.resolve(url), content, {
+                    "fetched_url": page['url'],
+                    "kind": kind,
+                    "content_type": page.get('content_type'),
+                    "status": page.get('status'),
+                    "truncated": page.get('truncated', False),
+                    "fetched_at": datetime.now().isoformat()
+                })
             
             # Only fall back to content-type descriptions for truly minimal content
             if len(content) < 20:
@@ -370,7 +702,8 @@ class CostOptimisedAI:
             )
             
             summary = response.choices[0].message.content.strip()
-            self.api_calls_made += 1
+            self._count('api_calls_made')
+            self.fresh_summary_urls.add(url)
             
             # Cache the result
             self.article_cache[url_hash] = {
@@ -378,7 +711,6 @@ class CostOptimisedAI:
                 'summary': summary,
                 'cached_at': datetime.now().isoformat()
             }
-            self._save_article_cache()
             
             print(f"✅ AI generated fresh summary: {summary[:100]}...")
             return summary
@@ -387,9 +719,35 @@ class CostOptimisedAI:
             print(f"❌ Error getting article summary for {url}: {e}")
             return None
     
-    def analyse_comments_efficient(self, comments_data: List[Dict]) -> Dict:
+    def _comment_fingerprint(self, comments_data: List[Dict]) -> List[str]:
+        """One 'comment_id:text hash' token per comment, in page order"""
+        return [f"{comment.get('comment_id', '')}:{self._get_content_hash(comment['text'])}"
+                for comment in comments_data]
+    
+    def _get_cached_comment_analysis(self, cache_key: str, fingerprint: List[str]) -> Optional[Dict]:
+        """
+        Cached analysis of a thread if its comments are still mostly the same: the top comment is
+        unchanged and the Jaccard similarity of the fingerprints reaches the threshold
+        """
+        cached_entry = self.comment_cache.get(cache_key)
+        if not cached_entry:
+            return None
+        
+        cached_fingerprint = cached_entry.get('fingerprint', [])
+        cached_tokens, tokens = set(cached_fingerprint), set(fingerprint)
+        similarity = len(cached_tokens & tokens) / len(cached_tokens | tokens) if tokens else 0
+        if cached_fingerprint[:1] != fingerprint[:1] or similarity < self.comment_similarity_threshold:
+            self._count('comment_cache_rejects')
+            return None
+        
+        print(f"📋 Using cached comment analysis ({similarity:.0%} of comments unchanged)")
+        self._count('api_calls_saved', cached_entry.get('api_calls', 1))
+        return cached_entry['analysis']
+    
+    def analyse_comments_efficient(self, comments_data: List[Dict], thread_key: Optional[str] = None) -> Dict:
         """
         Efficient comment analysis using local processing + targeted AI
+        thread_key (e.g. the HN discussion URL) lets a re-fetched thread with a few new replies reuse its analysis
         """
         if not comments_data:
             return {
@@ -418,6 +776,23 @@ class CostOptimisedAI:
         # Use AI for detailed analysis on substantial discussions
         try:
             top_comments = comments_data[:6]  # Analyze fewer comments to save tokens
+            
+            # Threads are cached per discussion; without a thread key only an identical comment set matches
+            fingerprint = self._comment_fingerprint(comments_data)
+            cache_key = self._get_content_hash(thread_key or "|".join(sorted(fingerprint)))
+            analysis = self._get_cached_comment_analysis(cache_key, fingerprint)
+            if analysis:
+                # A copy, so the cache backend's stored entry is never rewritten in place
+                analysis = copy.deepcopy(analysis)
+                analysis["total_comments_analyzed"] = len(comments_data)
+                analysis["comment_stats"] = {
+                    "total_comments": len(comments_data),
+                    "avg_comment_length": avg_length,
+                    "comments_with_scores": len([c for c in comments_data if c.get("score") is not None])
+                }
+                return analysis
+            
+            initial_api_calls = self.api_calls_made
             comments_text = []
             
             for i, comment in enumerate(top_comments, 1):
@@ -519,9 +894,11 @@ class CostOptimisedAI:
             result = result.replace('\n', ' ').replace('\r', ' ')  # Remove line breaks
             result = result.replace('""', '"').replace('\\', '')   # Fix double quotes and escapes
             
+            analysis_parsed = True
             try:
                 ai_analysis = json.loads(result)
             except json.JSONDecodeError as e:
+                analysis_parsed = False
                 print(f"⚠️ JSON parsing error: {e}")
                 print(f"Raw response (first 300 chars): {result[:300]}...")
                 
@@ -566,7 +943,7 @@ class CostOptimisedAI:
                     "sentiment_summary": "Analysis failed due to JSON parsing error"
                 }
             
-            self.api_calls_made += 1
+            self._count('api_calls_made')
             
             # Convert detailed analysis to backward-compatible format while preserving rich data
             technical_details = ai_analysis.get("technical_details", {})
@@ -642,14 +1019,14 @@ class CostOptimisedAI:
                         )
                         
                         top_comment_summary = summary_response.choices[0].message.content.strip()
-                        self.api_calls_made += 1
+                        self._count('api_calls_made')
                         print(f"✅ Generated top comment summary: {top_comment_summary[:50]}...")
                         
                     except Exception as e:
                         print(f"⚠️ Error generating top comment summary: {e}")
                         top_comment_summary = None
 
-            return {
+            analysis = {
                 "total_comments_analyzed": len(comments_data),
                 "main_themes": main_themes,
                 "agreement_points": agreement_points,
@@ -673,6 +1050,17 @@ class CostOptimisedAI:
                 }
             }
             
+            # Failed parses are not cached, the next run gets another chance
+            if analysis_parsed:
+                self.comment_cache[cache_key] = {
+                    'url': thread_key,
+                    'fingerprint': fingerprint,
+                    'analysis': analysis,
+                    'api_calls': self.api_calls_made - initial_api_calls,
+                    'cached_at': datetime.now().isoformat()
+                }
+            return analysis
+            
         except Exception as e:
             print(f"❌ Error in AI comment analysis: {e}")
             # Fallback to simple analysis
@@ -705,52 +1093,35 @@ class CostOptimisedAI:
             "savings_percentage": round(savings_percentage, 1),
             "estimated_money_saved": round(money_saved, 3),
             "estimated_money_spent": round(money_spent, 3),
-            "cache_size": len(self.article_cache)
+            "cache_size": len(self.article_cache),
+            "summary_cache": self.article_cache.stats(),
+            "interest_embeddings": self.interest_embedding_cache.stats(),
+            "story_embeddings": {"encoded": self.stories_encoded, "reused": self.story_embedding_reuses},
+            "comment_cache": {**self.comment_cache.stats(), "similarity_rejects": self.comment_cache_rejects},
+            "relevance_cache": self.relevance_cache.stats(),
+            "incremental_fetch": self.fetch_state.stats(),
+            "extraction_strategies": self.domain_strategies.stats(),
+            "article_store": self.article_store.stats()
         }
     
-    def _compute_user_interest_embeddings(self, user_interests: Dict) -> Dict:
+    def _compute_user_interest_embeddings(self, user_interests: Dict, user_id: Optional[str] = None) -> Dict:
         """
-        Compute embeddings for user-specific interests
+        Compute embeddings for user-specific interests (cached per user and interest set)
         Expected format: {'high_priority': ['keyword1', 'keyword2'], 'medium_priority': [...], ...}
         Or database format: [UserInterestWeight objects]
         """
-        interest_embeddings = {}
-        
         # Handle both dict format and database object format
         if isinstance(user_interests, dict) and user_interests and isinstance(list(user_interests.values())[0], list):
             # Dictionary format from form data
-            # Always use weight 1.0 regardless of category
-            
-            for category, keywords in user_interests.items():
-                if keywords:  # Only process non-empty categories
-                    embeddings = self.embedding_model.encode(keywords)
-                    interest_embeddings[category] = {
-                        'embeddings': embeddings,
-                        'keywords': keywords,
-                        'weight': 1.0  # Single weight for all interests
-                    }
+            keywords_by_category = {category: keywords for category, keywords in user_interests.items() if keywords}
         else:
-            # Database UserInterestWeight objects format
-            categories = {}
+            # Database UserInterestWeight objects format (stored weights are ignored, every interest weighs 1.0)
+            keywords_by_category = {}
             for interest in user_interests:
-                if interest.category not in categories:
-                    categories[interest.category] = {
-                        'keywords': [],
-                        'weights': []
-                    }
-                categories[interest.category]['keywords'].append(interest.keyword)
-                categories[interest.category]['weights'].append(interest.weight)
-            
-            for category, data in categories.items():
-                embeddings = self.embedding_model.encode(data['keywords'])
-                # Always use weight 1.0, ignore stored weights from database
-                interest_embeddings[category] = {
-                    'embeddings': embeddings,
-                    'keywords': data['keywords'],
-                    'weight': 1.0  # Single weight for all interests
-                }
+                keywords_by_category.setdefault(interest.category, []).append(interest.keyword)
+                user_id = user_id or getattr(interest, 'user_id', None)
         
-        return interest_embeddings
+        return self.interest_embedding_cache.get_or_compute(user_id, keywords_by_category, self.embedding_model.encode)
     
     def _build_interest_description(self, user_interests) -> str:
         """Build a natural language description of user interests for AI prompts"""
@@ -801,5 +1172,31 @@ def test_cost_optimisation():
     print(f"   Savings: {report['savings_percentage']}%")
     print(f"   Estimated money saved: ${report['estimated_money_saved']}")
 
+def benchmark_story_encoding(batch_sizes=(1, 2, 4, 8, 16, 32, 64), num_stories: int = 256, repeats: int = 3):
+    """Stories/sec of the local embedding model on CPU per batch size, plus the old one-call-per-story loop"""
+    # Real titles from saved scrapes when available
+    texts = load_sample_story_texts(num_stories)
+    
+    model = load_encoder(EMBEDDING_MODEL_NAME)
+    model.encode(texts[:8])  # Warm-up
+    
+    def best_rate(run):
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        return len(texts) / min(timings)
+    
+    print(f"📊 Encoding {len(texts)} stories on CPU with the {model.backend} backend (best of {repeats})")
+    print(f"   one encode() per story: {best_rate(lambda: [model.encode([text]) for text in texts]):8.1f} stories/sec")
+    for batch_size in batch_sizes:
+        rate = best_rate(lambda: model.encode(texts, batch_size=batch_size))
+        print(f"   batch size {batch_size:>3}:          {rate:8.1f} stories/sec")
+
 if __name__ == "__main__":
-    test_cost_optimisation()
\ No newline at end of file
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "benchmark-encoding":
+        benchmark_story_encoding()
+    else:
+        test_cost_optimisation()
\ No newline at end of file
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Shared AI Resources
+Process-wide registry of the expensive AI objects (embedding model, OpenAI client, database manager
+and the cost-optimised pipeline with its caches). Each is created on first use under its own lock and
+then reused by every request, job and scraper run in the process
+"""
+
+import os
+import sys
+import time
+import hashlib
+import threading
+from typing import Callable, Dict, Iterable, Optional
+
+# DatabaseManager lives in dashboard/; added once here rather than on every database creation
+DASHBOARD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dashboard")
+if DASHBOARD_DIR not in sys.path:
+    sys.path.append(DASHBOARD_DIR)
+
+class ResourceRegistry:
+    def __init__(self):
+        self._factories = {}  # name -> factory
+        self._resources = {}  # name -> created resource
+        self._locks = {}  # name -> lock, so a slow model load does not hold up other resources
+        self._lock = threading.Lock()
+        
+        # Metrics
+        self.load_seconds = {}
+        self.hits = 0
+    
+    def register(self, name: str, factory: Callable[[], object]):
+        """Declare how a resource is created (nothing is created until it is first needed)"""
+        with self._lock:
+            self._factories[name] = factory
+    
+    def provide(self, name: str, resource: object):
+        """Register an already created resource (e.g. the app's DatabaseManager)"""
+        with self._lock:
+            self._resources[name] = resource
+    
+    def get(self, name: str, factory: Optional[Callable[[], object]] = None):
+        """The shared resource, created by its factory on first use; concurrent callers wait for one creation"""
+        resource = self._resources.get(name)
+        if resource is not None:
+            with self._lock:
+                self.hits += 1
+            return resource
+        
+        with self._lock:
+            factory = factory or self._factories.get(name)
+            if factory is None:
+                raise KeyError(f"No AI resource registered as '{name}'")
+            lock = self._locks.setdefault(name, threading.Lock())
+        
+        with lock:
+            # Another thread may have created it while we waited
+            resource = self._resources.get(name)
+            if resource is None:
+                start = time.time()
+                resource = factory()  # Failures are not cached, the next call retries
+                self.load_seconds[name] = round(time.time() - start, 2)
+                self._resources[name] = resource
+            return resource
+    
+    def is_loaded(self, name: str) -> bool:
+        return name in self._resources
+    
+    def reset(self, name: Optional[str] = None):
+        """Forget one resource (or all), so the next get() creates it again"""
+        with self._lock:
+            if name is None:
+                self._resources.clear()
+            else:
+                self._resources.pop(name, None)
+    
+    def warm(self, names: Iterable[str]) -> Dict[str, float]:
+        """Create the given resources now (e.g. at app startup); failures are reported, not raised"""
+        for name in names:
+            try:
+                self.get(name)
+            except Exception as e:
+                print(f"⚠️ Could not warm AI resource '{name}': {e}")
+        return dict(self.load_seconds)
+    
+    def stats(self) -> Dict:
+        return {
+            "loaded": sorted(self._resources),
+            "load_seconds": dict(self.load_seconds),
+            "hits": self.hits
+        }
+
+registry = ResourceRegistry()
+
+def _create_database():
+    from database import DatabaseManager
+    return DatabaseManager()
+
+def _create_ai_pipeline():
+    from ai_pipeline import CostOptimisedAI
+    return CostOptimisedAI()
+
+registry.register("database", _create_database)
+registry.register("ai_pipeline", _create_ai_pipeline)
+
+def get_database():
+    """The process's DatabaseManager (init_database DDL runs once per process)"""
+    return registry.get("database")
+
+def get_embedding_model(model_name: str, backend: Optional[str] = None):
+    """The sentence encoder for this model and backend, loaded once per process"""
+    from embedding_backends import load_encoder, DEFAULT_EMBEDDING_BACKEND
+    
+    backend = backend or DEFAULT_EMBEDDING_BACKEND
+    return registry.get(f"embedding_model:{model_name}:{backend}", lambda: load_encoder(model_name, backend))
+
+def get_openai_client(api_key: str):
+    """One OpenAI client (and its connection pool) per API key"""
+    from openai import OpenAI
+    
+    key_hash = hashlib.sha256(api_key.encode()).hexdigest()[:12]
+    return registry.get(f"openai_client:{key_hash}", lambda: OpenAI(api_key=api_key))
+
+def get_ai_pipeline():
+    """The shared CostOptimisedAI (model, OpenAI client, caches and default interest embeddings)"""
+    return registry.get("ai_pipeline")
+
+def warm_ai_resources(background: bool = True):
+    """Load the shared pipeline (and with it the model, client and caches) ahead of the first request"""
+    def warm():
+        start = time.time()
+        registry.warm(["database", "ai_pipeline"])
+        if registry.is_loaded("ai_pipeline"):
+            print(f"✅ AI resources warmed in {time.time() - start:.1f}s")
+    
+    if not background:
+        warm()
+        return
+    thread = threading.Thread(target=warm, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Approximate Nearest-Neighbour Index over Story Embeddings
+IVF-flat in NumPy: story vectors are bucketed under k-means centroids and a query only scans the
+nprobe closest buckets. Rows are appended on every import and memory-mapped from disk, so "similar
+stories" queries stay fast and cheap to open as the archive grows
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from embedding_quantisation import decode_vector
+
+# Appends from concurrent processes (scraper, dashboard workers) are serialised with a file lock on POSIX
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+DEFAULT_INDEX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".ai_cache", "story_index")
+MIN_TRAIN_SIZE = 1024  # Below this a flat scan is as fast as probing buckets
+RETRAIN_GROWTH = 4  # Re-cluster once the index is this many times larger than when it was trained
+DEFAULT_NPROBE = int(os.getenv('STORY_INDEX_NPROBE', '8'))
+
+def _normalise_rows(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+def _nearest_centroids(vectors: np.ndarray, centroids: np.ndarray, chunk_size: int = 8192) -> np.ndarray:
+    """Bucket of each (normalised) vector, in chunks so the similarity matrix stays small"""
+    return np.concatenate([
+        np.argmax(vectors[start:start + chunk_size] @ centroids.T, axis=1)
+        for start in range(0, len(vectors), chunk_size)
+    ]).astype(np.int32)
+
+def _kmeans(vectors: np.ndarray, nlist: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Spherical k-means centroids, trained on a sample of at most 64 vectors per bucket"""
+    rng = np.random.default_rng(seed)
+    sample = vectors[rng.choice(len(vectors), min(len(vectors), nlist * 64), replace=False)]
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = _nearest_centroids(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        counts = np.bincount(assignments, minlength=nlist)
+        # Empty buckets are re-seeded with random sample vectors
+        empty = counts == 0
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        centroids = _normalise_rows(sums)
+    return centroids
+
+class StoryANNIndex:
+    def __init__(self, index_dir: str = DEFAULT_INDEX_DIR, model_name: str = "", nprobe: int = DEFAULT_NPROBE):
+        """Open the index (meta.json + row files); a different model starts a fresh one"""
+        self.index_dir = index_dir
+        self.model_name = model_name
+        self.nprobe = nprobe
+        self.meta_file = os.path.join(index_dir, "meta.json")
+        self.vectors_file = os.path.join(index_dir, "vectors.f32")
+        self.ids_file = os.path.join(index_dir, "ids.i64")
+        self.lists_file = os.path.join(index_dir, "lists.i32")
+        self.centroids_file = os.path.join(index_dir, "centroids.f32")
+        os.makedirs(index_dir, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._meta_mtime = None
+        self._reload()
+        
+        # Metrics
+        self.searches = 0
+        self.added = 0
+        self.trainings = 0
+    
+    def _reload(self):
+        """Re-read meta.json and re-map the row files (picks up rows appended by other processes)"""
+        meta = {}
+        if os.path.exists(self.meta_file):
+            try:
+                self._meta_mtime = os.path.getmtime(self.meta_file)
+                with open(self.meta_file, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+            except Exception as e:
+                print(f"⚠️ Error loading story index metadata: {e}")
+        if meta.get("model") != self.model_name:
+            meta = {}
+        
+        self.count = meta.get("count", 0)
+        self.dim = meta.get("dim", 0)
+        self.nlist = meta.get("nlist", 0)
+        self.trained_count = meta.get("trained_count", 0)
+        if self.count and any(not os.path.exists(path) or os.path.getsize(path) < self.count * width
+                              for path, width in ((self.vectors_file, self.dim * 4), (self.ids_file, 8),
+                                                  (self.lists_file, 4))):
+            print("⚠️ Story index files are missing rows, rebuilding it")
+            self.count = self.nlist = self.trained_count = 0
+        
+        self.vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.lists = np.zeros(0, dtype=np.int32)
+        self.centroids = np.zeros((0, self.dim), dtype=np.float32)
+        if self.count:
+            self.vectors = np.memmap(self.vectors_file, dtype=np.float32, mode="r", shape=(self.count, self.dim))
+            self.ids = np.array(np.memmap(self.ids_file, dtype=np.int64, mode="r", shape=(self.count,)))
+            self.lists = np.array(np.memmap(self.lists_file, dtype=np.int32, mode="r", shape=(self.count,)))
+        if self.nlist:
+            self.centroids = np.fromfile(self.centroids_file, dtype=np.float32).reshape(self.nlist, self.dim)
+        self.rows = {int(story_id): row for row, story_id in enumerate(self.ids)}
+        
+        # Inverted lists: rows of bucket c are order[offsets[c]:offsets[c + 1]]
+        self._order = np.argsort(self.lists, kind="stable")
+        self._offsets = np.concatenate([[0], np.cumsum(np.bincount(self.lists, minlength=self.nlist))])
+    
+    def _refresh(self):
+        try:
+            if os.path.getmtime(self.meta_file) != self._meta_mtime:
+                self._reload()
+        except OSError:
+            pass
+    
+    def __contains__(self, story_id: int) -> bool:
+        return int(story_id) in self.rows
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def add(self, story_ids: Iterable[int], vectors: np.ndarray) -> int:
+        """Append stories not indexed yet (vectors are normalised here); returns how many were added"""
+        story_ids = [int(story_id) for story_id in story_ids]
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(story_ids), -1)
+        if not any(story_id not in self.rows for story_id in story_ids):
+            return 0
+        
+        with self._lock, open(os.path.join(self.index_dir, ".lock"), "w") as lock_file:
+            if FCNTL_AVAILABLE:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            # Another process may have added some of them meanwhile
+            self._reload()
+            new_rows = {}
+            for story_id, vector in zip(story_ids, vectors):
+                if story_id not in self.rows:
+                    new_rows[story_id] = vector
+            if not new_rows:
+                return 0
+            
+            new_vectors = np.ascontiguousarray(_normalise_rows(np.stack(list(new_rows.values()))))
+            if not self.count:
+                # First rows (or a model change): start new files
+                self.dim = new_vectors.shape[1]
+                self.nlist = self.trained_count = 0
+                for path in (self.vectors_file, self.ids_file, self.lists_file):
+                    open(path, "wb").close()
+            lists = (_nearest_centroids(new_vectors, self.centroids) if self.nlist
+                     else np.zeros(len(new_vectors), dtype=np.int32))
+            
+            # Rows beyond the count in meta.json (from an interrupted append) are overwritten
+            for path, rows, width in ((self.vectors_file, new_vectors, self.dim * 4),
+                                      (self.ids_file, np.asarray(list(new_rows), dtype=np.int64), 8),
+                                      (self.lists_file, lists, 4)):
+                with open(path, "r+b") as f:
+                    f.seek(self.count * width)
+                    f.write(rows.tobytes())
+                    f.truncate()
+            self.count += len(new_rows)
+            self.added += len(new_rows)
+            
+            if self.count >= MIN_TRAIN_SIZE and (not self.nlist or self.count > RETRAIN_GROWTH * self.trained_count):
+                self._train()
+            self._write_meta()
+            self._reload()
+        return len(new_rows)
+    
+    def _train(self):
+        """Cluster every row into about sqrt(count) buckets and reassign all rows"""
+        start = time.time()
+        vectors = np.memmap(self.vectors_file, dtype=np.float32, mode="r", shape=(self.count, self.dim))
+        self.nlist = int(np.sqrt(self.count))
+        centroids = _kmeans(np.asarray(vectors), self.nlist)
+        centroids.tofile(self.centroids_file)
+        _nearest_centroids(vectors, centroids).tofile(self.lists_file)
+        self.trained_count = self.count
+        self.trainings += 1
+        print(f"🗂️ Story index trained: {self.count} stories in {self.nlist} buckets ({time.time() - start:.2f}s)")
+    
+    def _write_meta(self):
+        # meta.json is replaced atomically after the rows it counts are on disk
+        tmp_file = self.meta_file + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({"model": self.model_name, "dim": self.dim, "count": self.count,
+                       "nlist": self.nlist, "trained_count": self.trained_count}, f)
+        os.replace(tmp_file, self.meta_file)
+    
+    def vector(self, story_id: int) -> Optional[np.ndarray]:
+        """Stored (normalised) vector of an indexed story"""
+        self._refresh()
+        row = self.rows.get(int(story_id))
+        return None if row is None else np.asarray(self.vectors[row])
+    
+    def _top_k(self, rows: np.ndarray, query: np.ndarray, k: int, exclude_ids: Iterable[int]) -> List[Tuple[int, float]]:
+        scores = np.asarray(self.vectors[rows]) @ query
+        excluded = [int(story_id) for story_id in exclude_ids]
+        if excluded:
+            keep = ~np.isin(self.ids[rows], excluded)
+            rows, scores = rows[keep], scores[keep]
+        if len(rows) > k:
+            top = np.argpartition(-scores, k)[:k]
+            rows, scores = rows[top], scores[top]
+        order = np.argsort(-scores)
+        return [(int(self.ids[rows[i]]), float(scores[i])) for i in order]
+    
+    def search(self, vector: np.ndarray, k: int = 10, nprobe: Optional[int] = None,
+               exclude_ids: Iterable[int] = ()) -> List[Tuple[int, float]]:
+        """The k stories most similar to the vector as (story_id, cosine similarity), best first"""
+        self._refresh()
+        self.searches += 1
+        if not self.count:
+            return []
+        query = _normalise_rows(np.asarray(vector).reshape(1, -1))[0]
+        if not self.nlist:
+            return self._top_k(np.arange(self.count), query, k, exclude_ids)
+        
+        # Only the nprobe buckets whose centroids are closest to the query are scanned
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        buckets = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        rows = np.sort(np.concatenate([self._order[self._offsets[bucket]:self._offsets[bucket + 1]] for bucket in buckets]))
+        return self._top_k(rows, query, k, exclude_ids)
+    
+    def search_brute_force(self, vector: np.ndarray, k: int = 10, exclude_ids: Iterable[int] = ()) -> List[Tuple[int, float]]:
+        """Exact search over every row (the benchmark's ground truth)"""
+        self._refresh()
+        if not self.count:
+            return []
+        query = _normalise_rows(np.asarray(vector).reshape(1, -1))[0]
+        return self._top_k(np.arange(self.count), query, k, exclude_ids)
+    
+    def similar_stories(self, story_id: int, k: int = 10) -> Optional[List[Tuple[int, float]]]:
+        """Stories most similar to an indexed story (itself excluded), None if it is not indexed"""
+        vector = self.vector(story_id)
+        if vector is None:
+            return None
+        return self.search(vector, k=k, exclude_ids=[story_id])
+    
+    def stats(self) -> Dict:
+        return {
+            "stories": self.count,
+            "dim": self.dim,
+            "buckets": self.nlist,
+            "nprobe": min(self.nprobe, self.nlist) if self.nlist else 0,
+            "trained_count": self.trained_count,
+            "vector_bytes": self.count * self.dim * 4,
+            "searches": self.searches,
+            "added": self.added,
+            "trainings": self.trainings
+        }
+
+def open_story_index(model: str, model_version: str, index_dir: str = DEFAULT_INDEX_DIR) -> StoryANNIndex:
+    """The story index for vectors of this embedding model and story text version"""
+    return StoryANNIndex(index_dir, model_name=f"{model}:{model_version}")
+
+def sync_story_index(index: StoryANNIndex, db, model: str, model_version: str, batch_size: int = 1000) -> int:
+    """Add every story with a stored embedding (story_embeddings table) that the index is missing"""
+    missing = [story_id for story_id in db.get_story_embedding_ids(model, model_version) if story_id not in index]
+    added = 0
+    for start in range(0, len(missing), batch_size):
+        stored = db.get_story_embeddings(missing[start:start + batch_size], model, model_version)
+        if stored:
+            added += index.add(list(stored), np.stack([decode_vector(*row) for row in stored.values()]))
+    if added:
+        print(f"🗂️ Story index: added {added} stories ({len(index)} indexed)")
+    return added
+
+def build_story_index(index_dir: str = DEFAULT_INDEX_DIR):
+    """Encode every stored story lacking an embedding, then index the whole archive"""
+    from ai_resources import get_database, get_ai_pipeline
+    from ai_pipeline import EMBEDDING_MODEL_NAME, STORY_EMBEDDING_VERSION
+    
+    db = get_database()
+    missing = db.get_stories_without_embeddings(EMBEDDING_MODEL_NAME, STORY_EMBEDDING_VERSION)
+    if missing:
+        print(f"🧮 Encoding {len(missing)} stories without embeddings...")
+        get_ai_pipeline().store_story_embeddings(db, missing)
+    
+    index = open_story_index(EMBEDDING_MODEL_NAME, STORY_EMBEDDING_VERSION, index_dir)
+    sync_story_index(index, db, EMBEDDING_MODEL_NAME, STORY_EMBEDDING_VERSION)
+    print(f"✅ Story index ready: {index.stats()}")
+
+def benchmark_story_index(num_stories: int = 100000, dim: int = 384, num_queries: int = 200, k: int = 10,
+                          nprobes=(1, 4, 8, 16, 32)):
+    """Recall@k and query latency of IVF-flat against brute force on clustered synthetic vectors"""
+    import tempfile
+    
+    rng = np.random.default_rng(0)
+    # Topic-like clusters (real story embeddings cluster by subject) plus per-story noise
+    topics = _normalise_rows(rng.standard_normal((500, dim)))
+    vectors = topics[rng.integers(0, len(topics), num_stories)] + 0.08 * rng.standard_normal((num_stories, dim))
+    queries = topics[rng.integers(0, len(topics), num_queries)] + 0.08 * rng.standard_normal((num_queries, dim))
+    
+    with tempfile.TemporaryDirectory() as index_dir:
+        index = StoryANNIndex(index_dir, model_name="benchmark")
+        start = time.perf_counter()
+        # Imports arrive in daily batches; insert in chunks to exercise incremental adds and retraining
+        for chunk in range(0, num_stories, 10000):
+            index.add(range(chunk, min(chunk + 10000, num_stories)), vectors[chunk:chunk + 10000])
+        build_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        truth = [{story_id for story_id, _ in index.search_brute_force(query, k)} for query in queries]
+        brute_ms = (time.perf_counter() - start) * 1000 / num_queries
+        
+        print(f"📊 {num_stories} stories (dim {dim}), {index.nlist} buckets, built in {build_seconds:.1f}s")
+        print(f"   brute force:      {brute_ms:7.2f} ms/query  recall@{k} 1.000")
+        for nprobe in nprobes:
+            start = time.perf_counter()
+            results = [index.search(query, k, nprobe=nprobe) for query in queries]
+            ann_ms = (time.perf_counter() - start) * 1000 / num_queries
+            recall = np.mean([len(truth[i] & {story_id for story_id, _ in result}) / k
+                              for i, result in enumerate(results)])
+            print(f"   ivf nprobe={nprobe:<4}  {ann_ms:7.2f} ms/query  recall@{k} {recall:.3f}  "
+                  f"({brute_ms / ann_ms:.1f}x faster)")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "build":
+        build_story_index()
+    else:
+        benchmark_story_index(num_stories=int(sys.argv[2]) if len(sys.argv) > 2 else 100000)
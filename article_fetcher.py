@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Async Article Fetcher for HN Scraper
+Downloads linked articles concurrently over pooled keep-alive connections, with per-host limits,
+retries with backoff and streaming reads that stop at a byte budget
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from fetch_state import FetchStateStore
+from content_sniffer import classify_content_type, is_metadata_only
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+class AsyncArticleFetcher:
+    def __init__(self, max_bytes: Optional[int] = None, max_concurrency: Optional[int] = None,
+                 per_host_limit: int = 2, max_retries: int = 2, backoff: float = 0.5, timeout: float = 15.0,
+                 fetch_state: Optional[FetchStateStore] = None):
+        """
+        Initialize the fetcher (settings default to ARTICLE_MAX_BYTES / PDF_MAX_BYTES / ARTICLE_FETCH_CONCURRENCY)
+        With a fetch_state store, requests are conditional and unchanged articles are reported as such
+        """
+        self.max_bytes = max_bytes or int(os.getenv('ARTICLE_MAX_BYTES', '524288'))
+        self.pdf_max_bytes = int(os.getenv('PDF_MAX_BYTES', '2097152'))
+        self.max_concurrency = max_concurrency or int(os.getenv('ARTICLE_FETCH_CONCURRENCY', '16'))
+        self.per_host_limit = per_host_limit
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.fetch_state = fetch_state
+        
+        # Metrics
+        self.pages_fetched = 0
+        self.pages_truncated = 0
+        self.bytes_read = 0
+        self.retries = 0
+        self.failures = 0
+        self.bodies_skipped = 0
+    
+    def fetch_one(self, url: str, conditional: bool = True) -> Dict:
+        """Synchronous entry point for a single article"""
+        return self.fetch_all([url], conditional=conditional)[0]
+    
+    def fetch_all(self, urls: Iterable[str], on_result: Optional[Callable[[Dict], None]] = None,
+                  conditional: bool = True) -> List[Dict]:
+        """
+        Synchronous entry point: fetch every URL concurrently, results in input order
+        on_result is called (from the fetching thread) as soon as each page arrives
+        """
+        return asyncio.run(self.fetch_all_async(list(urls), on_result, conditional))
+    
+    def fetch_in_background(self, urls: Iterable[str], on_result: Callable[[Dict], None]) -> threading.Thread:
+        """Run fetch_all on a background thread so the caller can consume pages while the rest download"""
+        thread = threading.Thread(target=self.fetch_all, args=(list(urls), on_result), daemon=True)
+        thread.start()
+        return thread
+    
+    async def fetch_all_async(self, urls: List[str], on_result: Optional[Callable[[Dict], None]] = None,
+                              conditional: bool = True) -> List[Dict]:
+        limits = httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+        host_semaphores = {}
+        
+        async with httpx.AsyncClient(limits=limits, timeout=self.timeout, follow_redirects=True,
+                                     headers={"User-Agent": DEFAULT_USER_AGENT}) as client:
+            async def fetch_and_report(url):
+                host = urlparse(url).netloc
+                semaphore = host_semaphores.setdefault(host, asyncio.Semaphore(self.per_host_limit))
+                async with semaphore:
+                    result = await self._fetch_with_retries(client, url, conditional)
+                if on_result:
+                    on_result(result)
+                return result
+            
+            results = await asyncio.gather(*[fetch_and_report(url) for url in urls], return_exceptions=True)
+        
+        # Backstop: one URL failing in an unexpected way must not lose the rest of the batch
+        for index, result in enumerate(results):
+            if isinstance(result, BaseException):
+                self.failures += 1
+                results[index] = self._error_result(urls[index], str(result) or type(result).__name__)
+                if on_result:
+                    on_result(results[index])
+        return results
+    
+    async def _fetch_with_retries(self, client: httpx.AsyncClient, url: str, conditional: bool = True) -> Dict:
+        previous = self.fetch_state.get(url) if self.fetch_state else None
+        headers = self.fetch_state.conditional_headers(previous) if self.fetch_state and conditional else {}
+        
+        for attempt in range(self.max_retries + 1):
+            try:
+                result = await self._stream(client, url, headers)
+                error = None
+                if result["status"] not in RETRY_STATUS_CODES:
+                    break
+            except httpx.TransportError as e:
+                result = None
+                error = str(e) or type(e).__name__
+            except (httpx.HTTPError, httpx.InvalidURL, ValueError) as e:
+                # Redirect loops, undecodable bodies and malformed URLs fail the same way on a retry
+                result = None
+                error = str(e) or type(e).__name__
+                break
+            
+            if attempt >= self.max_retries:
+                break
+            self.retries += 1
+            # Exponential backoff with jitter so retries to one host do not stampede
+            await asyncio.sleep(self.backoff * (2 ** attempt) * (1 + random.random()))
+        
+        if result is None:
+            self.failures += 1
+            return self._error_result(url, error)
+        
+        if result["status"] >= 400:
+            self.failures += 1
+            result["error"] = f"HTTP {result['status']}"
+            result["text"] = None
+            result.pop("headers")
+            result.pop("body")
+            return result
+        
+        if self.fetch_state:
+            result["changed"] = self.fetch_state.record_response(
+                url, result["status"], result.pop("headers"), result.pop("body"), previous)
+        else:
+            result.pop("headers")
+            result.pop("body")
+        return result
+    
+    @staticmethod
+    def _error_result(url: str, error: str) -> Dict:
+        return {"url": url, "status": None, "kind": None, "text": None, "changed": True, "truncated": False,
+                "bytes": 0, "content_type": "", "error": error}
+    
+    async def _stream(self, client: httpx.AsyncClient, url: str, headers: Dict) -> Dict:
+        """
+        Read the response body incrementally and stop once the byte budget is used up
+        The Content-Type is sniffed first: media and binaries are not read at all, PDFs get their own budget
+        """
+        async with client.stream("GET", url, headers=headers) as response:
+            content_type = response.headers.get("Content-Type", "")
+            kind = classify_content_type(content_type)
+            
+            if response.status_code == 304:
+                return {"url": url, "status": 304, "kind": kind, "text": None, "changed": False,
+                        "truncated": False, "bytes": 0, "content_type": content_type,
+                        "headers": response.headers, "body": None, "error": None}
+            
+            chunks = []
+            size = 0
+            truncated = False
+            budget = self.pdf_max_bytes if kind == "pdf" else self.max_bytes
+            # Media, binaries (and PDFs when pypdf cannot read them) are classified from their headers only
+            if is_metadata_only(kind):
+                self.bodies_skipped += 1
+            elif response.status_code < 400:
+                async for chunk in response.aiter_bytes():
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= budget:
+                        truncated = True
+                        break
+            
+            body = b"".join(chunks)[:budget]
+            self.pages_fetched += 1
+            self.bytes_read += len(body)
+            if truncated:
+                self.pages_truncated += 1
+            
+            return {
+                "url": url,
+                # Where redirects ended up, recorded as a URL alias by the caller
+                "final_url": str(response.url),
+                "status": response.status_code,
+                "kind": kind,
+                "text": body.decode(response.encoding or "utf-8", errors="replace") if kind in ("html", "text") else None,
+                # Raw bytes are only kept for PDFs, which are parsed from the binary
+                "pdf_bytes": body if kind == "pdf" else None,
+                "changed": True,
+                "truncated": truncated,
+                "bytes": len(body),
+                "content_type": content_type,
+                "headers": response.headers,
+                # No body hash is recorded for bodies that were never read
+                "body": None if is_metadata_only(kind) else body,
+                "error": None
+            }
+    
+    def metrics(self) -> Dict:
+        return {
+            "pages_fetched": self.pages_fetched,
+            "pages_truncated": self.pages_truncated,
+            "bytes_read": self.bytes_read,
+            "retries": self.retries,
+            "failures": self.failures,
+            "bodies_skipped": self.bodies_skipped
+        }
+
+if __name__ == "__main__":
+    # Usage: python article_fetcher.py <url> [<url> ...]
+    fetcher = AsyncArticleFetcher()
+    start = time.time()
+    for result in fetcher.fetch_all(sys.argv[1:]):
+        status = result["error"] or f"{result['status']}, {result['bytes']} bytes{' (truncated)' if result['truncated'] else ''}"
+        print(f"  {result['url'][:70]}: {status}")
+    print(f"✅ Fetched {len(sys.argv) - 1} URLs in {time.time() - start:.2f}s: {fetcher.metrics()}")
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Article Text Store
+Keeps the extracted plain text of every fetched article, compressed and deduplicated by content hash,
+so re-summarisation, re-embedding and insight backfills can read locally instead of re-fetching
+"""
+
+import os
+import json
+import zlib
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+# zstd compresses article text better and faster than zlib when installed
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+from url_canonical import canonicalize_url
+
+DEFAULT_ARTICLE_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".ai_cache", "articles")
+
+class ArticleStore:
+    def __init__(self, store_dir: str = DEFAULT_ARTICLE_STORE_DIR):
+        """Open the store: an SQLite index of canonical URL -> content hash plus one compressed blob per unique text"""
+        self.store_dir = store_dir
+        self.blob_dir = os.path.join(store_dir, "blobs")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        
+        self.codec = "zst" if ZSTD_AVAILABLE else "zlib"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(store_dir, "index.db"), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS article_index (
+                url_key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                chars INTEGER,
+                stored_at TEXT,
+                metadata TEXT
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_article_index_hash ON article_index(content_hash)")
+        self._conn.commit()
+        
+        # Metrics
+        self.writes = 0
+        self.deduplicated = 0
+        self.reads = 0
+    
+    @staticmethod
+    def content_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+    
+    def _blob_path(self, content_hash: str, codec: str) -> str:
+        return os.path.join(self.blob_dir, content_hash[:2], f"{content_hash}.{codec}")
+    
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == "zst":
+            return zstandard.ZstdCompressor(level=10).compress(data)
+        return zlib.compress(data, 9)
+    
+    def _decompress(self, data: bytes, codec: str) -> bytes:
+        if codec == "zst":
+            return zstandard.ZstdDecompressor().decompress(data)
+        return zlib.decompress(data)
+    
+    def put(self, url: str, text: str, metadata: Optional[Dict] = None) -> str:
+        """Store an article's text under its URL; identical text is written to disk only once"""
+        content_hash = self.content_hash(text)
+        
+        if self._find_blob(content_hash):
+            self.deduplicated += 1
+        else:
+            blob_path = self._blob_path(content_hash, self.codec)
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            tmp_path = blob_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(self._compress(text.encode("utf-8")))
+            os.replace(tmp_path, blob_path)
+        
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO article_index (url_key, url, content_hash, chars, stored_at, metadata) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (canonicalize_url(url), url, content_hash, len(text), datetime.now().isoformat(),
+                 json.dumps(metadata or {}))
+            )
+            self._conn.commit()
+        self.writes += 1
+        return content_hash
+    
+    def get(self, url: str) -> Optional[Dict]:
+        """Stored text and metadata for a URL, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, content_hash, chars, stored_at, metadata FROM article_index WHERE url_key = ?",
+                (canonicalize_url(url),)
+            ).fetchone()
+        if not row:
+            return None
+        
+        text = self.get_by_hash(row[1])
+        if text is None:
+            return None
+        return {
+            "url": row[0],
+            "content_hash": row[1],
+            "chars": row[2],
+            "stored_at": row[3],
+            "metadata": json.loads(row[4] or "{}"),
+            "text": text
+        }
+    
+    def get_text(self, url: str) -> Optional[str]:
+        entry = self.get(url)
+        return entry["text"] if entry else None
+    
+    def get_by_hash(self, content_hash: str) -> Optional[str]:
+        blob = self._find_blob(content_hash)
+        if not blob:
+            return None
+        blob_path, codec = blob
+        try:
+            with open(blob_path, "rb") as f:
+                text = self._decompress(f.read(), codec).decode("utf-8")
+        except Exception as e:
+            print(f"⚠️ Error reading stored article {content_hash[:12]}: {e}")
+            return None
+        self.reads += 1
+        return text
+    
+    def _find_blob(self, content_hash: str):
+        # Blobs written under the other codec (e.g. before zstandard was installed) stay readable
+        for codec in ("zst", "zlib"):
+            blob_path = self._blob_path(content_hash, codec)
+            if os.path.exists(blob_path):
+                return blob_path, codec
+        return None
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            articles, unique_texts, chars = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT content_hash), COALESCE(SUM(chars), 0) FROM article_index"
+            ).fetchone()
+        return {
+            "articles": articles,
+            "unique_texts": unique_texts,
+            "chars": chars,
+            "codec": self.codec,
+            "writes": self.writes,
+            "deduplicated": self.deduplicated,
+            "reads": self.reads
+        }
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Single-Pass Article Content Extractor
+Streams the page through one parser pass, scores blocks by text and link density
+(readability-style) and returns the main text
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+import time
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+# lxml's event-driven target parser is much faster than the stdlib one when installed
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# Text inside these is never article content
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "iframe", "form", "button", "select",
+             "nav", "header", "footer", "aside", "head", "title"}
+# Elements that can hold the article and accumulate paragraph scores
+CONTAINER_TAGS = {"body", "div", "article", "section", "main", "td", "blockquote"}
+# Elements whose text is treated as one paragraph
+PARAGRAPH_TAGS = {"p", "pre", "li", "h1", "h2", "h3", "h4", "h5", "h6", "dd", "figcaption"}
+VOID_TAGS = {"br", "img", "hr", "input", "meta", "link", "source", "wbr", "area", "base", "col", "embed", "track"}
+
+POSITIVE_HINTS = re.compile(r"article|body|content|entry|main|post|story|text|blog", re.I)
+NEGATIVE_HINTS = re.compile(r"comment|footer|sidebar|sponsor|promo|related|share|social|nav|menu|"
+                            r"banner|ad-|advert|cookie|popup|subscribe|newsletter|widget", re.I)
+
+# Legacy extractor's selectors, kept for comparison and as a fallback
+LEGACY_CONTENT_SELECTORS = [
+    'article', '[role="main"]', 'main', '.content', '.post-content',
+    '.article-content', '.entry-content', '.post-body',
+    '.story', '.article', '.text', '.body', '.main-content',
+    '#content', '#main', '#article', '#story', '#post',
+    '.container .text', '.wrapper .content', '.page-content'
+]
+
+class _Block:
+    __slots__ = ("tag", "start", "score", "text_chars", "link_chars", "weight")
+    
+    def __init__(self, tag: str, start: int, weight: float):
+        self.tag = tag
+        self.start = start
+        self.score = 0.0
+        self.text_chars = 0
+        self.link_chars = 0
+        self.weight = weight
+
+class DensityScorer:
+    """
+    Parser event handler (lxml target interface: start/end/data/close)
+    Paragraph scores are credited to the enclosing container and half to its parent;
+    a container's final score is discounted by its link density and adjusted by class/id hints
+    """
+    
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.stack: List[str] = []
+        self.containers: List[_Block] = []
+        self.skip_depth = 0
+        self.link_depth = 0
+        self.paragraph_start: Optional[int] = None
+        self.paragraph_chars = 0
+        self.paragraph_commas = 0
+        self.best: Optional[_Block] = None
+        self.best_end = 0
+        self.best_score = 0.0
+    
+    def start(self, tag, attrib):
+        tag = tag.lower() if isinstance(tag, str) else ""
+        if tag in VOID_TAGS:
+            if tag == "br":
+                self._data("\n")
+            return
+        if self.skip_depth or tag in SKIP_TAGS:
+            self.stack.append(tag)
+            self.skip_depth += 1
+            return
+        if tag == "p" and self.paragraph_start is not None:
+            # html.parser does not close <p> implicitly, do it here
+            self._end_paragraph()
+        self.stack.append(tag)
+        
+        if tag in CONTAINER_TAGS:
+            self._end_paragraph()
+            hints = f"{attrib.get('class', '')} {attrib.get('id', '')}"
+            weight = 1.0
+            if POSITIVE_HINTS.search(hints):
+                weight += 0.25
+            if NEGATIVE_HINTS.search(hints):
+                weight -= 0.5
+            if tag in ("article", "main"):
+                weight += 0.25
+            self.containers.append(_Block(tag, len(self.chunks), weight))
+        elif tag in PARAGRAPH_TAGS:
+            self._end_paragraph()
+            self.paragraph_start = len(self.chunks)
+        elif tag == "a":
+            self.link_depth += 1
+    
+    def end(self, tag):
+        tag = tag.lower() if isinstance(tag, str) else ""
+        if tag in VOID_TAGS or tag not in self.stack:
+            return
+        # Pop up to the matching open tag (tolerates unclosed children)
+        while self.stack:
+            open_tag = self.stack.pop()
+            if self.skip_depth:
+                self.skip_depth -= 1
+            elif open_tag in CONTAINER_TAGS:
+                self._end_container()
+            elif open_tag in PARAGRAPH_TAGS:
+                self._end_paragraph()
+            elif open_tag == "a":
+                self.link_depth = max(0, self.link_depth - 1)
+            if open_tag == tag:
+                break
+    
+    def data(self, data):
+        if not self.skip_depth:
+            self._data(data)
+    
+    def close(self):
+        while self.stack:
+            self.end(self.stack[-1])
+        self._end_paragraph()
+        return self
+    
+    def _data(self, data: str):
+        self.chunks.append(data)
+        chars = len(data.strip())
+        if not chars:
+            return
+        if self.paragraph_start is None:
+            # Bare text directly in a container counts as an implicit paragraph
+            self.paragraph_start = len(self.chunks) - 1
+        self.paragraph_chars += chars
+        self.paragraph_commas += data.count(",")
+        if self.containers:
+            self.containers[-1].text_chars += chars
+            if self.link_depth:
+                self.containers[-1].link_chars += chars
+    
+    def _end_paragraph(self):
+        if self.paragraph_start is None:
+            return
+        chars = self.paragraph_chars
+        if chars >= 25 and self.containers:
+            score = 1 + self.paragraph_commas + min(chars / 100, 3)
+            self.containers[-1].score += score
+            if len(self.containers) > 1:
+                self.containers[-2].score += score / 2
+        self.chunks.append("\n")
+        self.paragraph_start = None
+        self.paragraph_chars = 0
+        self.paragraph_commas = 0
+    
+    def _end_container(self):
+        self._end_paragraph()
+        block = self.containers.pop()
+        if self.containers:
+            # Text and links roll up into the parent for its own density
+            self.containers[-1].text_chars += block.text_chars
+            self.containers[-1].link_chars += block.link_chars
+        link_density = block.link_chars / block.text_chars if block.text_chars else 1.0
+        final_score = block.score * (1 - link_density) * block.weight
+        if final_score > self.best_score:
+            self.best = block
+            self.best_end = len(self.chunks)
+            self.best_score = final_score
+    
+    def main_text(self) -> str:
+        if self.best is None:
+            return ""
+        return normalise_text("".join(self.chunks[self.best.start:self.best_end]))
+
+class _StdlibAdapter(HTMLParser):
+    """Feeds html.parser events into a DensityScorer"""
+    
+    def __init__(self, scorer: DensityScorer):
+        super().__init__(convert_charrefs=True)
+        self.scorer = scorer
+    
+    def handle_starttag(self, tag, attrs):
+        self.scorer.start(tag, {name: value or "" for name, value in attrs})
+    
+    def handle_startendtag(self, tag, attrs):
+        self.scorer.start(tag, {name: value or "" for name, value in attrs})
+        if tag not in VOID_TAGS:
+            self.scorer.end(tag)
+    
+    def handle_endtag(self, tag):
+        self.scorer.end(tag)
+    
+    def handle_data(self, data):
+        self.scorer.data(data)
+
+def normalise_text(text: str) -> str:
+    """Collapse whitespace the same way the legacy extractor did"""
+    return " ".join(text.split())
+
+def score_page(html: str) -> DensityScorer:
+    """Run the page through a single parser pass"""
+    scorer = DensityScorer()
+    if LXML_AVAILABLE:
+        parser = etree.HTMLParser(target=scorer, remove_comments=True)
+        parser.feed(html or "<html></html>")
+        parser.close()
+    else:
+        adapter = _StdlibAdapter(scorer)
+        adapter.feed(html or "")
+        adapter.close()
+        scorer.close()
+    return scorer
+
+def extract_main_text(html: str) -> str:
+    """Main article text of a page, whitespace-normalised"""
+    scorer = score_page(html)
+    text = scorer.main_text()
+    if len(text) < 20:
+        # No scoring block (e.g. text-only pages), fall back to everything readable
+        text = normalise_text("".join(scorer.chunks))
+    return text
+
+def extract_with_selectors(html: str) -> str:
+    """The previous extractor: up to 20 CSS selector queries, then every <p>"""
+    from bs4 import BeautifulSoup
+    
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    # Remove script and style elements
+    for script in soup(["script", "style"]):
+        script.decompose()
+    
+    content = ""
+    content_found = False
+    for selector in LEGACY_CONTENT_SELECTORS:
+        elements = soup.select(selector)
+        if elements:
+            content = " ".join([elem.get_text() for elem in elements])
+            content_found = True
+            break
+    
+    if not content_found:
+        paragraphs = soup.find_all('p')
+        content = " ".join([p.get_text() for p in paragraphs])
+    
+    return normalise_text(content)
+
+# Strategy names understood by extract_with_strategy / discover_strategy
+DENSITY_STRATEGY = "density"
+PARAGRAPHS_STRATEGY = "paragraphs"
+SELECTOR_PREFIX = "selector:"
+# Text shorter than this does not count as a successful extraction
+MIN_CONTENT_CHARS = 200
+
+def _soup_for_selectors(html: str):
+    from bs4 import BeautifulSoup
+    
+    soup = BeautifulSoup(html, 'html.parser')
+    for script in soup(["script", "style"]):
+        script.decompose()
+    return soup
+
+def _select_text(soup, selector: str) -> str:
+    return normalise_text(" ".join(elem.get_text() for elem in soup.select(selector)))
+
+def _paragraph_text(soup) -> str:
+    return normalise_text(" ".join(p.get_text() for p in soup.find_all('p')))
+
+def extract_with_strategy(html: str, strategy: str) -> str:
+    """Run one named strategy: 'density', 'paragraphs' or 'selector:<css>'"""
+    if strategy == DENSITY_STRATEGY:
+        return extract_main_text(html)
+    soup = _soup_for_selectors(html)
+    if strategy.startswith(SELECTOR_PREFIX):
+        return _select_text(soup, strategy[len(SELECTOR_PREFIX):])
+    return _paragraph_text(soup)
+
+def discover_strategy(html: str, tried: Optional[Tuple[str, str]] = None) -> Tuple[str, str]:
+    """
+    Find a strategy that works for a page: density first, then (on one shared soup) each
+    legacy selector and the paragraph fallback; returns (strategy, text)
+    tried is a (strategy, text) already attempted on this page: it is not run again, only kept as a fallback
+    """
+    skip = tried[0] if tried else None
+    best_strategy, best_text = tried if tried else (DENSITY_STRATEGY, "")
+    if skip != DENSITY_STRATEGY:
+        text = extract_main_text(html)
+        if len(text) >= MIN_CONTENT_CHARS:
+            return DENSITY_STRATEGY, text
+        if len(text) > len(best_text) or not tried:
+            best_strategy, best_text = DENSITY_STRATEGY, text
+    
+    soup = _soup_for_selectors(html)
+    for selector in LEGACY_CONTENT_SELECTORS:
+        if SELECTOR_PREFIX + selector == skip:
+            continue
+        candidate = _select_text(soup, selector)
+        if len(candidate) >= MIN_CONTENT_CHARS:
+            return SELECTOR_PREFIX + selector, candidate
+        if len(candidate) > len(best_text):
+            best_strategy, best_text = SELECTOR_PREFIX + selector, candidate
+    
+    if skip != PARAGRAPHS_STRATEGY:
+        candidate = _paragraph_text(soup)
+        if len(candidate) >= MIN_CONTENT_CHARS or len(candidate) > len(best_text):
+            return PARAGRAPHS_STRATEGY, candidate
+    return best_strategy, best_text
+
+def record_corpus_from_scrapes(corpus_dir: str, scrape_glob: Optional[str] = None) -> int:
+    """Download the article URLs referenced by saved scrapes (outputs/scrapes) into corpus_dir"""
+    from article_fetcher import AsyncArticleFetcher
+    
+    scrape_glob = scrape_glob or os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                              "outputs", "scrapes", "*.json")
+    urls = []
+    for scrape_file in sorted(glob.glob(scrape_glob)):
+        with open(scrape_file, "r", encoding="utf-8") as f:
+            for story in json.load(f).get("stories", []):
+                url = story.get("url", "")
+                if url.startswith("http") and not url.startswith("https://news.ycombinator.com") and url not in urls:
+                    urls.append(url)
+    
+    os.makedirs(corpus_dir, exist_ok=True)
+    saved = 0
+    for index, page in enumerate(AsyncArticleFetcher().fetch_all(urls)):
+        if page.get("text") and "html" in (page.get("content_type") or "html"):
+            with open(os.path.join(corpus_dir, f"page_{index:03d}.html"), "w", encoding="utf-8") as f:
+                f.write(page["text"])
+            saved += 1
+    
+    print(f"✅ Saved {saved} of {len(urls)} article pages into {corpus_dir}")
+    return saved
+
+def benchmark_extractors(corpus_dir: str) -> Dict:
+    """Compare extraction time and output length of the selector loop and the density extractor"""
+    pages = sorted(glob.glob(os.path.join(corpus_dir, "*.html")) + glob.glob(os.path.join(corpus_dir, "*.htm")))
+    if not pages:
+        print(f"⚠️ No .html pages in {corpus_dir} (record some with: python content_extractor.py record {corpus_dir})")
+        return {}
+    
+    totals = {"selectors": [0.0, 0], "density": [0.0, 0]}
+    print(f"🧪 Benchmarking extractors on {len(pages)} pages (parser: {'lxml' if LXML_AVAILABLE else 'html.parser'})")
+    for page_path in pages:
+        with open(page_path, "r", encoding="utf-8", errors="replace") as f:
+            html = f.read()
+        
+        row = []
+        for name, extractor in (("selectors", extract_with_selectors), ("density", extract_main_text)):
+            start = time.perf_counter()
+            text = extractor(html)
+            elapsed = time.perf_counter() - start
+            totals[name][0] += elapsed
+            totals[name][1] += len(text)
+            row.append(f"{name} {elapsed * 1000:6.1f}ms {len(text):>6} chars")
+        print(f"  {os.path.basename(page_path)[:30]:<30} " + " | ".join(row))
+    
+    results = {name: {"total_seconds": round(seconds, 3), "avg_ms": round(seconds * 1000 / len(pages), 2),
+                      "avg_chars": chars // len(pages)}
+               for name, (seconds, chars) in totals.items()}
+    speedup = totals["selectors"][0] / totals["density"][0] if totals["density"][0] else 0
+    print(f"\n📊 Selector loop: {results['selectors']}")
+    print(f"📊 Density extractor: {results['density']}")
+    print(f"⚡ Speedup: {speedup:.1f}x")
+    return results
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "record":
+        record_corpus_from_scrapes(sys.argv[2])
+    elif len(sys.argv) > 1 and sys.argv[1] == "benchmark":
+        benchmark_extractors(sys.argv[2] if len(sys.argv) > 2 else "article_corpus")
+    elif len(sys.argv) > 1:
+        with open(sys.argv[1], "r", encoding="utf-8", errors="replace") as f:
+            print(extract_main_text(f.read()))
+    else:
+        print("Usage: python content_extractor.py <page.html> | record <corpus_dir> | benchmark <corpus_dir>")
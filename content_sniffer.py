@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Content-Type Sniffing for Article Links
+Classifies links before and while they are fetched so videos, PDFs and binaries get
+specialised handling instead of being parsed as HTML
+"""
+
+import io
+import re
+from typing import Dict, Optional
+from urllib.parse import urlparse, quote
+
+import httpx
+
+# PDF text extraction is optional, without it PDFs are only summarised via their arXiv abstract
+try:
+    from pypdf import PdfReader
+    PYPDF_AVAILABLE = True
+except ImportError:
+    PYPDF_AVAILABLE = False
+
+VIDEO_HOSTS = ("youtube.com", "youtu.be", "vimeo.com", "twitch.tv", "tiktok.com", "dailymotion.com", "loom.com")
+AUDIO_HOSTS = ("podcasts.apple.com", "open.spotify.com", "soundcloud.com")
+VIDEO_EXTENSIONS = (".mp4", ".webm", ".mov", ".mkv", ".avi", ".m3u8")
+AUDIO_EXTENSIONS = (".mp3", ".m4a", ".ogg", ".wav", ".flac")
+BINARY_EXTENSIONS = (".zip", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".rar", ".tar", ".exe", ".msi", ".dmg",
+                     ".pkg", ".deb", ".rpm", ".apk", ".iso", ".img", ".bin", ".whl", ".jar",
+                     ".png", ".jpg", ".jpeg", ".gif", ".webp", ".svg", ".ico")
+
+# oEmbed endpoints that return a video's title and channel without downloading the page
+OEMBED_ENDPOINTS = {
+    "youtube.com": "https://www.youtube.com/oembed?format=json&url={}",
+    "youtu.be": "https://www.youtube.com/oembed?format=json&url={}",
+    "vimeo.com": "https://vimeo.com/api/oembed.json?url={}"
+}
+
+ARXIV_ID_PATTERN = re.compile(r"arxiv\.org/(?:pdf|abs)/([^?#]+?)(?:\.pdf)?(?:[?#]|$)")
+
+def _host(url: str) -> str:
+    host = urlparse(url).netloc.lower().split(":")[0]
+    return host[4:] if host.startswith("www.") else host
+
+def _host_matches(host: str, domains) -> Optional[str]:
+    for domain in domains:
+        if host == domain or host.endswith("." + domain):
+            return domain
+    return None
+
+def classify_url(url: str) -> Optional[str]:
+    """
+    Classify a link from its URL alone: 'video', 'audio', 'pdf', 'binary' or None (unknown,
+    decided from the Content-Type of the response)
+    """
+    host = _host(url)
+    path = urlparse(url).path.lower()
+    
+    if _host_matches(host, VIDEO_HOSTS) or path.endswith(VIDEO_EXTENSIONS):
+        return "video"
+    if _host_matches(host, AUDIO_HOSTS) or path.endswith(AUDIO_EXTENSIONS):
+        return "audio"
+    if path.endswith(".pdf") or (host == "arxiv.org" and path.startswith("/pdf/")):
+        return "pdf"
+    if path.endswith(BINARY_EXTENSIONS):
+        return "binary"
+    return None
+
+def classify_content_type(content_type: str) -> str:
+    """Classify a response from its Content-Type header: 'html', 'text', 'pdf', 'video', 'audio' or 'binary'"""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if not media_type or media_type in ("text/html", "application/xhtml+xml"):
+        return "html"
+    if media_type == "application/pdf":
+        return "pdf"
+    if media_type.startswith("video/"):
+        return "video"
+    if media_type.startswith("audio/"):
+        return "audio"
+    if media_type.startswith("text/") or media_type in ("application/xml", "application/json"):
+        return "text"
+    return "binary"
+
+def is_metadata_only(kind: str) -> bool:
+    """Kinds summarised without reading their body: media, binaries and, without pypdf, PDFs"""
+    return kind in ("video", "audio", "binary") or (kind == "pdf" and not PYPDF_AVAILABLE)
+
+def arxiv_abs_url(url: str) -> Optional[str]:
+    """The abstract page for an arXiv PDF link (title and abstract in a few KB of HTML)"""
+    match = ARXIV_ID_PATTERN.search(url)
+    if not match or "arxiv.org" not in _host(url):
+        return None
+    return f"https://arxiv.org/abs/{match.group(1)}"
+
+def extract_pdf_text(data: bytes, max_pages: int = 3) -> str:
+    """Text of the first pages of a (possibly truncated) PDF; empty when it cannot be read"""
+    if not PYPDF_AVAILABLE or not data:
+        return ""
+    try:
+        reader = PdfReader(io.BytesIO(data), strict=False)
+        pages = []
+        for page in reader.pages[:max_pages]:
+            pages.append(page.extract_text() or "")
+        return " ".join(" ".join(pages).split())
+    except Exception as e:
+        # Truncated downloads without a usable cross-reference table end up here
+        print(f"⚠️ Could not read PDF text: {e}")
+        return ""
+
+def fetch_video_metadata(url: str, timeout: float = 10.0) -> Dict:
+    """Title and channel of a video via oEmbed (no page download); empty dict if unsupported"""
+    domain = _host_matches(_host(url), OEMBED_ENDPOINTS.keys())
+    if not domain:
+        return {}
+    try:
+        response = httpx.get(OEMBED_ENDPOINTS[domain].format(quote(url, safe="")), timeout=timeout,
+                             follow_redirects=True)
+        response.raise_for_status()
+        data = response.json()
+        return {"title": data.get("title"), "author": data.get("author_name"), "provider": data.get("provider_name")}
+    except Exception as e:
+        print(f"⚠️ Could not fetch video metadata for {url[:50]}: {e}")
+        return {}
+
+def describe_media(kind: str, metadata: Optional[Dict] = None) -> str:
+    """Summary line for media links, matching the wording of the existing short-content fallbacks"""
+    metadata = metadata or {}
+    details = ""
+    if metadata.get("title"):
+        details = f' "{metadata["title"]}"'
+        if metadata.get("author"):
+            details += f" by {metadata['author']}"
+    if kind == "audio":
+        return f"This is a podcast{details} - we recommend listening to it for the full content."
+    if kind == "pdf":
+        return f"This link is a PDF document{details} - we recommend opening it for the full content."
+    return f"This link shows a video{details} - we recommend watching it for the full content."
@@ -15,6 +15,8 @@ from typing import Optional
 import os
 import uvicorn
 import secrets
+import time
+import threading
 
 import sys
 import os
@@ -77,6 +79,11 @@ ADMIN_TOP_USERS_LIMIT = int(os.getenv("ADMIN_TOP_USERS_LIMIT", "10"))  # Top use
 # This will use DATABASE_URL from environment if set, otherwise defaults to SQLite
 db = DatabaseManager()
 
+# Shared AI resources (embedding model, OpenAI client, caches) reuse this database manager
+from ai_resources import registry as ai_resources, warm_ai_resources
+ai_resources.provide("database", db)
+AI_WARM_ON_STARTUP = os.getenv("AI_WARM_ON_STARTUP", "true").lower() == "true"
+
 # Admin authentication
 security = HTTPBasic(auto_error=False)  # Don't auto-raise 401
 ADMIN_USERNAME = "admin"
@@ -127,6 +134,12 @@ async def startup_event():
         init_interest_weights(db)
         print("✅ Initialized default interest weights")
     
+    # Load the embedding model and AI caches in the background, so the first signup or dashboard
+    # visit that needs relevance scoring does not pay for it
+    if AI_WARM_ON_STARTUP:
+        print("🔄 Warming AI resources in the background...")
+        warm_ai_resources()
+    
     # Auto-import disabled for testing
     # TODO: Re-enable when needed for production
     # import glob
@@ -479,6 +492,52 @@ async def api_stories(target_date: str):
         ]
     }
 
+# Similar-stories index over stored story embeddings, opened on first use and caught up with
+# stories imported since at most every STORY_INDEX_SYNC_SECONDS
+STORY_INDEX_SYNC_SECONDS = int(os.getenv("STORY_INDEX_SYNC_SECONDS", "60"))
+story_index = None
+story_index_synced_at = 0.0
+story_index_lock = threading.Lock()
+
+def get_story_index():
+    """The shared index; one request at a time opens or catches it up, the others search it as it is"""
+    global story_index, story_index_synced_at
+    from ai_pipeline import EMBEDDING_MODEL_NAME, STORY_EMBEDDING_VERSION
+    from ann_index import open_story_index, sync_story_index
+    
+    if story_index_lock.acquire(blocking=story_index is None):
+        try:
+            if story_index is None:
+                story_index = open_story_index(EMBEDDING_MODEL_NAME, STORY_EMBEDDING_VERSION)
+            if time.time() - story_index_synced_at > STORY_INDEX_SYNC_SECONDS:
+                sync_story_index(story_index, db, EMBEDDING_MODEL_NAME, STORY_EMBEDDING_VERSION)
+                story_index_synced_at = time.time()
+        finally:
+            story_index_lock.release()
+    return story_index
+
+# A plain def, so FastAPI runs it in its threadpool: a sync (decoding new embeddings, possibly retraining
+# the k-means centroids) must not block the event loop
+@app.get("/api/similar/{story_id}")
+def api_similar_stories(story_id: int, limit: int = 10):
+    """API endpoint to get the stories most similar to a story across the whole archive"""
+    try:
+        similar = get_story_index().similar_stories(story_id, k=max(1, min(limit, 50)))
+    except Exception as e:
+        print(f"❌ Error searching similar stories: {e}")
+        raise HTTPException(status_code=503, detail="Similar stories are not available")
+    if similar is None:
+        raise HTTPException(status_code=404, detail="Story not found or not indexed yet")
+    
+    stories = db.get_stories_by_ids([similar_id for similar_id, _ in similar])
+    return {
+        "story_id": story_id,
+        "similar": [
+            dict(stories[similar_id], similarity=round(score, 4))
+            for similar_id, score in similar if similar_id in stories
+        ]
+    }
+
 @app.post("/api/interaction/{user_id}/{story_id}")
 async def log_story_interaction(user_id: str, story_id: int, interaction_type: str = Form(...), duration: Optional[int] = Form(None)):
     """Log user interaction with a story for learning system"""
@@ -372,6 +372,66 @@ class DatabaseManager:
                     )
                 """)
             
+            # Story embedding vectors (float32 bytes), written once at ingest so relevance for new users
+            # and recalculations is vector maths without re-encoding every historical story
+            if self.db_type == 'sqlite':
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS story_embeddings (
+                        story_id INTEGER PRIMARY KEY,
+                        model TEXT NOT NULL,
+                        model_version TEXT NOT NULL,
+                        dim INTEGER NOT NULL,
+                        encoding TEXT NOT NULL DEFAULT 'float32',
+                        embedding BLOB NOT NULL,
+                        created_at TEXT NOT NULL,
+                        FOREIGN KEY (story_id) REFERENCES stories (id)
+                    )
+                """)
+            else:  # PostgreSQL
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS story_embeddings (
+                        story_id INTEGER PRIMARY KEY,
+                        model TEXT NOT NULL,
+                        model_version TEXT NOT NULL,
+                        dim INTEGER NOT NULL,
+                        encoding TEXT NOT NULL DEFAULT 'float32',
+                        embedding BYTEA NOT NULL,
+                        created_at TEXT NOT NULL,
+                        FOREIGN KEY (story_id) REFERENCES stories (id)
+                    )
+                """)
+            
+            # Add encoding column (float32/float16/int8) if it doesn't exist (migration)
+            if self.db_type == 'sqlite':
+                try:
+                    cursor.execute("ALTER TABLE story_embeddings ADD COLUMN encoding TEXT NOT NULL DEFAULT 'float32'")
+                except sqlite3.OperationalError:
+                    pass  # Column already exists
+            else:  # PostgreSQL
+                cursor.execute("""
+                    DO $$ 
+                    BEGIN
+                        BEGIN
+                            ALTER TABLE story_embeddings ADD COLUMN encoding TEXT NOT NULL DEFAULT 'float32';
+                        EXCEPTION
+                            WHEN duplicate_column THEN NULL;
+                        END;
+                    END $$;
+                """)
+            
+            # Shared AI cache (article summaries, comment analyses, relevance refinements) so every
+            # process and replica reuses the same OpenAI results instead of keeping its own local cache
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS ai_cache (
+                    namespace TEXT NOT NULL,
+                    cache_key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (namespace, cache_key)
+                )
+            """)
+            
             conn.commit()
             
             # Create indexes for better performance (after tables are created)
@@ -391,6 +451,7 @@ class DatabaseManager:
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_relevance_user_story ON user_story_relevance (user_id, story_id)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_relevance_user ON user_story_relevance (user_id)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_notes_user_story ON story_notes (user_id, story_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_ai_cache_updated ON ai_cache (namespace, updated_at)")
         except Exception as e:
             print(f"⚠️ Index creation warning: {e}")
     
@@ -1466,6 +1527,18 @@ class DatabaseManager:
                 """, (user_id, keyword, weight, category, datetime.now().isoformat()))
             
             conn.commit()
+        
+        self._invalidate_interest_embeddings(user_id)
+    
+    def _invalidate_interest_embeddings(self, user_id: str):
+        """Drop the AI pipeline's cached embeddings of a user's interests after they change"""
+        try:
+            import sys
+            sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+            from interest_embeddings import invalidate_user_interest_embeddings
+            invalidate_user_interest_embeddings(user_id)
+        except Exception as e:
+            print(f"⚠️ Could not invalidate interest embeddings for {user_id}: {e}")
     
     def get_user_interest_weights(self, user_id: str) -> List[UserInterestWeight]:
         """Get all interest weights for a specific user"""
@@ -1496,7 +1569,10 @@ class DatabaseManager:
                 DELETE FROM user_interest_weights WHERE user_id = {placeholder} AND id = {placeholder}
             """, (user_id, interest_id))
             conn.commit()
-            return cursor.rowcount > 0  # Returns True if a row was deleted
+            deleted = cursor.rowcount > 0  # True if a row was deleted
+        
+        self._invalidate_interest_embeddings(user_id)
+        return deleted
     
     def copy_default_interests_to_user(self, user_id: str):
         """Copy default interest weights to a new user"""
@@ -1606,6 +1682,63 @@ class DatabaseManager:
         except Exception as e:
             print(f"⚠️ Migration warning: {e}")
 
+    def _process_user_relevance(self, ai_pipeline, user_id: str, user_interests: Dict[str, List[str]],
+                                story_rows: List[Tuple], stats: Dict[str, int]):
+        """
+        Score and store relevance of story rows (id, title, url, article_summary, ...) for a user
+        Story vectors come from story_embeddings in bulk and all stories are scored in one matrix product
+        """
+        pending = []
+        for story_row in story_rows:
+            story_id, title, url, article_summary = story_row[:4]
+            
+            # Check if relevance already calculated
+            existing_relevance = self.get_user_story_relevance(user_id, story_id)
+            if existing_relevance:
+                stats['cached_stories'] += 1
+                if existing_relevance.is_relevant:
+                    stats['relevant_stories'] += 1
+                continue
+            
+            pending.append({
+                'id': story_id,
+                'title': title,
+                'url': url,
+                'article_summary': article_summary
+            })
+        
+        if not pending:
+            return
+        
+        # Convert user interests to expected format
+        formatted_interests = {
+            'high_priority': user_interests.get('high', []),
+            'medium_priority': user_interests.get('medium', []),
+            'low_priority': user_interests.get('low', [])
+        }
+        
+        # Calculate relevance using AI pipeline (no model inference for stories with stored vectors)
+        story_embeddings = ai_pipeline.load_story_embeddings(self, pending)
+        relevance_table = ai_pipeline.score_relevance_for_users(
+            pending, [(user_id, formatted_interests)], story_embeddings=story_embeddings
+        )
+        
+        for index, story_data in enumerate(pending):
+            is_relevant, relevance_score, relevance_reasoning = relevance_table.for_user(user_id, index)
+            
+            # Store relevance data
+            self.store_user_story_relevance(
+                user_id=user_id,
+                story_db_id=story_data['id'],
+                is_relevant=is_relevant,
+                relevance_score=relevance_score,
+                relevance_reasoning=relevance_reasoning
+            )
+            
+            stats['processed_stories'] += 1
+            if is_relevant:
+                stats['relevant_stories'] += 1
+    
     def batch_process_user_relevance(self, user_id: str, limit_days: int = 30) -> Dict[str, int]:
         """
         Process relevance for all existing stories for a new user.
@@ -1613,9 +1746,9 @@ class DatabaseManager:
         """
         import sys
         import os
-        # Add parent directory to path to import ai_pipeline
+        # Add parent directory to path to import ai_resources
         sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        from ai_pipeline import CostOptimisedAI
+        from ai_resources import get_ai_pipeline
         
         stats = {
             'total_stories': 0,
@@ -1629,8 +1762,8 @@ class DatabaseManager:
         if not any(user_interests.values()):
             return stats  # No interests to process
         
-        # Initialize AI pipeline
-        ai_pipeline = CostOptimisedAI()
+        # Shared AI pipeline (model and caches are loaded once per process, not per request)
+        ai_pipeline = get_ai_pipeline()
         
         # Get all recent stories (limit to last N days for performance)
         with self.get_connection() as conn:
@@ -1654,50 +1787,8 @@ class DatabaseManager:
             
             stories = cursor.fetchall()
             stats['total_stories'] = len(stories)
-            
-            # Process each story
-            for story_row in stories:
-                story_id, title, url, article_summary, comments_analysis_json, tags_json = story_row
-                
-                # Check if relevance already calculated
-                existing_relevance = self.get_user_story_relevance(user_id, story_id)
-                if existing_relevance:
-                    stats['cached_stories'] += 1
-                    if existing_relevance.is_relevant:
-                        stats['relevant_stories'] += 1
-                    continue
-                
-                # Prepare story data for relevance check
-                story_data = {
-                    'title': title,
-                    'url': url,
-                    'article_summary': article_summary
-                }
-                
-                # Convert user interests to expected format
-                formatted_interests = {
-                    'high_priority': user_interests.get('high', []),
-                    'medium_priority': user_interests.get('medium', []),
-                    'low_priority': user_interests.get('low', [])
-                }
-                
-                # Calculate relevance using AI pipeline
-                is_relevant, relevance_score, relevance_reasoning = ai_pipeline.is_relevant_story_local(
-                    story_data, formatted_interests
-                )
-                
-                # Store relevance data
-                self.store_user_story_relevance(
-                    user_id=user_id,
-                    story_db_id=story_id,
-                    is_relevant=is_relevant,
-                    relevance_score=relevance_score,
-                    relevance_reasoning=relevance_reasoning
-                )
-                
-                stats['processed_stories'] += 1
-                if is_relevant:
-                    stats['relevant_stories'] += 1
+        
+        self._process_user_relevance(ai_pipeline, user_id, user_interests, stories, stats)
         
         return stats
     
@@ -1708,9 +1799,9 @@ class DatabaseManager:
         """
         import sys
         import os
-        # Add parent directory to path to import ai_pipeline
+        # Add parent directory to path to import ai_resources
         sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        from ai_pipeline import CostOptimisedAI
+        from ai_resources import get_ai_pipeline
         
         stats = {
             'total_stories': 0,
@@ -1727,8 +1818,8 @@ class DatabaseManager:
             return stats  # No interests to process
         print(f"✅ Found interests: {sum(len(v) for v in user_interests.values())} total")
         
-        # Initialize AI pipeline
-        ai_pipeline = CostOptimisedAI()
+        # Shared AI pipeline (model and caches are loaded once per process, not per request)
+        ai_pipeline = get_ai_pipeline()
         
         # Get stories from the start date onwards
         with self.get_connection() as conn:
@@ -1752,50 +1843,8 @@ class DatabaseManager:
             
             stories = cursor.fetchall()
             stats['total_stories'] = len(stories)
-            
-            # Process each story
-            for story_row in stories:
-                story_id, title, url, article_summary, comments_analysis_json, tags_json = story_row
-                
-                # Check if relevance already calculated
-                existing_relevance = self.get_user_story_relevance(user_id, story_id)
-                if existing_relevance:
-                    stats['cached_stories'] += 1
-                    if existing_relevance.is_relevant:
-                        stats['relevant_stories'] += 1
-                    continue
-                
-                # Prepare story data for relevance check
-                story_data = {
-                    'title': title,
-                    'url': url,
-                    'article_summary': article_summary
-                }
-                
-                # Convert user interests to expected format
-                formatted_interests = {
-                    'high_priority': user_interests.get('high', []),
-                    'medium_priority': user_interests.get('medium', []),
-                    'low_priority': user_interests.get('low', [])
-                }
-                
-                # Calculate relevance using AI pipeline
-                is_relevant, relevance_score, relevance_reasoning = ai_pipeline.is_relevant_story_local(
-                    story_data, formatted_interests
-                )
-                
-                # Store relevance data
-                self.store_user_story_relevance(
-                    user_id=user_id,
-                    story_db_id=story_id,
-                    is_relevant=is_relevant,
-                    relevance_score=relevance_score,
-                    relevance_reasoning=relevance_reasoning
-                )
-                
-                stats['processed_stories'] += 1
-                if is_relevant:
-                    stats['relevant_stories'] += 1
+        
+        self._process_user_relevance(ai_pipeline, user_id, user_interests, stories, stats)
         
         return stats
     
@@ -1954,6 +2003,191 @@ class DatabaseManager:
                 print(f"❌ Error deleting user {user_id}: {str(e)}")
                 return False
     
+    def store_story_embeddings(self, embeddings: List[Tuple[int, bytes, int]], model: str, model_version: str,
+                               encoding: str = 'float32'):
+        """Insert or replace story vectors given as (story_db_id, vector bytes, dim) in the given encoding"""
+        if not embeddings:
+            return
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            now = datetime.now().isoformat()
+            placeholder = self._get_placeholder()
+            rows = [(story_id, model, model_version, dim, encoding, vector, now) for story_id, vector, dim in embeddings]
+            
+            if self.db_type == 'sqlite':
+                cursor.executemany(f"""
+                    INSERT OR REPLACE INTO story_embeddings (story_id, model, model_version, dim, encoding, embedding, created_at)
+                    VALUES ({placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder})
+                """, rows)
+            else:  # PostgreSQL
+                cursor.executemany(f"""
+                    INSERT INTO story_embeddings (story_id, model, model_version, dim, encoding, embedding, created_at)
+                    VALUES ({placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder})
+                    ON CONFLICT (story_id) DO UPDATE SET
+                    model = EXCLUDED.model,
+                    model_version = EXCLUDED.model_version,
+                    dim = EXCLUDED.dim,
+                    encoding = EXCLUDED.encoding,
+                    embedding = EXCLUDED.embedding,
+                    created_at = EXCLUDED.created_at
+                """, rows)
+            
+            conn.commit()
+    
+    def get_story_embeddings(self, story_db_ids: List[int], model: str, model_version: str) -> Dict[int, Tuple[bytes, int, str]]:
+        """Stored vectors of the given stories as {story_db_id: (vector bytes, dim, encoding)}, only for this model and version"""
+        embeddings = {}
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            placeholder = self._get_placeholder()
+            
+            # Chunked to stay under the bound parameter limit
+            for start in range(0, len(story_db_ids), 500):
+                chunk = story_db_ids[start:start + 500]
+                cursor.execute(f"""
+                    SELECT story_id, embedding, dim, encoding FROM story_embeddings
+                    WHERE model = {placeholder} AND model_version = {placeholder}
+                    AND story_id IN ({', '.join([placeholder] * len(chunk))})
+                """, (model, model_version, *chunk))
+                for story_id, vector, dim, encoding in cursor.fetchall():
+                    embeddings[story_id] = (bytes(vector), dim, encoding)
+        return embeddings
+    
+    def get_story_embedding_ids(self, model: str, model_version: str) -> List[int]:
+        """Ids of all stories with a stored vector for this model and version"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            placeholder = self._get_placeholder()
+            cursor.execute(f"""
+                SELECT story_id FROM story_embeddings
+                WHERE model = {placeholder} AND model_version = {placeholder}
+                ORDER BY story_id
+            """, (model, model_version))
+            return [row[0] for row in cursor.fetchall()]
+    
+    def get_stories_without_embeddings(self, model: str, model_version: str) -> List[Dict]:
+        """Stories (id, title, url) with no stored vector for this model and version"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            placeholder = self._get_placeholder()
+            cursor.execute(f"""
+                SELECT s.id, s.title, s.url FROM stories s
+                LEFT JOIN story_embeddings e
+                ON e.story_id = s.id AND e.model = {placeholder} AND e.model_version = {placeholder}
+                WHERE e.story_id IS NULL
+                ORDER BY s.id
+            """, (model, model_version))
+            return [{'id': row[0], 'title': row[1], 'url': row[2]} for row in cursor.fetchall()]
+    
+    def get_stories_by_ids(self, story_db_ids: List[int]) -> Dict[int, Dict]:
+        """Basic details of the given stories as {story_db_id: {...}}"""
+        stories = {}
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            placeholder = self._get_placeholder()
+            
+            for start in range(0, len(story_db_ids), 500):
+                chunk = story_db_ids[start:start + 500]
+                cursor.execute(f"""
+                    SELECT id, date, rank, title, url, points, comments_count, hn_discussion_url
+                    FROM stories WHERE id IN ({', '.join([placeholder] * len(chunk))})
+                """, tuple(chunk))
+                for row in cursor.fetchall():
+                    stories[row[0]] = {
+                        'id': row[0],
+                        'date': row[1],
+                        'rank': row[2],
+                        'title': row[3],
+                        'url': row[4],
+                        'points': row[5],
+                        'comments_count': row[6],
+                        'hn_discussion_url': row[7]
+                    }
+        return stories
+    
+    def get_ai_cache_entry(self, namespace: str, cache_key: str) -> Optional[Dict]:
+        """Get a shared AI cache entry (decoded JSON), or None"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            placeholder = self._get_placeholder()
+            cursor.execute(f"""
+                SELECT value FROM ai_cache WHERE namespace = {placeholder} AND cache_key = {placeholder}
+            """, (namespace, cache_key))
+            result = cursor.fetchone()
+            return json.loads(result[0]) if result else None
+    
+    def set_ai_cache_entry(self, namespace: str, cache_key: str, value: Dict):
+        """Insert or replace a shared AI cache entry"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            now = datetime.now().isoformat()
+            placeholder = self._get_placeholder()
+            
+            if self.db_type == 'sqlite':
+                cursor.execute(f"""
+                    INSERT OR REPLACE INTO ai_cache (namespace, cache_key, value, created_at, updated_at)
+                    VALUES ({placeholder}, {placeholder}, {placeholder},
+                        COALESCE((SELECT created_at FROM ai_cache WHERE namespace = {placeholder} AND cache_key = {placeholder}), {placeholder}),
+                        {placeholder})
+                """, (namespace, cache_key, json.dumps(value), namespace, cache_key, now, now))
+            else:  # PostgreSQL
+                cursor.execute(f"""
+                    INSERT INTO ai_cache (namespace, cache_key, value, created_at, updated_at)
+                    VALUES ({placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder})
+                    ON CONFLICT (namespace, cache_key) DO UPDATE SET
+                    value = EXCLUDED.value,
+                    updated_at = EXCLUDED.updated_at
+                """, (namespace, cache_key, json.dumps(value), now, now))
+            
+            conn.commit()
+    
+    def delete_ai_cache_entry(self, namespace: str, cache_key: str) -> bool:
+        """Delete a shared AI cache entry, returns True if it existed"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            placeholder = self._get_placeholder()
+            cursor.execute(f"""
+                DELETE FROM ai_cache WHERE namespace = {placeholder} AND cache_key = {placeholder}
+            """, (namespace, cache_key))
+            deleted = cursor.rowcount
+            conn.commit()
+            return deleted > 0
+    
+    def count_ai_cache_entries(self, namespace: str) -> int:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            placeholder = self._get_placeholder()
+            cursor.execute(f"SELECT COUNT(*) FROM ai_cache WHERE namespace = {placeholder}", (namespace,))
+            return cursor.fetchone()[0]
+    
+    def prune_ai_cache(self, namespace: str, older_than: Optional[str] = None, max_entries: int = 0) -> int:
+        """
+        Delete shared AI cache entries last written before older_than (ISO timestamp),
+        then all but the max_entries most recently written ones. Returns the number deleted
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            placeholder = self._get_placeholder()
+            deleted = 0
+            
+            if older_than:
+                cursor.execute(f"""
+                    DELETE FROM ai_cache WHERE namespace = {placeholder} AND updated_at < {placeholder}
+                """, (namespace, older_than))
+                deleted += cursor.rowcount
+            
+            if max_entries:
+                cursor.execute(f"""
+                    DELETE FROM ai_cache WHERE namespace = {placeholder} AND cache_key NOT IN (
+                        SELECT cache_key FROM ai_cache WHERE namespace = {placeholder}
+                        ORDER BY updated_at DESC LIMIT {placeholder}
+                    )
+                """, (namespace, namespace, max_entries))
+                deleted += cursor.rowcount
+            
+            conn.commit()
+            return deleted
+    
     def close(self):
         """Close database connection (SQLite auto-closes, but good practice)"""
         pass
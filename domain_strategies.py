@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Per-Domain Extraction Strategy Cache
+Remembers which content extraction strategy worked for each site so later articles from the
+same domain try the winner first instead of re-running the full discovery
+"""
+
+import os
+import json
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from content_extractor import MIN_CONTENT_CHARS, discover_strategy, extract_with_strategy
+
+# Hosting platforms whose sites share one layout, keyed by the platform rather than the subdomain
+PLATFORM_SUFFIXES = ("substack.com", "github.io", "medium.com", "wordpress.com", "blogspot.com",
+                     "bearblog.dev", "ghost.io")
+
+class DomainStrategyCache:
+    def __init__(self, cache_file: str = os.path.join(".ai_cache", "domain_strategies.json"),
+                 min_success_rate: float = 0.6, flush_every: int = 50):
+        """
+        Load the persisted per-domain strategies (a JSON file next to the other AI caches)
+        Updates are written in batches: by flush() at the end of each article batch, on close() and
+        after every flush_every updates
+        """
+        self.cache_file = cache_file
+        self.min_success_rate = min_success_rate
+        self.flush_every = flush_every
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._pending = 0  # Updates not yet on disk
+        self.strategies = self._load()
+        
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.relearned = 0
+    
+    @staticmethod
+    def domain_key(url: str) -> str:
+        host = urlparse(url).netloc.lower().split(":")[0]
+        if host.startswith("www."):
+            host = host[4:]
+        for suffix in PLATFORM_SUFFIXES:
+            if host == suffix or host.endswith("." + suffix):
+                return suffix
+        return host
+    
+    def _load(self) -> Dict:
+        if os.path.exists(self.cache_file):
+            try:
+                with open(self.cache_file, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"⚠️ Error loading domain strategy cache: {e}")
+        return {}
+    
+    def flush(self):
+        """Write pending updates to disk (the snapshot is taken under the lock, the file written outside it)"""
+        with self._lock:
+            if not self._pending:
+                return
+            data = json.dumps(self.strategies, indent=2)
+            self._pending = 0
+        with self._save_lock:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.cache_file)), exist_ok=True)
+                tmp_file = self.cache_file + ".tmp"
+                with open(tmp_file, "w", encoding="utf-8") as f:
+                    f.write(data)
+                os.replace(tmp_file, self.cache_file)
+            except Exception as e:
+                print(f"⚠️ Error saving domain strategy cache: {e}")
+    
+    def close(self):
+        self.flush()
+    
+    @staticmethod
+    def _success_rate(entry: Dict) -> float:
+        return entry["successes"] / entry["attempts"] if entry.get("attempts") else 0.0
+    
+    def preferred_strategy(self, domain: str) -> Optional[str]:
+        """The domain's learned strategy, if it has been reliable enough to try on its own"""
+        entry = self.strategies.get(domain)
+        if not entry or self._success_rate(entry) < self.min_success_rate:
+            return None
+        return entry["strategy"]
+    
+    def record(self, domain: str, strategy: str, success: bool):
+        """Count an extraction; another strategy only replaces a winner whose success rate fell below the minimum"""
+        with self._lock:
+            entry = self.strategies.get(domain)
+            if entry and entry["strategy"] != strategy:
+                if self._success_rate(entry) >= self.min_success_rate:
+                    return  # One odd page does not unseat an established winner
+                entry = None
+            if not entry:
+                # A newly discovered winner starts its own track record
+                entry = {"strategy": strategy, "successes": 0, "attempts": 0}
+                self.strategies[domain] = entry
+            entry["attempts"] += 1
+            entry["successes"] += int(success)
+            entry["updated_at"] = datetime.now().isoformat()
+            self._pending += 1
+            flush = self._pending >= self.flush_every
+        if flush:
+            self.flush()
+    
+    def extract(self, url: str, html: str) -> str:
+        """Extract an article's text, trying the domain's winning strategy before full discovery"""
+        domain = self.domain_key(url)
+        preferred = self.preferred_strategy(domain)
+        
+        tried = None
+        if preferred:
+            text = extract_with_strategy(html, preferred)
+            if len(text) >= MIN_CONTENT_CHARS:
+                self.hits += 1
+                self.record(domain, preferred, True)
+                return text
+            # The site changed layout (or this page is unusual), count the miss and rediscover
+            # with the other strategies
+            self.relearned += 1
+            self.record(domain, preferred, False)
+            tried = (preferred, text)
+        else:
+            self.misses += 1
+        
+        strategy, text = discover_strategy(html, tried)
+        success = len(text) >= MIN_CONTENT_CHARS
+        if success or domain not in self.strategies:
+            # A failed discovery on one odd page does not overwrite a domain's known winner,
+            # and a successful one only does once the winner has become unreliable (see record)
+            self.record(domain, strategy, success)
+        return text
+    
+    def stats(self) -> Dict:
+        return {
+            "domains": len(self.strategies),
+            "hits": self.hits,
+            "misses": self.misses,
+            "relearned": self.relearned
+        }
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+WebDriver Session Pool for HN Scraper
+Keeps warm browser sessions, health-checks them before lending and recycles them to contain memory growth
+"""
+
+import time
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List
+
+class PooledSession:
+    """A WebDriver session plus the bookkeeping the pool needs"""
+    
+    def __init__(self, driver):
+        self.driver = driver
+        self.created_at = time.monotonic()
+        self.page_loads = 0
+        
+        # Count page loads on this session so it can be recycled after a configurable number
+        original_get = driver.get
+        
+        def counting_get(url):
+            self.page_loads += 1
+            return original_get(url)
+        
+        driver.get = counting_get
+    
+    @property
+    def age_seconds(self) -> float:
+        return time.monotonic() - self.created_at
+
+class WebDriverPool:
+    def __init__(self, driver_factory: Callable, size: int = 1, max_page_loads: int = 50,
+                 checkout_timeout: float = 300):
+        """
+        Pool of up to `size` WebDriver sessions created by driver_factory
+        Sessions are started lazily on first checkout (or eagerly with warm_up)
+        """
+        self.driver_factory = driver_factory
+        self.size = max(1, size)
+        self.max_page_loads = max_page_loads
+        self.checkout_timeout = checkout_timeout
+        
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._open_sessions = []
+        self._closed = False
+        
+        # Metrics
+        self.sessions_created = 0
+        self.recycle_count = 0
+        self.checkouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+    
+    def warm_up(self, count: int = None):
+        """Start sessions ahead of time so the first checkouts do not pay the startup cost"""
+        count = min(count or self.size, self.size)
+        while True:
+            with self._lock:
+                if len(self._open_sessions) >= count:
+                    break
+            pooled = self._reserve_and_create()
+            if pooled is None:
+                break
+            self._return(pooled)
+    
+    @contextmanager
+    def session(self):
+        """Check out a healthy WebDriver for the duration of the block"""
+        pooled = self._checkout()
+        try:
+            yield pooled.driver
+        finally:
+            self._return(pooled)
+    
+    def drivers(self) -> List:
+        """Drivers of all currently open sessions"""
+        with self._lock:
+            return [pooled.driver for pooled in self._open_sessions if pooled is not None]
+    
+    def _checkout(self) -> PooledSession:
+        start = time.monotonic()
+        
+        try:
+            pooled = self._idle.get_nowait()
+        except queue.Empty:
+            pooled = self._reserve_and_create()
+            if pooled is None:
+                # Pool is at capacity, wait for another worker to hand a session back
+                try:
+                    pooled = self._idle.get(timeout=self.checkout_timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"No WebDriver session became available within {self.checkout_timeout}s")
+        
+        # Liveness probe and page-load budget before lending the session out
+        if pooled.page_loads >= self.max_page_loads:
+            print(f"♻️ Recycling WebDriver session after {pooled.page_loads} page loads")
+            pooled = self._recycle(pooled)
+        elif not self._is_alive(pooled):
+            print("♻️ Recycling unresponsive WebDriver session")
+            pooled = self._recycle(pooled)
+        
+        wait_seconds = time.monotonic() - start
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+        
+        return pooled
+    
+    def _return(self, pooled: PooledSession):
+        # Checked under the lock so a session handed back while close() runs is quit, not left idle
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                self._idle.put(pooled)
+        if closed:
+            self._discard(pooled)
+    
+    def _reserve_and_create(self):
+        """Create a new session if the pool has room, otherwise return None"""
+        with self._lock:
+            if len(self._open_sessions) >= self.size:
+                return None
+            # Hold the slot while the (slow) browser starts
+            self._open_sessions.append(None)
+        return self._create_in_reserved_slot()
+    
+    def _create_in_reserved_slot(self) -> PooledSession:
+        try:
+            pooled = PooledSession(self.driver_factory())
+        except Exception:
+            with self._lock:
+                self._open_sessions.remove(None)
+            raise
+        
+        with self._lock:
+            self._open_sessions[self._open_sessions.index(None)] = pooled
+            self.sessions_created += 1
+        return pooled
+    
+    def _recycle(self, pooled: PooledSession) -> PooledSession:
+        """Quit a session and replace it with a fresh one in the same slot"""
+        with self._lock:
+            self._open_sessions[self._open_sessions.index(pooled)] = None
+            self.recycle_count += 1
+        self._quit(pooled)
+        return self._create_in_reserved_slot()
+    
+    def _discard(self, pooled: PooledSession):
+        with self._lock:
+            if pooled in self._open_sessions:
+                self._open_sessions.remove(pooled)
+        self._quit(pooled)
+    
+    def _quit(self, pooled: PooledSession):
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            print(f"⚠️ Error quitting WebDriver session: {e}")
+    
+    def _is_alive(self, pooled: PooledSession) -> bool:
+        """Cheap round trip to make sure the browser session still responds"""
+        try:
+            return pooled.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+    
+    def metrics(self) -> Dict:
+        """Pool metrics: wait time, session age and recycle count"""
+        with self._lock:
+            open_sessions = [pooled for pooled in self._open_sessions if pooled is not None]
+            return {
+                "size": self.size,
+                "open_sessions": len(open_sessions),
+                "sessions_created": self.sessions_created,
+                "recycle_count": self.recycle_count,
+                "checkouts": self.checkouts,
+                "avg_wait_seconds": round(self.total_wait_seconds / self.checkouts, 3) if self.checkouts else 0.0,
+                "max_wait_seconds": round(self.max_wait_seconds, 3),
+                "session_ages_seconds": [round(pooled.age_seconds, 1) for pooled in open_sessions],
+                "session_page_loads": [pooled.page_loads for pooled in open_sessions]
+            }
+    
+    def close(self):
+        """Quit every idle session; sessions still checked out (or still starting) are quit when returned"""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(pooled)
+        with self._lock:
+            checked_out = len(self._open_sessions)
+        if checked_out:
+            print(f"⏳ {checked_out} WebDriver session(s) still in use, quitting them as they are returned")
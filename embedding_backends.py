@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Pluggable Sentence Encoder Backends
+"torch" runs the model through sentence-transformers/PyTorch; "onnx" runs the same model's ONNX export
+with ONNX Runtime and a Rust tokenizer (tokenizer, transformer, mean pooling, L2 normalisation, as
+all-MiniLM-L6-v2 does), without importing PyTorch. Both expose encode() and
+get_sentence_embedding_dimension() like SentenceTransformer, so callers do not care which one runs
+"""
+
+import os
+import sys
+import json
+import glob
+import time
+import subprocess
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# The ONNX backend is optional, without onnxruntime and tokenizers the torch backend is used
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+try:
+    from tokenizers import Tokenizer
+    TOKENIZERS_AVAILABLE = True
+except ImportError:
+    TOKENIZERS_AVAILABLE = False
+
+try:
+    from huggingface_hub import hf_hub_download
+    HF_HUB_AVAILABLE = True
+except ImportError:
+    HF_HUB_AVAILABLE = False
+
+EMBEDDING_BACKENDS = ("torch", "onnx")
+DEFAULT_EMBEDDING_BACKEND = os.getenv('EMBEDDING_BACKEND', 'torch')
+# 0 leaves the thread pools at the runtime's default (one thread per core)
+EMBEDDING_THREADS = int(os.getenv('EMBEDDING_THREADS', '0'))
+EMBEDDING_INTER_OP_THREADS = int(os.getenv('EMBEDDING_INTER_OP_THREADS', '0'))
+# Directory with model.onnx and tokenizer.json; empty downloads the export published with the model
+ONNX_MODEL_DIR = os.getenv('ONNX_MODEL_DIR', '')
+ONNX_MODEL_FILE = os.getenv('ONNX_MODEL_FILE', 'onnx/model.onnx')
+MAX_SEQ_LENGTH = 256  # all-MiniLM-L6-v2's max_seq_length in sentence-transformers
+
+class TorchEncoder:
+    def __init__(self, model_name: str, intra_op_threads: int = 0, inter_op_threads: int = 0):
+        """SentenceTransformer on CPU (imports PyTorch)"""
+        import torch
+        from sentence_transformers import SentenceTransformer
+        
+        if intra_op_threads:
+            torch.set_num_threads(intra_op_threads)
+        if inter_op_threads:
+            try:
+                torch.set_num_interop_threads(inter_op_threads)
+            except RuntimeError:
+                pass  # Can only be set before PyTorch's first parallel work
+        self.backend = "torch"
+        self.model = SentenceTransformer(model_name, device='cpu')
+    
+    def encode(self, sentences, batch_size: int = 32, convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        return self.model.encode(sentences, batch_size=batch_size, convert_to_numpy=convert_to_numpy, **kwargs)
+    
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+class OnnxEncoder:
+    def __init__(self, model_name: str, intra_op_threads: int = 0, inter_op_threads: int = 0,
+                 model_dir: str = ONNX_MODEL_DIR, model_file: str = ONNX_MODEL_FILE):
+        """ONNX Runtime session over the model's ONNX export (from model_dir, or the Hugging Face hub)"""
+        if not ONNXRUNTIME_AVAILABLE or not TOKENIZERS_AVAILABLE:
+            raise ImportError("The onnx backend needs onnxruntime and tokenizers: pip install onnxruntime tokenizers")
+        if model_dir:
+            model_path = os.path.join(model_dir, os.path.basename(model_file))
+            tokenizer_path = os.path.join(model_dir, "tokenizer.json")
+        elif HF_HUB_AVAILABLE:
+            repo_id = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+            model_path = hf_hub_download(repo_id, model_file)
+            tokenizer_path = hf_hub_download(repo_id, "tokenizer.json")
+        else:
+            raise ImportError("Set ONNX_MODEL_DIR or install huggingface_hub to download the ONNX model")
+        
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length=MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding()  # Pads each batch to its longest text
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        if inter_op_threads:
+            options.inter_op_num_threads = inter_op_threads
+        self.backend = "onnx"
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.dimension = self.session.get_outputs()[0].shape[-1]
+        if not isinstance(self.dimension, int):
+            self.dimension = self._encode_batch(["dimension probe"]).shape[1]
+    
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        feeds = {
+            "input_ids": np.array([encoding.ids for encoding in encodings], dtype=np.int64),
+            "attention_mask": np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64),
+            "token_type_ids": np.array([encoding.type_ids for encoding in encodings], dtype=np.int64)
+        }
+        token_embeddings = self.session.run(None, {name: feeds[name] for name in feeds if name in self.input_names})[0]
+        
+        # Mean pooling over real tokens, then L2 normalisation
+        mask = feeds["attention_mask"][:, :, None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        return pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+    
+    def encode(self, sentences, batch_size: int = 32, convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+        
+        # Longest texts first so each batch pads to similar lengths (as sentence-transformers does)
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        embeddings = np.empty((len(texts), self.get_sentence_embedding_dimension()), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            rows = order[start:start + batch_size]
+            embeddings[rows] = self._encode_batch([texts[row] for row in rows])
+        return embeddings[0] if single else embeddings
+    
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+def load_encoder(model_name: str, backend: Optional[str] = None, intra_op_threads: Optional[int] = None,
+                 inter_op_threads: Optional[int] = None):
+    """Encoder for the configured backend (EMBEDDING_BACKEND); onnx falls back to torch if unavailable"""
+    backend = backend or DEFAULT_EMBEDDING_BACKEND
+    intra_op_threads = EMBEDDING_THREADS if intra_op_threads is None else intra_op_threads
+    inter_op_threads = EMBEDDING_INTER_OP_THREADS if inter_op_threads is None else inter_op_threads
+    if backend == "onnx":
+        try:
+            return OnnxEncoder(model_name, intra_op_threads, inter_op_threads)
+        except Exception as e:
+            print(f"⚠️ ONNX encoder unavailable ({e}), using the torch backend")
+    return TorchEncoder(model_name, intra_op_threads, inter_op_threads)
+
+def load_sample_story_texts(num_stories: int = 256) -> List[str]:
+    """Real story texts (title + domain) from saved scrapes, repeated up to num_stories"""
+    texts = []
+    for scrape_file in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "outputs", "scrapes", "*.json"))):
+        try:
+            with open(scrape_file, "r", encoding="utf-8") as f:
+                stories = json.load(f).get("stories", [])
+        except Exception:
+            continue
+        texts.extend(f"{story.get('title', '')} {story.get('url', '').split('//')[-1].split('/')[0]}" for story in stories)
+    texts = texts or [f"Show HN: Example project number {i}" for i in range(num_stories)]
+    return (texts * (num_stories // len(texts) + 1))[:num_stories]
+
+def _measure_backend(backend: str, model_name: str, num_stories: int) -> Dict:
+    """Cold start, encode latency and peak memory of one backend (run in a fresh process)"""
+    import resource
+    
+    start = time.perf_counter()
+    encoder = load_encoder(model_name, backend)
+    load_seconds = time.perf_counter() - start
+    texts = load_sample_story_texts(num_stories)
+    encoder.encode(texts[:8])  # Warm-up
+    start = time.perf_counter()
+    encoder.encode(texts, batch_size=32)
+    encode_seconds = time.perf_counter() - start
+    return {
+        "backend": encoder.backend,
+        "load_seconds": load_seconds,
+        "stories_per_second": len(texts) / encode_seconds,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB on Linux
+    }
+
+def parity_check(model_name: str = "all-MiniLM-L6-v2", min_cosine: float = 0.999) -> bool:
+    """Encode real stories and interest keywords with both backends; vectors and top-match keywords must agree"""
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from ai_pipeline import CostOptimisedAI
+    
+    texts = list(dict.fromkeys(load_sample_story_texts()))
+    keywords = [keyword for category in CostOptimisedAI._get_default_interests().values() for keyword in category]
+    torch_encoder, onnx_encoder = TorchEncoder(model_name), OnnxEncoder(model_name)
+    
+    results = {}
+    for name, encoder in (("torch", torch_encoder), ("onnx", onnx_encoder)):
+        story_vectors = encoder.encode(texts)
+        keyword_vectors = encoder.encode(keywords)
+        story_vectors /= np.linalg.norm(story_vectors, axis=1, keepdims=True)
+        keyword_vectors /= np.linalg.norm(keyword_vectors, axis=1, keepdims=True)
+        results[name] = (story_vectors, keyword_vectors, np.argmax(story_vectors @ keyword_vectors.T, axis=1))
+    
+    story_cosine = np.sum(results["torch"][0] * results["onnx"][0], axis=1)
+    keyword_cosine = np.sum(results["torch"][1] * results["onnx"][1], axis=1)
+    mismatches = [i for i in range(len(texts)) if results["torch"][2][i] != results["onnx"][2][i]]
+    print(f"🧪 Parity on {len(texts)} stories and {len(keywords)} keywords:")
+    print(f"   min cosine(torch, onnx): stories {story_cosine.min():.6f}, keywords {keyword_cosine.min():.6f}")
+    print(f"   top-match keyword identical for {len(texts) - len(mismatches)}/{len(texts)} stories")
+    for i in mismatches[:5]:
+        print(f"   ⚠️ {texts[i][:60]}: torch '{keywords[results['torch'][2][i]]}' vs onnx '{keywords[results['onnx'][2][i]]}'")
+    passed = not mismatches and min(story_cosine.min(), keyword_cosine.min()) >= min_cosine
+    print("✅ Backends agree" if passed else "❌ Backends disagree")
+    return passed
+
+def benchmark_backends(model_name: str = "all-MiniLM-L6-v2", num_stories: int = 256):
+    """Cold start, throughput and peak memory per backend, each measured in its own process"""
+    print(f"📊 Encoding {num_stories} stories (batch size 32, EMBEDDING_THREADS={EMBEDDING_THREADS or 'default'})")
+    for backend in EMBEDDING_BACKENDS:
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "measure", backend, model_name, str(num_stories)],
+                                capture_output=True, text=True)
+        if output.returncode != 0:
+            print(f"   {backend:<6} failed: {output.stderr.strip().splitlines()[-1] if output.stderr.strip() else output.returncode}")
+            continue
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        if result["backend"] != backend:
+            print(f"   {backend:<6} unavailable (fell back to {result['backend']})")
+            continue
+        print(f"   {backend:<6} cold start {result['load_seconds']:6.2f}s  {result['stories_per_second']:8.1f} stories/sec  "
+              f"peak RSS {result['peak_rss_mb']:7.1f} MB")
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "benchmark"
+    if command == "measure":
+        print(json.dumps(_measure_backend(sys.argv[2], sys.argv[3], int(sys.argv[4]))))
+    elif command == "parity":
+        sys.exit(0 if parity_check() else 1)
+    else:
+        benchmark_backends()
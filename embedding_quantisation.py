@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Quantised Embedding Storage and Scoring
+Embeddings can be kept as float16, or as int8 codes with one float32 scale per vector (symmetric:
+scale = max|x| / 127), about a quarter of float32's size. Cosine scoring works on the int8 codes
+directly: the scales cancel out, so only the codes and their norms are needed
+"""
+
+import os
+import sys
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+EMBEDDING_PRECISIONS = ("float32", "float16", "int8")
+# Stored story vectors are written, and relevance is scored, at this precision
+DEFAULT_EMBEDDING_PRECISION = os.getenv('EMBEDDING_PRECISION', 'float32')
+
+def quantise_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(n, dim) float vectors -> (n, dim) int8 codes and (n,) float32 scales"""
+    vectors = np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1)
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales
+
+def dequantise_int8(codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    return codes.astype(np.float32) * scales[:, None]
+
+def encode_vector(vector: np.ndarray, precision: str = "float32") -> bytes:
+    """Bytes of one vector at the given precision (int8: float32 scale followed by the codes)"""
+    vector = np.asarray(vector, dtype=np.float32).reshape(1, -1)
+    if precision == "float16":
+        return vector.astype(np.float16).tobytes()
+    if precision == "int8":
+        codes, scales = quantise_int8(vector)
+        return scales.tobytes() + codes.tobytes()
+    return vector.tobytes()
+
+def decode_vector(data: bytes, dim: int, precision: str = "float32") -> np.ndarray:
+    """float32 vector from bytes written by encode_vector"""
+    if precision == "float16":
+        return np.frombuffer(data, dtype=np.float16, count=dim).astype(np.float32)
+    if precision == "int8":
+        scale = np.frombuffer(data, dtype=np.float32, count=1)
+        return np.frombuffer(data, dtype=np.int8, count=dim, offset=4).astype(np.float32) * scale[0]
+    return np.frombuffer(data, dtype=np.float32, count=dim)
+
+class QuantisedMatrix:
+    def __init__(self, codes: np.ndarray, scales: np.ndarray):
+        """Rows of int8 codes with their scales; code norms are kept for cosine scoring"""
+        self.codes = codes
+        self.scales = scales
+        self.code_norms = np.maximum(np.linalg.norm(codes.astype(np.float32), axis=1), 1e-12)
+    
+    @classmethod
+    def from_vectors(cls, vectors: np.ndarray) -> "QuantisedMatrix":
+        return cls(*quantise_int8(vectors))
+    
+    @classmethod
+    def stack(cls, matrices: List["QuantisedMatrix"]) -> "QuantisedMatrix":
+        stacked = cls.__new__(cls)
+        stacked.codes = np.vstack([matrix.codes for matrix in matrices])
+        stacked.scales = np.concatenate([matrix.scales for matrix in matrices])
+        stacked.code_norms = np.concatenate([matrix.code_norms for matrix in matrices])
+        return stacked
+    
+    def __len__(self) -> int:
+        return len(self.codes)
+    
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.scales.nbytes + self.code_norms.nbytes
+
+def cosine_scores_int8(queries: QuantisedMatrix, keys: QuantisedMatrix, chunk_size: int = 32768) -> np.ndarray:
+    """
+    (n_queries, n_keys) cosine similarities from int8 codes: (Cq · Ckᵀ) / (|Cq| |Ck|)
+    Code chunks are widened to float32 so the integer dot products (exact below 2^24) run on BLAS,
+    without ever holding a float32 copy of all keys
+    """
+    query_codes = queries.codes.astype(np.float32)
+    scores = np.empty((len(queries), len(keys)), dtype=np.float32)
+    for start in range(0, len(keys), chunk_size):
+        chunk = keys.codes[start:start + chunk_size].astype(np.float32)
+        scores[:, start:start + chunk_size] = query_codes @ chunk.T
+    scores /= queries.code_norms[:, None]
+    scores /= keys.code_norms[None, :]
+    return scores
+
+def cosine_scores_float16(queries: np.ndarray, keys: np.ndarray, chunk_size: int = 32768) -> np.ndarray:
+    """(n_queries, n_keys) dot products of normalised float16 rows, widened to float32 per chunk"""
+    query_rows = queries.astype(np.float32)
+    scores = np.empty((len(queries), len(keys)), dtype=np.float32)
+    for start in range(0, len(keys), chunk_size):
+        scores[:, start:start + chunk_size] = query_rows @ keys[start:start + chunk_size].astype(np.float32).T
+    return scores
+
+def benchmark_quantisation(db_url: Optional[str] = None, repeats: int = 5):
+    """
+    Score every stored story for every user at each precision and report the memory used, the scoring
+    throughput and how many relevance decisions (score > threshold) flip compared with float32
+    """
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "dashboard"))
+    from embedding_backends import load_encoder
+    from database import DatabaseManager
+    from ai_pipeline import CostOptimisedAI, EMBEDDING_MODEL_NAME
+    from relevance_engine import RelevanceEngine, RELEVANCE_THRESHOLD
+    
+    db = DatabaseManager(db_url)
+    stories = [story for target_date in db.get_available_dates() for story in db.get_stories_by_date(target_date)]
+    users = []
+    for user in db.get_all_users():
+        interests = db.get_user_interests_by_category(user.user_id)
+        users.append((user.user_id, {f"{level}_priority": interests.get(level, []) for level in ("high", "medium", "low")}))
+    if not stories or not users:
+        print("⚠️ Need stories and users with interests in the database to benchmark")
+        return
+    
+    model = load_encoder(EMBEDDING_MODEL_NAME)
+    story_embeddings = model.encode([CostOptimisedAI._story_text({'title': story.title, 'url': story.url})
+                                     for story in stories], convert_to_numpy=True)
+    keywords = sorted({keyword for _, interests in users for category in interests.values() for keyword in category})
+    keyword_rows = dict(zip(keywords, model.encode(keywords, convert_to_numpy=True)))
+    users = [(user_id, {
+        category: {'embeddings': np.array([keyword_rows[keyword] for keyword in category_keywords]),
+                   'keywords': category_keywords, 'weight': 1.0}
+        for category, category_keywords in interests.items() if category_keywords
+    }) for user_id, interests in users]
+    dim = story_embeddings.shape[1]
+    
+    print(f"📊 {len(stories)} stories × {len(users)} users ({len(keywords)} unique keywords, dim {dim}), "
+          f"threshold {RELEVANCE_THRESHOLD}")
+    reference = None
+    for precision in EMBEDDING_PRECISIONS:
+        # Stored story vectors round-trip through the storage format before scoring
+        stored = [encode_vector(vector, precision) for vector in story_embeddings]
+        decoded = np.stack([decode_vector(data, dim, precision) for data in stored])
+        engine = RelevanceEngine(precision=precision)
+        seconds = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            table = engine.score(decoded, users)
+            seconds = min(seconds, time.perf_counter() - start)
+        if reference is None:
+            reference = table
+        
+        flips = int((table.relevant != reference.relevant).sum())
+        pairs = table.relevant.size
+        print(f"   {precision:<8} stories {sum(map(len, stored)) / 1024:7.1f} KB  "
+              f"keyword matrix {engine.keyword_matrix_bytes / 1024:7.1f} KB  "
+              f"{pairs / seconds / 1e6:6.2f}M pairs/s  "
+              f"max |Δscore| {np.abs(table.scores - reference.scores).max():.4f}  "
+              f"flips {flips}/{pairs} ({flips / pairs * 100:.2f}%)")
+
+if __name__ == "__main__":
+    benchmark_quantisation(sys.argv[1] if len(sys.argv) > 1 else None)
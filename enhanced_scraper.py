@@ -21,17 +21,109 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from webdriver_manager.chrome import ChromeDriverManager
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from dotenv import load_dotenv
 
 from ai_pipeline import CostOptimisedAI
 from email_sender import get_email_notifier
 from actionable_insights import ActionableInsightsAnalyzer
 from database import DatabaseManager
+from hn_http_scraper import HNHttpScraper
+from hn_api_client import HNApiClient
+from driver_pool import WebDriverPool
+
+# Extracts every story row (and its subtext sibling) in a single WebDriver round trip
+STORY_ROWS_SCRIPT = """
+var limit = arguments[0];
+var rows = Array.prototype.slice.call(document.querySelectorAll('tr.athing')).slice(0, limit);
+function text(root, selector) {
+    var el = root ? root.querySelector(selector) : null;
+    return el ? el.innerText.trim() : null;
+}
+return rows.map(function (row, i) {
+    var link = row.querySelector('.titleline > a') || row.querySelector('.titleline a');
+    var sibling = row.nextElementSibling;
+    var subtext = sibling ? sibling.querySelector('.subtext') : null;
+    var score = text(subtext, '.score');
+    var commentsCount = 0;
+    var discussionUrl = '';
+    var links = subtext ? subtext.querySelectorAll('a') : [];
+    for (var j = 0; j < links.length; j++) {
+        var linkText = links[j].innerText;
+        if (linkText.toLowerCase().indexOf('comment') !== -1) {
+            var firstWord = linkText.trim().split(/\\s+/)[0];
+            commentsCount = /^\\d+$/.test(firstWord) ? parseInt(firstWord, 10) : 0;
+            discussionUrl = links[j].href;
+            break;
+        }
+    }
+    return {
+        rank: i + 1,
+        story_id: row.id,
+        title: link ? link.innerText.trim() : null,
+        url: link ? link.href : null,
+        points: score ? (parseInt(score.split(/\\s+/)[0], 10) || 0) : 0,
+        author: text(subtext, '.hnuser') || 'Unknown',
+        time_posted: text(subtext, '.age') || 'Unknown',
+        comments_count: commentsCount,
+        hn_discussion_url: discussionUrl
+    };
+});
+"""
+
+# Extracts the top comment rows of a discussion page in a single WebDriver round trip
+COMMENT_ROWS_SCRIPT = """
+var limit = arguments[0];
+var rows = Array.prototype.slice.call(document.querySelectorAll('.athing.comtr')).slice(0, limit);
+function text(root, selector) {
+    var el = root ? root.querySelector(selector) : null;
+    return el ? el.innerText.trim() : null;
+}
+return rows.map(function (row, i) {
+    var comhead = row.querySelector('.comhead');
+    var score = text(comhead, '.score');
+    return {
+        rank: i + 1,
+        comment_id: row.id,
+        author: text(comhead, '.hnuser') || 'Unknown',
+        time_posted: text(comhead, '.age') || 'Unknown',
+        score: score ? (parseInt(score.split(/\\s+/)[0], 10) || null) : null,
+        text: text(row, '.commtext')
+    };
+});
+"""
+
+class WebDriverCommandCounter:
+    """Counts WebDriver commands (each one is a round trip, a network hop over Grid)"""
+    
+    def __init__(self, driver):
+        self.driver = driver
+        self.counts = {}
+    
+    def __enter__(self):
+        original_execute = self.driver.execute
+        
+        def counting_execute(driver_command, params=None):
+            self.counts[driver_command] = self.counts.get(driver_command, 0) + 1
+            return original_execute(driver_command, params)
+        
+        # WebElement calls are routed through their parent driver's execute()
+        self.driver.execute = counting_execute
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        del self.driver.execute
+        return False
+    
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
 
 class EnhancedHackerNewsScraper:
-    def __init__(self, headless=True, openai_api_key=None):
+    def __init__(self, headless=True, openai_api_key=None, engine: Optional[str] = None,
+                 extraction_mode: Optional[str] = None):
         """Initialize the enhanced scraper with cost-optimised AI"""
         # Load environment variables
         load_dotenv()
@@ -40,11 +132,34 @@ class EnhancedHackerNewsScraper:
         self.ai = CostOptimisedAI(openai_api_key)
         
         # Initialize actionable insights analyzer
-        self.insights_analyzer = ActionableInsightsAnalyzer(openai_api_key)
+        self.insights_analyzer = ActionableInsightsAnalyzer(openai_api_key, article_store=self.ai.article_store,
+                                                           url_aliases=self.ai.url_aliases)
         
         # Initialize database for deduplication checks
         self.db = DatabaseManager()
         
+        # Ingestion engine: 'http' parses server-rendered HTML directly, 'api' uses the HN JSON API,
+        # 'selenium' drives Chrome
+        self.engine = (engine or os.getenv('SCRAPER_ENGINE', 'http')).lower()
+        if self.engine not in ('http', 'api', 'selenium'):
+            print(f"⚠️ Unknown scraper engine '{self.engine}', using 'http'")
+            self.engine = 'http'
+        print(f"🔧 Using '{self.engine}' ingestion engine")
+        
+        # Conditional requests for HN pages, sharing the AI pipeline's per-URL fetch state
+        incremental = os.getenv('INCREMENTAL_FETCH', 'true').lower() == 'true'
+        self.http_scraper = HNHttpScraper(fetch_state=self.ai.fetch_state if incremental else None)
+        self.api_client = HNApiClient()
+        
+        # Comments the API engine downloaded alongside the stories, keyed by story_id
+        self._prefetched_comments = {}
+        
+        # Selenium extraction: 'batch' pulls all rows with one execute_script, 'element' walks elements
+        self.extraction_mode = (extraction_mode or os.getenv('SELENIUM_EXTRACTION_MODE', 'batch')).lower()
+        
+        # Number of item pages fetched in parallel by fetch_comments_for_stories
+        self.comment_fetch_workers = int(os.getenv('COMMENT_FETCH_WORKERS', '4'))
+        
         # Set up Chrome options
         chrome_options = webdriver.ChromeOptions()
         if headless:
@@ -58,9 +173,18 @@ class EnhancedHackerNewsScraper:
         chrome_options.add_argument("--disable-renderer-backgrounding")
         chrome_options.add_argument("--window-size=1920,1080")
         chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36")
-        
-        # Initialize Chrome driver - try Selenium Grid first, fallback to local
-        import os
+        self.chrome_options = chrome_options
+        
+        # Pool of WebDriver sessions; Chrome is only started when a Selenium code path needs it
+        self.driver_pool = WebDriverPool(
+            self._setup_driver,
+            size=int(os.getenv('WEBDRIVER_POOL_SIZE', '1')),
+            max_page_loads=int(os.getenv('WEBDRIVER_MAX_PAGE_LOADS', '50'))
+        )
+    
+    def _setup_driver(self):
+        """Initialize Chrome driver - try Selenium Grid first, fallback to local"""
+        chrome_options = self.chrome_options
         selenium_grid_url = os.getenv('SELENIUM_GRID_URL')
         
         if selenium_grid_url:
@@ -74,19 +198,20 @@ class EnhancedHackerNewsScraper:
                 print(f"🔧 Adjusted URL: {selenium_grid_url}")
             
             try:
-                self.driver = webdriver.Remote(
+                driver = webdriver.Remote(
                     command_executor=selenium_grid_url,
                     options=chrome_options
                 )
                 print("✅ Connected to Selenium Grid")
+                return driver
             except Exception as e:
                 print(f"⚠️  Selenium Grid connection failed: {e}")
                 print("🔄 Falling back to local Chrome...")
-                self.driver = self._setup_local_chrome(chrome_options)
+                return self._setup_local_chrome(chrome_options)
         else:
             # Fallback to local Chrome (development/local testing)
             print("🔧 Using local Chrome setup...")
-            self.driver = self._setup_local_chrome(chrome_options)
+            return self._setup_local_chrome(chrome_options)
     
     def _setup_local_chrome(self, chrome_options):
         """Fallback method for local Chrome setup"""
@@ -110,29 +235,64 @@ class EnhancedHackerNewsScraper:
             return webdriver.Chrome(service=service, options=chrome_options)
     
     def scrape_top_stories(self, num_stories=30) -> List[Dict]:
+        """Scrape the top N stories using the configured engine, falling back to Selenium"""
+        if self.engine == 'api':
+            try:
+                stories, comments_by_story = self.api_client.scrape_top_stories(num_stories)
+                if stories:
+                    self._prefetched_comments = comments_by_story
+                    return stories
+                print("⚠️ API engine returned no stories, falling back to Selenium...")
+            except Exception as e:
+                print(f"⚠️ API engine failed: {e}")
+                print("🔄 Falling back to Selenium...")
+        
+        if self.engine == 'http':
+            try:
+                stories = self.http_scraper.scrape_top_stories(num_stories)
+                if stories:
+                    return stories
+                print("⚠️ HTTP engine returned no stories, falling back to Selenium...")
+            except Exception as e:
+                print(f"⚠️ HTTP engine failed: {e}")
+                print("🔄 Falling back to Selenium...")
+        
+        return self._scrape_top_stories_selenium(num_stories)
+    
+    def _scrape_top_stories_selenium(self, num_stories=30) -> List[Dict]:
         """Scrape the top N stories from Hacker News homepage"""
         try:
-            print(f"🔍 Scraping top {num_stories} stories from Hacker News...")
-            self.driver.get("https://news.ycombinator.com")
-            
-            wait = WebDriverWait(self.driver, 10)
-            wait.until(EC.presence_of_element_located((By.CLASS_NAME, "athing")))
-            
-            stories = []
-            story_rows = self.driver.find_elements(By.CLASS_NAME, "athing")[:num_stories]
-            
-            for i, story_row in enumerate(story_rows, 1):
-                try:
-                    story_data = self._extract_story_data(story_row, i)
-                    if story_data:
-                        stories.append(story_data)
-                        print(f"✅ Scraped story {i}: {story_data['title'][:50]}...")
-                except Exception as e:
-                    print(f"❌ Error scraping story {i}: {str(e)}")
-                    continue
-            
-            print(f"✅ Successfully scraped {len(stories)} stories")
-            return stories
+            with self.driver_pool.session() as driver:
+                print(f"🔍 Scraping top {num_stories} stories from Hacker News...")
+                driver.get("https://news.ycombinator.com")
+                
+                wait = WebDriverWait(driver, 10)
+                wait.until(EC.presence_of_element_located((By.CLASS_NAME, "athing")))
+                
+                if self.extraction_mode == 'batch':
+                    stories = self._extract_stories_batch(driver, num_stories)
+                    if stories is not None:
+                        for story_data in stories:
+                            print(f"✅ Scraped story {story_data['rank']}: {story_data['title'][:50]}...")
+                        print(f"✅ Successfully scraped {len(stories)} stories")
+                        return stories
+                    print("⚠️ Batched extraction failed, falling back to per-element extraction...")
+                
+                stories = []
+                story_rows = driver.find_elements(By.CLASS_NAME, "athing")[:num_stories]
+                
+                for i, story_row in enumerate(story_rows, 1):
+                    try:
+                        story_data = self._extract_story_data(story_row, i)
+                        if story_data:
+                            stories.append(story_data)
+                            print(f"✅ Scraped story {i}: {story_data['title'][:50]}...")
+                    except Exception as e:
+                        print(f"❌ Error scraping story {i}: {str(e)}")
+                        continue
+                
+                print(f"✅ Successfully scraped {len(stories)} stories")
+                return stories
             
         except TimeoutException:
             print("❌ Timeout waiting for stories to load")
@@ -141,6 +301,23 @@ class EnhancedHackerNewsScraper:
             print(f"❌ Error scraping stories: {str(e)}")
             return []
     
+    def _extract_stories_batch(self, driver, num_stories) -> Optional[List[Dict]]:
+        """Extract all story rows with a single execute_script round trip"""
+        try:
+            rows = driver.execute_script(STORY_ROWS_SCRIPT, num_stories)
+        except Exception as e:
+            print(f"❌ Error in batched story extraction: {str(e)}")
+            return None
+        
+        scraped_at = datetime.now().isoformat()
+        stories = []
+        for row in rows or []:
+            if not row.get('title'):
+                continue
+            row['scraped_at'] = scraped_at
+            stories.append(row)
+        return stories
+    
     def _extract_story_data(self, story_row, rank) -> Optional[Dict]:
         """Extract data from a single story row"""
         try:
@@ -153,7 +330,7 @@ class EnhancedHackerNewsScraper:
             url = title_link.get_attribute("href")
             
             # Get the subtext row (contains points, author, time, comments)
-            subtext_row = self.driver.find_element(By.XPATH, f"//tr[@id='{story_id}']/following-sibling::tr[1]")
+            subtext_row = story_row.find_element(By.XPATH, "following-sibling::tr[1]")
             subtext = subtext_row.find_element(By.CLASS_NAME, "subtext")
             
             # Extract points
@@ -216,7 +393,13 @@ class EnhancedHackerNewsScraper:
         Now supports user-specific interests for multi-user filtering
         """
         # Use local embedding-based filtering first
-        is_relevant_local, confidence_score, reasoning = self.ai.is_relevant_story_local(story_data, user_interests)
+        local_result = self.ai.is_relevant_story_local(story_data, user_interests)
+        return self._apply_relevance(story_data, local_result, user_interests)
+    
+    def _apply_relevance(self, story_data: Dict, local_result: Tuple[bool, float, str],
+                         user_interests: Optional[Dict] = None) -> bool:
+        """Refine a local (is_relevant, score, reasoning) result with AI if uncertain and record it on the story"""
+        is_relevant_local, confidence_score, reasoning = local_result
         
         # For uncertain cases, use AI refinement
         if 0.3 <= confidence_score <= 0.5:
@@ -240,9 +423,11 @@ class EnhancedHackerNewsScraper:
         """
         return self.ai.get_article_summary_cached(url)
     
-    def analyse_comments(self, hn_discussion_url: str, num_comments=10) -> Dict:
+    def analyse_comments(self, hn_discussion_url: str, num_comments=10,
+                         comments_data: Optional[List[Dict]] = None) -> Dict:
         """
         Scrape and analyse comments with cost optimisation
+        Pass comments_data (e.g. from fetch_comments_for_stories) to skip scraping
         """
         if not hn_discussion_url:
             return {
@@ -255,27 +440,12 @@ class EnhancedHackerNewsScraper:
             }
         
         try:
-            print(f"  📖 Scraping comments from: {hn_discussion_url}")
-            self.driver.get(hn_discussion_url)
-            
-            wait = WebDriverWait(self.driver, 10)
-            wait.until(EC.presence_of_element_located((By.CLASS_NAME, "comment")))
-            
-            comment_elements = self.driver.find_elements(By.CSS_SELECTOR, ".athing.comtr")[:num_comments]
-            
-            comments_data = []
-            for i, comment_elem in enumerate(comment_elements, 1):
-                try:
-                    comment_data = self._extract_comment_data(comment_elem, i)
-                    if comment_data:
-                        comments_data.append(comment_data)
-                        print(f"    ✅ Extracted comment {i}: {comment_data['text'][:50]}...")
-                except Exception as e:
-                    print(f"    ❌ Error extracting comment {i}: {str(e)}")
-                    continue
+            if comments_data is None:
+                print(f"  📖 Scraping comments from: {hn_discussion_url}")
+                comments_data = self._scrape_comments(hn_discussion_url, num_comments)
             
             # Use cost-optimised comment analysis
-            analysis = self.ai.analyse_comments_efficient(comments_data)
+            analysis = self.ai.analyse_comments_efficient(comments_data, thread_key=hn_discussion_url)
             analysis["top_comments"] = comments_data
             
             print(f"  ✅ Analysed {len(comments_data)} comments")
@@ -302,6 +472,131 @@ class EnhancedHackerNewsScraper:
                 "top_comments": []
             }
     
+    def _scrape_comments(self, hn_discussion_url: str, num_comments=10) -> List[Dict]:
+        """Scrape top comments using the configured engine, falling back to Selenium"""
+        story_id = self._story_id_from_discussion_url(hn_discussion_url)
+        if story_id in self._prefetched_comments:
+            return self._prefetched_comments[story_id][:num_comments]
+        
+        if self.engine == 'api' and story_id:
+            try:
+                return self.api_client.fetch_comments(story_id, num_comments)
+            except Exception as e:
+                print(f"    ⚠️ API engine failed: {e}")
+                print("    🔄 Falling back to Selenium...")
+        
+        if self.engine == 'http':
+            try:
+                return self.http_scraper.scrape_comments(hn_discussion_url, num_comments)
+            except Exception as e:
+                print(f"    ⚠️ HTTP engine failed: {e}")
+                print("    🔄 Falling back to Selenium...")
+        
+        return self._scrape_comments_selenium(hn_discussion_url, num_comments)
+    
+    def fetch_comments_for_stories(self, stories: List[Dict], num_comments=10) -> List[Optional[List[Dict]]]:
+        """
+        Fetch the top comments of many stories up front
+        On the HTTP and API engines items are fetched in parallel by a bounded worker pool
+        (politeness-limited per host); results are returned in rank order, None where a fetch failed
+        Comments the API engine already downloaded with the stories are reused as-is
+        """
+        ranked_stories = sorted(stories, key=lambda story: story.get('rank', 0))
+        discussion_urls = [story.get('hn_discussion_url') for story in ranked_stories]
+        
+        prefetched = {}
+        for url in discussion_urls:
+            story_id = self._story_id_from_discussion_url(url)
+            if url and story_id in self._prefetched_comments:
+                prefetched[url] = self._prefetched_comments[story_id][:num_comments]
+        to_fetch = [url for url in discussion_urls if url and url not in prefetched]
+        
+        if not to_fetch:
+            return [prefetched.get(url, []) for url in discussion_urls]
+        
+        print(f"💬 Fetching comments for {len(to_fetch)} stories...")
+        start = time.time()
+        
+        if self.engine == 'http':
+            fetched = self.http_scraper.fetch_comments_concurrently(
+                to_fetch, num_comments, max_workers=self.comment_fetch_workers
+            )
+        else:
+            # API engine: each worker runs its own API fetch (falling back to a pooled browser session)
+            # Selenium engine: each worker checks out its own pooled browser session
+            scrape = self._scrape_comments if self.engine == 'api' else self._scrape_comments_selenium
+            max_workers = self.comment_fetch_workers if self.engine == 'api' else self.driver_pool.size
+            
+            def fetch_one(url):
+                try:
+                    return scrape(url, num_comments)
+                except Exception as e:
+                    print(f"    ❌ Error fetching comments from {url}: {str(e)}")
+                    return None
+            
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                fetched = list(executor.map(fetch_one, to_fetch))
+        
+        fetched_by_url = dict(zip(to_fetch, fetched))
+        fetched_by_url.update(prefetched)
+        print(f"✅ Fetched comments in {time.time() - start:.1f}s")
+        return [fetched_by_url.get(url) if url else [] for url in discussion_urls]
+    
+    @staticmethod
+    def _story_id_from_discussion_url(hn_discussion_url: str) -> str:
+        """Pull the item id out of a news.ycombinator.com/item?id=... URL"""
+        if not hn_discussion_url or 'id=' not in hn_discussion_url:
+            return ""
+        return hn_discussion_url.split('id=')[-1].split('&')[0]
+    
+    def _scrape_comments_selenium(self, hn_discussion_url: str, num_comments=10) -> List[Dict]:
+        """Load a discussion page in the browser and extract its top comments"""
+        with self.driver_pool.session() as driver:
+            driver.get(hn_discussion_url)
+            
+            wait = WebDriverWait(driver, 10)
+            wait.until(EC.presence_of_element_located((By.CLASS_NAME, "comment")))
+            
+            if self.extraction_mode == 'batch':
+                comments_data = self._extract_comments_batch(driver, num_comments)
+                if comments_data is not None:
+                    for comment_data in comments_data:
+                        print(f"    ✅ Extracted comment {comment_data['rank']}: {comment_data['text'][:50]}...")
+                    return comments_data
+                print("    ⚠️ Batched extraction failed, falling back to per-element extraction...")
+            
+            comment_elements = driver.find_elements(By.CSS_SELECTOR, ".athing.comtr")[:num_comments]
+            
+            comments_data = []
+            for i, comment_elem in enumerate(comment_elements, 1):
+                try:
+                    comment_data = self._extract_comment_data(comment_elem, i)
+                    if comment_data:
+                        comments_data.append(comment_data)
+                        print(f"    ✅ Extracted comment {i}: {comment_data['text'][:50]}...")
+                except Exception as e:
+                    print(f"    ❌ Error extracting comment {i}: {str(e)}")
+                    continue
+            
+            return comments_data
+    
+    def _extract_comments_batch(self, driver, num_comments) -> Optional[List[Dict]]:
+        """Extract all top comment rows with a single execute_script round trip"""
+        try:
+            rows = driver.execute_script(COMMENT_ROWS_SCRIPT, num_comments)
+        except Exception as e:
+            print(f"    ❌ Error in batched comment extraction: {str(e)}")
+            return None
+        
+        comments_data = []
+        for row in rows or []:
+            # Deleted/flagged comments have no commtext, same as the per-element path skipping them
+            if row.get('text') is None:
+                continue
+            row['length'] = len(row['text'].split())
+            comments_data.append(row)
+        return comments_data
+    
     def _extract_comment_data(self, comment_elem, rank) -> Optional[Dict]:
         """Extract data from a single comment element"""
         try:
@@ -602,6 +897,9 @@ class EnhancedHackerNewsScraper:
         # Scrape top 30 stories
         stories = self.scrape_top_stories(30)
         
+        # Encode every story in one batch, relevance checks below reuse the vectors
+        self.ai.encode_stories(stories)
+        
         processed_stories = []
         relevant_count = 0
         non_cached_count = 0  # Track stories that weren't served from cache
@@ -730,12 +1028,22 @@ class EnhancedHackerNewsScraper:
         
         print(f"✅ Found {len(new_stories)} new stories, skipped {skipped_count} already processed")
         
+        # Fetch all comment pages up front (in parallel on the HTTP engine), in rank order
+        new_stories.sort(key=lambda story: story.get('rank', 0))
+        prefetched_comments = self.fetch_comments_for_stories(new_stories)
+        
+        # Download every linked article concurrently; each is summarised as soon as it arrives
+        article_urls = [story['url'] for story in new_stories
+                        if not story['url'].startswith('https://news.ycombinator.com')]
+        article_summaries = self.ai.get_article_summaries_batch(article_urls)
+        
         # Process new stories for global analysis
         print("🔍 Processing new stories for global analysis...")
         processed_stories = []
         
-        for story in new_stories:
+        for story, story_comments in zip(new_stories, prefetched_comments):
             print(f"  📰 Processing: {story['title'][:50]}...")
+            initial_api_calls = self.ai.api_calls_made
             
             # Extract story tags for better categorization
             story_tags = self.extract_story_tags(story)
@@ -744,12 +1052,11 @@ class EnhancedHackerNewsScraper:
             # Get article summary if it's an external link
             article_summary = None
             if not story['url'].startswith('https://news.ycombinator.com'):
-                print("    📄 Getting article summary...")
-                article_summary = self.get_article_summary(story['url'])
+                article_summary = article_summaries.get(story['url'])
             
             # Analyze comments (shared analysis)
             print("    💬 Analyzing comments...")
-            comments_analysis = self.analyse_comments(story['hn_discussion_url'])
+            comments_analysis = self.analyse_comments(story['hn_discussion_url'], comments_data=story_comments)
             
             # Analyze for actionable insights
             print("    🔍 Analyzing actionable insights...")
@@ -767,8 +1074,17 @@ class EnhancedHackerNewsScraper:
                 "tags": story_tags
             })
             
+            # Cached unless this story needed API calls (its summary was batched before the loop)
+            story["was_cached"] = (self.ai.api_calls_made == initial_api_calls and
+                                   story['url'] not in self.ai.fresh_summary_urls)
+            
             processed_stories.append(story)
         
+        # Score every story against every user's interests in one matrix operation
+        relevance_table = self.ai.score_relevance_for_users(
+            processed_stories, [(user.user_id, user_interests) for user, user_interests in users_with_interests]
+        )
+        
         # Generate personalised digests for each user
         print(f"👥 Generating personalised digests for {len(users_with_interests)} users...")
         users_digest_data = []
@@ -776,12 +1092,13 @@ class EnhancedHackerNewsScraper:
         for user, user_interests in users_with_interests:
             print(f"  🎯 Processing for user: {user.name or user.email}")
             
-            # Filter stories for this user's interests
+            # Filter stories for this user's interests (uncertain scores are still refined with AI)
             user_stories = []
             user_relevant_count = 0
-            for story in processed_stories:
+            for story_index, story in enumerate(processed_stories):
                 story_copy = story.copy()
-                if self.is_relevant_story(story, user_interests):
+                local_result = relevance_table.for_user(user.user_id, story_index)
+                if self._apply_relevance(story_copy, local_result, user_interests):
                     story_copy['is_relevant'] = True
                     user_relevant_count += 1
                 else:
@@ -830,12 +1147,16 @@ class EnhancedHackerNewsScraper:
             "avg_relevant_per_user": total_relevant_across_users / len(users_with_interests) if users_with_interests else 0,
             "processing_time": processing_time,
             "cost_optimization": final_cost_report,
+            "webdriver_pool": self.driver_pool.metrics(),
             "users_digest_data": users_digest_data
         }
         
         print(f"✅ Multi-user processing complete!")
         print(f"📊 Summary: {len(processed_stories)} new stories processed (skipped {skipped_count} duplicates), avg {overall_summary['avg_relevant_per_user']:.1f} relevant per user")
         print(f"💰 Cost optimisation: {final_cost_report.get('savings_percentage', 0)}% saved")
+        interest_cache = final_cost_report.get('interest_embeddings', {})
+        print(f"🧠 Interest embeddings: {interest_cache.get('memory_hits', 0) + interest_cache.get('disk_hits', 0)} cache hits, "
+              f"{interest_cache.get('misses', 0)} re-encoded ({interest_cache.get('hit_rate', 0)}% hit rate)")
         
         return overall_summary
     
@@ -852,9 +1173,11 @@ class EnhancedHackerNewsScraper:
         return filename
     
     def close(self):
-        """Close the browser"""
-        if self.driver:
-            self.driver.quit()
+        """Close the browser and pooled HTTP connections"""
+        self.http_scraper.close()
+        if self.driver_pool.sessions_created:
+            print(f"📊 WebDriver pool: {self.driver_pool.metrics()}")
+            self.driver_pool.close()
             print("🔒 Browser closed.")
 
 def main():
@@ -952,9 +1275,60 @@ def test_enhanced_scraper():
         if scraper is not None:
             scraper.close()
 
+def benchmark_webdriver_commands(num_stories=30, num_comments=10):
+    """Count WebDriver commands per scrape for per-element vs batched extraction"""
+    print(f"⏱️ Benchmarking WebDriver commands ({num_stories} stories, {num_comments} comments)...")
+    scraper = None
+    
+    try:
+        scraper = EnhancedHackerNewsScraper(engine='selenium')
+        scraper.driver_pool.warm_up(1)
+        driver = scraper.driver_pool.drivers()[0]
+        results = {}
+        
+        for mode in ['element', 'batch']:
+            scraper.extraction_mode = mode
+            
+            with WebDriverCommandCounter(driver) as story_counter:
+                start = time.time()
+                stories = scraper.scrape_top_stories(num_stories)
+                story_seconds = time.time() - start
+            
+            discussion_url = next((s['hn_discussion_url'] for s in stories if s['hn_discussion_url']), None)
+            comment_commands, comment_seconds = 0, 0.0
+            if discussion_url:
+                with WebDriverCommandCounter(driver) as comment_counter:
+                    start = time.time()
+                    scraper._scrape_comments_selenium(discussion_url, num_comments)
+                    comment_seconds = time.time() - start
+                comment_commands = comment_counter.total
+            
+            results[mode] = {
+                "stories": len(stories),
+                "story_page_commands": story_counter.total,
+                "story_page_seconds": round(story_seconds, 2),
+                "comment_page_commands": comment_commands,
+                "comment_page_seconds": round(comment_seconds, 2)
+            }
+        
+        print("\n📊 WebDriver commands per scrape:")
+        for mode, result in results.items():
+            print(f"   {mode:>7}: front page {result['story_page_commands']} commands ({result['story_page_seconds']}s), "
+                  f"comment page {result['comment_page_commands']} commands ({result['comment_page_seconds']}s)")
+        
+        return results
+        
+    except Exception as e:
+        print(f"❌ Error during benchmark: {str(e)}")
+    finally:
+        if scraper is not None:
+            scraper.close()
+
 if __name__ == "__main__":
     import sys
     if len(sys.argv) > 1 and sys.argv[1] == "test":
         test_enhanced_scraper()
+    elif len(sys.argv) > 1 and sys.argv[1] == "benchmark":
+        benchmark_webdriver_commands()
     else:
         main()
\ No newline at end of file
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Incremental Fetch Layer for HN Scraper
+Remembers ETag, Last-Modified and a body hash per URL so re-runs send conditional requests
+and skip re-parsing (and re-analysing) pages whose content has not changed
+"""
+
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+DEFAULT_FETCH_STATE_PATH = os.path.join(".ai_cache", "fetch_state.db")
+
+class FetchStateStore:
+    def __init__(self, db_path: str = DEFAULT_FETCH_STATE_PATH):
+        """Open (or create) the SQLite file holding per-URL validators and parsed payloads"""
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        
+        # One connection shared by the comment fetch worker threads, serialised by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS fetch_state (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body_hash TEXT,
+                payload TEXT,
+                fetched_at TEXT,
+                checked_at TEXT
+            )
+        """)
+        self._conn.commit()
+        
+        # Counters for the run summary
+        self.not_modified = 0
+        self.unchanged_bodies = 0
+        self.changed = 0
+        self.bytes_downloaded = 0
+    
+    @staticmethod
+    def body_hash(body: bytes) -> str:
+        return hashlib.sha256(body).hexdigest()
+    
+    def get(self, url: str) -> Optional[Dict]:
+        """Stored state for a URL, with the payload decoded, or None if never fetched"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, body_hash, payload, fetched_at, checked_at "
+                "FROM fetch_state WHERE url = ?", (url,)
+            ).fetchone()
+        if not row:
+            return None
+        return {
+            "etag": row[0],
+            "last_modified": row[1],
+            "body_hash": row[2],
+            "payload": json.loads(row[3]) if row[3] else None,
+            "fetched_at": row[4],
+            "checked_at": row[5]
+        }
+    
+    def conditional_headers(self, state: Optional[Dict]) -> Dict:
+        """If-None-Match / If-Modified-Since headers for a previously seen URL"""
+        headers = {}
+        if state:
+            if state.get("etag"):
+                headers["If-None-Match"] = state["etag"]
+            if state.get("last_modified"):
+                headers["If-Modified-Since"] = state["last_modified"]
+        return headers
+    
+    def fetch(self, session, url: str, timeout: int = 15,
+              headers: Optional[Dict] = None) -> Tuple[bool, Optional[str], Optional[Dict]]:
+        """
+        Conditionally GET a URL with a requests session (or the requests module)
+        Returns (changed, text, previous_state); changed is False when the server answered
+        304 Not Modified (text is then None) or the body hashes to the same value as last time
+        """
+        previous = self.get(url)
+        request_headers = dict(headers or {})
+        request_headers.update(self.conditional_headers(previous))
+        
+        response = session.get(url, headers=request_headers, timeout=timeout)
+        if response.status_code != 304:
+            response.raise_for_status()
+        changed = self.record_response(url, response.status_code, response.headers,
+                                       None if response.status_code == 304 else response.content, previous)
+        return changed, (None if response.status_code == 304 else response.text), previous
+    
+    def record_response(self, url: str, status_code: int, headers, body: Optional[bytes],
+                        previous: Optional[Dict]) -> bool:
+        """
+        Update the stored state from a response (any HTTP client) and report whether content changed
+        body is None for a 304 Not Modified or when the body was not read
+        """
+        now = datetime.now().isoformat()
+        
+        if status_code == 304:
+            self._count("not_modified")
+            if previous:
+                # Validators matched: the stored body hash stays as it is
+                self._touch(url, now)
+                return False
+            # Nothing stored to compare against (no validators were sent), so nothing to record either
+            return True
+        
+        self._count("bytes_downloaded", len(body or b""))
+        # Only a body that was actually read has a hash; skipped bodies (media, binaries) never match
+        digest = self.body_hash(body) if body is not None else None
+        
+        if digest is not None and previous and previous.get("body_hash") == digest:
+            # Server ignores validators but the content is identical
+            self._count("unchanged_bodies")
+            self._save(url, headers.get("ETag"), headers.get("Last-Modified"),
+                       digest, previous.get("payload"), previous.get("fetched_at") or now, now)
+            return False
+        
+        self._count("changed")
+        self._save(url, headers.get("ETag"), headers.get("Last-Modified"), digest, None, now, now)
+        return True
+    
+    def _count(self, counter: str, amount: int = 1):
+        # Incremented from the comment fetch worker threads
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+    
+    def set_payload(self, url: str, payload):
+        """Attach the parsed result of the current body so an unchanged re-fetch can reuse it"""
+        with self._lock:
+            self._conn.execute("UPDATE fetch_state SET payload = ? WHERE url = ?",
+                               (json.dumps(payload), url))
+            self._conn.commit()
+    
+    def _save(self, url, etag, last_modified, body_hash, payload, fetched_at, checked_at):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fetch_state "
+                "(url, etag, last_modified, body_hash, payload, fetched_at, checked_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, body_hash,
+                 json.dumps(payload) if payload is not None else None, fetched_at, checked_at)
+            )
+            self._conn.commit()
+    
+    def _touch(self, url: str, checked_at: str):
+        with self._lock:
+            self._conn.execute("UPDATE fetch_state SET checked_at = ? WHERE url = ?", (checked_at, url))
+            self._conn.commit()
+    
+    def stats(self) -> Dict:
+        return {
+            "not_modified": self.not_modified,
+            "unchanged_bodies": self.unchanged_bodies,
+            "changed": self.changed,
+            "bytes_downloaded": self.bytes_downloaded
+        }
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Hacker News JSON API Ingestion Backend
+Fetches top stories and their comment trees concurrently with an asyncio HTTP client
+"""
+
+import os
+import re
+import sys
+import json
+import html
+import time
+import asyncio
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+
+import httpx
+
+HN_API_BASE_URL = "https://hacker-news.firebaseio.com/v0/"
+HN_ITEM_URL = "https://news.ycombinator.com/item?id={}"
+
+def humanize_age(unix_time: Optional[int], now: Optional[float] = None) -> str:
+    """Render a unix timestamp the way the HN front page does ("3 hours ago")"""
+    if not unix_time:
+        return "Unknown"
+    seconds = max(0, int((now or time.time()) - unix_time))
+    for unit, unit_seconds in (("day", 86400), ("hour", 3600), ("minute", 60)):
+        if seconds >= unit_seconds:
+            count = seconds // unit_seconds
+            return f"{count} {unit}{'s' if count != 1 else ''} ago"
+    return "just now"
+
+def comment_html_to_text(comment_html: str) -> str:
+    """Convert the HTML of an API comment to plain text with paragraphs on separate lines"""
+    text = re.sub(r"<p>", "\n", comment_html or "")
+    text = re.sub(r"<[^>]+>", "", text)
+    return html.unescape(text).strip()
+
+class HNApiClient:
+    def __init__(self, base_url: Optional[str] = None, max_concurrency: int = 20, timeout: float = 10.0,
+                 record_dir: Optional[str] = None):
+        """
+        Initialize the API client (base_url can point at a local stand-in server)
+        With record_dir set, every JSON response is saved in the layout hn_api_stub_server serves
+        """
+        self.base_url = (base_url or os.getenv('HN_API_BASE_URL', HN_API_BASE_URL)).rstrip('/') + '/'
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.record_dir = record_dir
+        self.items_fetched = 0
+    
+    def scrape_top_stories(self, num_stories: int = 30, num_comments: int = 10, max_depth: int = 1,
+                           max_breadth: Optional[int] = None) -> Tuple[List[Dict], Dict[str, List[Dict]]]:
+        """
+        Synchronous entry point: fetch the top N stories and their top comments
+        Returns (stories, comments keyed by story_id)
+        """
+        return asyncio.run(self.fetch_top_stories(num_stories, num_comments, max_depth, max_breadth))
+    
+    def fetch_comments(self, story_id: str, num_comments: int = 10, max_depth: int = 1,
+                       max_breadth: Optional[int] = None) -> List[Dict]:
+        """Synchronous entry point: fetch the top comments of a single story"""
+        async def run():
+            async with self._client() as client:
+                semaphore = asyncio.Semaphore(self.max_concurrency)
+                item = await self._get_item(client, semaphore, story_id)
+                return await self._fetch_story_comments(client, semaphore, item or {}, num_comments,
+                                                        max_depth, max_breadth)
+        return asyncio.run(run())
+    
+    async def fetch_top_stories(self, num_stories: int = 30, num_comments: int = 10, max_depth: int = 1,
+                                max_breadth: Optional[int] = None) -> Tuple[List[Dict], Dict[str, List[Dict]]]:
+        """Fetch story items and their comment trees concurrently"""
+        print(f"🔍 Fetching top {num_stories} stories from the HN API...")
+        start = time.time()
+        
+        async with self._client() as client:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            top_ids = (await self._get_json(client, semaphore, "topstories.json") or [])[:num_stories]
+            
+            # Each story's comment tree starts downloading as soon as its own item arrives
+            async def fetch_story(item_id):
+                item = await self._get_item(client, semaphore, item_id)
+                comments = await self._fetch_story_comments(client, semaphore, item or {}, num_comments,
+                                                            max_depth, max_breadth)
+                return item, comments
+            
+            results = await asyncio.gather(*[fetch_story(item_id) for item_id in top_ids])
+        
+        scraped_at = datetime.now().isoformat()
+        stories = []
+        comments_by_story = {}
+        for rank, (item, comments) in enumerate(results, 1):
+            if not item or item.get('deleted') or item.get('dead'):
+                continue
+            story = self._story_from_item(item, rank, scraped_at)
+            stories.append(story)
+            comments_by_story[story['story_id']] = comments
+        
+        print(f"✅ Fetched {len(stories)} stories and {sum(len(c) for c in comments_by_story.values())} "
+              f"comments ({self.items_fetched} items) in {time.time() - start:.1f}s")
+        return stories, comments_by_story
+    
+    def _client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+        return httpx.AsyncClient(base_url=self.base_url, limits=limits, timeout=self.timeout)
+    
+    async def _get_json(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore, path: str):
+        async with semaphore:
+            try:
+                response = await client.get(path)
+                response.raise_for_status()
+                payload = response.json()
+            except Exception as e:
+                print(f"❌ Error fetching {path}: {str(e)}")
+                return None
+        
+        if self.record_dir and payload is not None:
+            record_path = os.path.join(self.record_dir, path)
+            os.makedirs(os.path.dirname(record_path), exist_ok=True)
+            with open(record_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+        return payload
+    
+    async def _get_item(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore, item_id) -> Optional[Dict]:
+        self.items_fetched += 1
+        return await self._get_json(client, semaphore, f"item/{item_id}.json")
+    
+    async def _fetch_story_comments(self, client, semaphore, story_item: Dict, num_comments: int,
+                                    max_depth: int, max_breadth: Optional[int]) -> List[Dict]:
+        """Fetch a story's comment tree (depth/breadth limited) and flatten it in page order"""
+        kid_ids = story_item.get('kids') or []
+        if not kid_ids or num_comments <= 0:
+            return []
+        
+        tree = await self._fetch_comment_tree(client, semaphore, kid_ids, 1, max_depth,
+                                              max_breadth or num_comments)
+        
+        comments_data = []
+        for item in tree:
+            text = comment_html_to_text(item.get('text', ''))
+            comments_data.append({
+                "rank": len(comments_data) + 1,
+                "comment_id": str(item['id']),
+                "author": item.get('by') or "Unknown",
+                "time_posted": humanize_age(item.get('time')),
+                "score": None,  # The API does not expose comment scores
+                "text": text,
+                "length": len(text.split())
+            })
+            if len(comments_data) >= num_comments:
+                break
+        return comments_data
+    
+    async def _fetch_comment_tree(self, client, semaphore, kid_ids: List[int], depth: int,
+                                  max_depth: int, max_breadth: int) -> List[Dict]:
+        """Fetch one level of comments concurrently, then their replies, returning a pre-order list"""
+        items = await asyncio.gather(*[self._get_item(client, semaphore, kid_id) for kid_id in kid_ids[:max_breadth]])
+        items = [item for item in items if item and not item.get('deleted') and not item.get('dead')]
+        
+        if depth >= max_depth:
+            return items
+        
+        subtrees = await asyncio.gather(*[
+            self._fetch_comment_tree(client, semaphore, item.get('kids') or [], depth + 1, max_depth, max_breadth)
+            for item in items
+        ])
+        flattened = []
+        for item, subtree in zip(items, subtrees):
+            flattened.append(item)
+            flattened.extend(subtree)
+        return flattened
+    
+    def _story_from_item(self, item: Dict, rank: int, scraped_at: str) -> Dict:
+        """Convert an API story item to the story dict the rest of the pipeline consumes"""
+        story_id = str(item['id'])
+        comments_count = item.get('descendants') or 0
+        discussion_url = HN_ITEM_URL.format(story_id)
+        return {
+            "rank": rank,
+            "story_id": story_id,
+            "title": item.get('title', ''),
+            "url": item.get('url') or discussion_url,
+            "points": item.get('score') or 0,
+            "author": item.get('by') or "Unknown",
+            "time_posted": humanize_age(item.get('time')),
+            "comments_count": comments_count,
+            # Matches the front page, where stories without comments only have a "discuss" link
+            "hn_discussion_url": discussion_url if comments_count > 0 else "",
+            "scraped_at": scraped_at
+        }
+
+def benchmark_api_backend(fixtures_dir: Optional[str] = None, num_stories: int = 30, num_comments: int = 10,
+                          latency: float = 0.05):
+    """Time the full API path against the local stand-in server (no network)"""
+    import tempfile
+    import glob
+    from hn_api_stub_server import HNApiStubServer, build_fixtures_from_scrapes
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if not fixtures_dir:
+            scrape_files = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                         "outputs", "scrapes", "*.json")))
+            fixtures_dir = build_fixtures_from_scrapes(scrape_files[-1:], tmp_dir)
+        
+        with HNApiStubServer(fixtures_dir, latency=latency) as server:
+            client = HNApiClient(base_url=server.base_url)
+            start = time.time()
+            stories, comments_by_story = client.scrape_top_stories(num_stories, num_comments)
+            elapsed = time.time() - start
+    
+    print(f"\n📊 API backend benchmark (simulated latency {latency * 1000:.0f}ms per item):")
+    print(f"   Stories: {len(stories)}")
+    print(f"   Comments: {sum(len(c) for c in comments_by_story.values())}")
+    print(f"   Items fetched: {client.items_fetched}")
+    print(f"   Wall time: {elapsed:.2f}s")
+    return elapsed
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "benchmark":
+        benchmark_api_backend(sys.argv[2] if len(sys.argv) > 2 else None)
+    elif len(sys.argv) > 2 and sys.argv[1] == "record":
+        # Record live API responses as fixtures for the stand-in server
+        HNApiClient(record_dir=sys.argv[2]).scrape_top_stories(30, 10)
+    else:
+        stories, comments = HNApiClient().scrape_top_stories(5, 3)
+        print(json.dumps(stories, indent=2))
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Local Stand-in for the Hacker News JSON API
+Serves recorded topstories/item JSON from disk so the API backend can be tested and benchmarked offline
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import threading
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import List
+
+class HNApiStubServer:
+    def __init__(self, fixtures_dir: str, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0):
+        """
+        Serve fixtures_dir/topstories.json and fixtures_dir/item/<id>.json under /v0/
+        latency adds an artificial per-request delay to mimic the real API
+        """
+        self.fixtures_dir = fixtures_dir
+        self.latency = latency
+        self.requests_served = 0
+        
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, like the real API, so client connection pooling is exercised
+            protocol_version = "HTTP/1.1"
+            
+            def do_GET(self):
+                match = re.fullmatch(r"/v0/(topstories\.json|item/\d+\.json)", self.path)
+                file_path = os.path.join(server.fixtures_dir, match.group(1)) if match else None
+                
+                if server.latency:
+                    time.sleep(server.latency)
+                server.requests_served += 1
+                
+                if not file_path or not os.path.exists(file_path):
+                    # The real API answers unknown items with a JSON null
+                    body = b"null"
+                else:
+                    with open(file_path, "rb") as f:
+                        body = f.read()
+                
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+    
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v0/"
+    
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+    
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+def _parse_relative_age(age: str, reference: datetime) -> int:
+    """Turn "3 hours ago" back into a unix timestamp relative to when it was scraped"""
+    match = re.match(r"(\d+)\s+(minute|hour|day)", age or "")
+    seconds = 0
+    if match:
+        seconds = int(match.group(1)) * {"minute": 60, "hour": 3600, "day": 86400}[match.group(2)]
+    return int(reference.timestamp()) - seconds
+
+def build_fixtures_from_scrapes(scrape_files: List[str], fixtures_dir: str) -> str:
+    """
+    Record API-shaped fixtures from saved scrape JSON files (outputs/scrapes)
+    Stories keep their real HN ids; recorded top comments become the story's kids
+    """
+    os.makedirs(os.path.join(fixtures_dir, "item"), exist_ok=True)
+    top_ids = []
+    
+    for scrape_file in scrape_files:
+        with open(scrape_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        
+        for story in data.get("stories", []):
+            if not str(story.get("story_id", "")).isdigit():
+                continue
+            story_id = int(story["story_id"])
+            scraped_at = datetime.fromisoformat(story.get("scraped_at") or data.get("scrape_date"))
+            
+            kids = []
+            top_comments = (story.get("comments_analysis") or {}).get("top_comments") or []
+            for comment in top_comments:
+                if not str(comment.get("comment_id", "")).isdigit():
+                    continue
+                comment_id = int(comment["comment_id"])
+                kids.append(comment_id)
+                paragraphs = (comment.get("text") or "").split("\n")
+                _write_item(fixtures_dir, {
+                    "id": comment_id,
+                    "type": "comment",
+                    "by": comment.get("author"),
+                    "parent": story_id,
+                    "time": _parse_relative_age(comment.get("time_posted"), scraped_at),
+                    "text": "<p>".join(paragraphs)
+                })
+            
+            item = {
+                "id": story_id,
+                "type": "story",
+                "by": story.get("author"),
+                "title": story.get("title"),
+                "score": story.get("points", 0),
+                "descendants": story.get("comments_count", 0),
+                "time": _parse_relative_age(story.get("time_posted"), scraped_at),
+                "kids": kids
+            }
+            if story.get("url") and not story["url"].startswith("https://news.ycombinator.com"):
+                item["url"] = story["url"]
+            _write_item(fixtures_dir, item)
+            
+            if story_id not in top_ids:
+                top_ids.append(story_id)
+    
+    with open(os.path.join(fixtures_dir, "topstories.json"), "w", encoding="utf-8") as f:
+        json.dump(top_ids, f)
+    
+    print(f"✅ Recorded {len(top_ids)} stories into {fixtures_dir}")
+    return fixtures_dir
+
+def _write_item(fixtures_dir: str, item: dict):
+    with open(os.path.join(fixtures_dir, "item", f"{item['id']}.json"), "w", encoding="utf-8") as f:
+        json.dump(item, f)
+
+if __name__ == "__main__":
+    # Usage: python hn_api_stub_server.py <fixtures_dir> [port]
+    fixtures = sys.argv[1] if len(sys.argv) > 1 else "hn_api_fixtures"
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8765
+    stub = HNApiStubServer(fixtures, port=port)
+    print(f"🌐 Serving HN API fixtures from {fixtures} at {stub.base_url}")
+    try:
+        stub.httpd.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
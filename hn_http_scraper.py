@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+HTTP Ingestion Engine for Hacker News
+Fetches server-rendered HN pages with a pooled HTTP session and parses them without a browser
+"""
+
+import sys
+import time
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Dict, Optional
+from urllib.parse import urljoin, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+
+from fetch_state import FetchStateStore
+
+# Prefer the lxml parser when it is installed (much faster), fall back to the stdlib parser
+# (BeautifulSoup imports lxml itself, so only probe for it)
+LXML_AVAILABLE = importlib.util.find_spec("lxml") is not None
+
+HN_BASE_URL = "https://news.ycombinator.com/"
+HTML_PARSER = "lxml" if LXML_AVAILABLE else "html.parser"
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+
+class HostRateLimiter:
+    """Per-host politeness limit: bounded concurrency plus a minimum gap between request starts"""
+    
+    def __init__(self, min_interval: float = 0.25, max_concurrent: int = 4):
+        self.min_interval = min_interval
+        self.max_concurrent = max_concurrent
+        self._lock = threading.Lock()
+        self._semaphores = {}
+        self._next_slot = {}
+    
+    @contextmanager
+    def limit(self, url: str):
+        """Hold a request slot for the URL's host for the duration of the block"""
+        host = urlparse(url).netloc
+        with self._lock:
+            semaphore = self._semaphores.setdefault(host, threading.BoundedSemaphore(self.max_concurrent))
+        
+        semaphore.acquire()
+        try:
+            # Reserve the next start time for this host so concurrent workers are spaced out
+            with self._lock:
+                now = time.monotonic()
+                slot = max(now, self._next_slot.get(host, 0.0))
+                self._next_slot[host] = slot + self.min_interval
+            if slot > now:
+                time.sleep(slot - now)
+            yield
+        finally:
+            semaphore.release()
+
+class HNHttpScraper:
+    def __init__(self, timeout: int = 15, pool_size: int = 10, user_agent: str = DEFAULT_USER_AGENT,
+                 rate_limiter: Optional[HostRateLimiter] = None, fetch_state: Optional[FetchStateStore] = None):
+        """
+        Initialize the HTTP scraper with a pooled keep-alive session
+        With a fetch_state store, pages are requested conditionally and unchanged pages are not re-parsed
+        """
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+        self.fetch_state = fetch_state
+        
+        # One session for the whole run so connections to news.ycombinator.com are reused
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"User-Agent": user_agent})
+    
+    def fetch_html(self, url: str) -> str:
+        """Fetch a page and return its decoded HTML"""
+        with self.rate_limiter.limit(url):
+            response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.text
+    
+    def _fetch_and_parse(self, url: str, parse, count: int) -> List[Dict]:
+        """
+        Fetch a page and parse its first `count` rows, reusing the stored parse when the page is unchanged
+        Payloads remember how many rows were parsed so a larger request still re-parses
+        """
+        if self.fetch_state is None:
+            return parse(self.fetch_html(url), count)
+        
+        with self.rate_limiter.limit(url):
+            changed, html, previous = self.fetch_state.fetch(self.session, url, self.timeout)
+        
+        if not changed:
+            payload = previous.get("payload") if previous else None
+            if payload and payload.get("count", 0) >= count:
+                print(f"    ♻️ Unchanged since {previous['fetched_at'][:16]}, reusing parsed page: {url}")
+                return payload["rows"][:count]
+            if html is None:
+                # 304 but the stored parse is missing or too short, fetch the body unconditionally
+                html = self.fetch_html(url)
+        
+        rows = parse(html, count)
+        self.fetch_state.set_payload(url, {"count": count, "rows": rows})
+        return rows
+    
+    def scrape_top_stories(self, num_stories: int = 30) -> List[Dict]:
+        """Fetch the HN front page over HTTP and parse the top N stories"""
+        print(f"🔍 Fetching top {num_stories} stories from Hacker News over HTTP...")
+        stories = self._fetch_and_parse(HN_BASE_URL, self.parse_front_page, num_stories)
+        print(f"✅ Successfully parsed {len(stories)} stories")
+        return stories
+    
+    def parse_front_page(self, html: str, num_stories: int = 30, base_url: str = HN_BASE_URL) -> List[Dict]:
+        """
+        Parse every story row of a front page in a single pass
+        Works on live responses and on saved HTML fixtures alike
+        """
+        soup = BeautifulSoup(html, HTML_PARSER)
+        
+        stories = []
+        for rank, story_row in enumerate(soup.select("tr.athing")[:num_stories], 1):
+            story_data = self._parse_story_row(story_row, rank, base_url)
+            if story_data:
+                stories.append(story_data)
+        
+        return stories
+    
+    def _parse_story_row(self, story_row, rank: int, base_url: str) -> Optional[Dict]:
+        """Extract data from a story row and its subtext sibling row"""
+        try:
+            story_id = story_row.get("id", "")
+            
+            title_link = story_row.select_one(".titleline > a") or story_row.select_one(".titleline a")
+            if title_link is None:
+                return None
+            title = title_link.get_text().strip()
+            # Ask HN / Show HN posts link relatively to item?id=..., resolve like a browser would
+            url = urljoin(base_url, title_link.get("href", ""))
+            
+            points = 0
+            author = "Unknown"
+            time_posted = "Unknown"
+            comments_count = 0
+            hn_discussion_url = ""
+            
+            subtext_row = story_row.find_next_sibling("tr")
+            subtext = subtext_row.select_one(".subtext") if subtext_row else None
+            
+            if subtext is not None:
+                score_span = subtext.select_one(".score")
+                if score_span:
+                    try:
+                        points = int(score_span.get_text().split()[0])
+                    except (ValueError, IndexError):
+                        points = 0
+                
+                author_link = subtext.select_one(".hnuser")
+                if author_link:
+                    author = author_link.get_text().strip()
+                
+                age_span = subtext.select_one(".age")
+                if age_span:
+                    time_posted = age_span.get_text().strip()
+                
+                # Comment link text is "45&nbsp;comments" (or "discuss" when there are none)
+                for link in subtext.find_all("a"):
+                    link_text = link.get_text()
+                    if "comment" in link_text.lower():
+                        first_word = link_text.split()[0]
+                        comments_count = int(first_word) if first_word.isdigit() else 0
+                        hn_discussion_url = urljoin(base_url, link.get("href", ""))
+                        break
+            
+            return {
+                "rank": rank,
+                "story_id": story_id,
+                "title": title,
+                "url": url,
+                "points": points,
+                "author": author,
+                "time_posted": time_posted,
+                "comments_count": comments_count,
+                "hn_discussion_url": hn_discussion_url,
+                "scraped_at": datetime.now().isoformat()
+            }
+        
+        except Exception as e:
+            print(f"❌ Error parsing story row {rank}: {str(e)}")
+            return None
+    
+    def scrape_comments(self, hn_discussion_url: str, num_comments: int = 10) -> List[Dict]:
+        """Fetch an HN item page over HTTP and parse its top comments"""
+        return self._fetch_and_parse(hn_discussion_url, self.parse_comments, num_comments)
+    
+    def fetch_comments_concurrently(self, discussion_urls: List[str], num_comments: int = 10,
+                                    max_workers: int = 4) -> List[Optional[List[Dict]]]:
+        """
+        Fetch and parse several item pages in parallel with a bounded worker pool
+        Results come back in the same order as discussion_urls; failed pages are None
+        """
+        def fetch_one(url):
+            try:
+                return self.scrape_comments(url, num_comments)
+            except Exception as e:
+                print(f"    ❌ Error fetching comments from {url}: {str(e)}")
+                return None
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(fetch_one, discussion_urls))
+    
+    def parse_comments(self, html: str, num_comments: int = 10) -> List[Dict]:
+        """Parse the top comment rows of an item page in a single pass"""
+        soup = BeautifulSoup(html, HTML_PARSER)
+        
+        comments_data = []
+        for rank, comment_row in enumerate(soup.select("tr.athing.comtr")[:num_comments], 1):
+            comment_data = self._parse_comment_row(comment_row, rank)
+            if comment_data:
+                comments_data.append(comment_data)
+        
+        return comments_data
+    
+    def _parse_comment_row(self, comment_row, rank: int) -> Optional[Dict]:
+        """Extract data from a single comment row"""
+        # Deleted/flagged comments have no commtext, skip them like the Selenium path does
+        comment_text_el = comment_row.select_one(".commtext")
+        if comment_text_el is None:
+            return None
+        # HN separates paragraphs with <p> tags; keep them as line breaks like a browser's innerText
+        for paragraph in comment_text_el.find_all("p"):
+            paragraph.insert_before("\n")
+        comment_text = "\n".join(line.strip() for line in comment_text_el.get_text().splitlines()).strip()
+        
+        comhead = comment_row.select_one(".comhead")
+        author = "Unknown"
+        time_posted = "Unknown"
+        score = None
+        if comhead is not None:
+            author_link = comhead.select_one(".hnuser")
+            if author_link:
+                author = author_link.get_text().strip()
+            
+            age_span = comhead.select_one(".age")
+            if age_span:
+                time_posted = age_span.get_text().strip()
+            
+            score_span = comhead.select_one(".score")
+            if score_span:
+                try:
+                    score = int(score_span.get_text().split()[0])
+                except (ValueError, IndexError):
+                    score = None
+        
+        return {
+            "rank": rank,
+            "comment_id": comment_row.get("id", ""),
+            "author": author,
+            "time_posted": time_posted,
+            "score": score,
+            "text": comment_text,
+            "length": len(comment_text.split())
+        }
+    
+    def close(self):
+        """Close pooled HTTP connections"""
+        self.session.close()
+
+def test_http_scraper(fixture_path: Optional[str] = None):
+    """Parse a saved HN front page (offline) or the live page"""
+    scraper = HNHttpScraper()
+    
+    try:
+        if fixture_path:
+            print(f"🧪 Parsing saved front page fixture: {fixture_path}")
+            with open(fixture_path, "r", encoding="utf-8") as f:
+                stories = scraper.parse_front_page(f.read())
+        else:
+            print("🧪 Fetching live front page...")
+            stories = scraper.scrape_top_stories(30)
+        
+        for story in stories:
+            print(f"  {story['rank']:>2}. {story['title'][:60]} "
+                  f"({story['points']} points, {story['comments_count']} comments, by {story['author']})")
+        print(f"✅ Parsed {len(stories)} stories")
+    
+    finally:
+        scraper.close()
+
+if __name__ == "__main__":
+    test_http_scraper(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Per-User Interest Embedding Cache
+Each user's interest set, keyed by user and a hash of the interests, is stored as row ids into the
+shared keyword vocabulary (kept in memory for the run and in SQLite across runs), so a keyword is
+encoded once for all users and only new keywords are encoded after an interest edit
+"""
+
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from keyword_vocabulary import KeywordVocabulary
+
+DEFAULT_INTEREST_EMBEDDINGS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                ".ai_cache", "interest_embeddings.db")
+
+def interest_set_hash(interests: Dict[str, List[str]], model_name: str = "") -> str:
+    """Stable hash of {category: [keywords]} (and the model that encodes them)"""
+    canonical = json.dumps({"model": model_name, "interests": {category: interests[category]
+                                                               for category in sorted(interests)}})
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+class InterestEmbeddingCache:
+    def __init__(self, db_path: str = DEFAULT_INTEREST_EMBEDDINGS_PATH, model_name: str = "",
+                 vocabulary: Optional[KeywordVocabulary] = None):
+        """Open the persisted cache; entries from other models are never returned"""
+        self.db_path = db_path
+        self.model_name = model_name
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.vocabulary = vocabulary or KeywordVocabulary(
+            os.path.join(os.path.dirname(os.path.abspath(db_path)), "keyword_vocabulary"), model_name
+        )
+        
+        self._lock = threading.Lock()
+        self._memory = {}  # (user_key, interest_hash) -> {category: (keywords, row ids)}
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        # Superseded layout that stored a copy of every user's embeddings
+        self._conn.execute("DROP TABLE IF EXISTS interest_embeddings")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS interest_sets (
+                user_key TEXT NOT NULL,
+                interest_hash TEXT NOT NULL,
+                category TEXT NOT NULL,
+                keywords TEXT NOT NULL,
+                row_ids TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (user_key, interest_hash, category)
+            )
+        """)
+        self._conn.commit()
+        
+        # Metrics
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.stale_sets = 0  # Interest sets re-resolved because the vocabulary was rebuilt
+    
+    def get_or_compute(self, user_id: Optional[str], interests: Dict[str, List[str]],
+                       encode: Callable[[List[str]], np.ndarray]) -> Dict:
+        """Interest embeddings per category; only keywords missing from the vocabulary are encoded"""
+        user_key = user_id or "anonymous"
+        interest_hash = interest_set_hash(interests, self.model_name)
+        key = (user_key, interest_hash)
+        
+        rows = self._memory.get(key)
+        if rows is not None and self._rows_match(rows):
+            self.memory_hits += 1
+        else:
+            rows = self._load(user_key, interest_hash)
+            if rows and self._rows_match(rows):
+                self.disk_hits += 1
+            else:
+                if rows:
+                    self.stale_sets += 1
+                self.misses += 1
+                rows = {
+                    category: (keywords, self.vocabulary.row_ids(keywords, encode))
+                    for category, keywords in interests.items() if keywords
+                }
+                self._store(user_key, interest_hash, rows)
+            self._memory[key] = rows
+        
+        # Vectors are gathered from the shared memory-mapped matrix, users only hold row ids
+        return {
+            category: {
+                'embeddings': self.vocabulary.vectors(row_ids),
+                'keywords': keywords,
+                'weight': 1.0  # Single weight for all interests
+            }
+            for category, (keywords, row_ids) in rows.items()
+        }
+    
+    def _rows_match(self, rows: Dict) -> bool:
+        """Stored row ids are only valid while the vocabulary still has those keywords at those rows"""
+        return all(self.vocabulary.matches(keywords, row_ids) for keywords, row_ids in rows.values())
+    
+    def _load(self, user_key: str, interest_hash: str) -> Dict:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT category, keywords, row_ids FROM interest_sets WHERE user_key = ? AND interest_hash = ?",
+                (user_key, interest_hash)
+            ).fetchall()
+        return {category: (json.loads(keywords), json.loads(row_ids)) for category, keywords, row_ids in rows}
+    
+    def _store(self, user_key: str, interest_hash: str, rows: Dict):
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            # One interest set per user: older sets are superseded by the edit that replaced them
+            self._conn.execute("DELETE FROM interest_sets WHERE user_key = ? AND interest_hash != ?",
+                               (user_key, interest_hash))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO interest_sets (user_key, interest_hash, category, keywords, row_ids, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(user_key, interest_hash, category, json.dumps(keywords), json.dumps(row_ids), now)
+                 for category, (keywords, row_ids) in rows.items()]
+            )
+    
+    def invalidate(self, user_id: str) -> int:
+        """Forget every cached interest set of a user"""
+        with self._lock, self._conn:
+            removed = self._conn.execute("DELETE FROM interest_sets WHERE user_key = ?", (user_id,)).rowcount
+            for key in [key for key in self._memory if key[0] == user_id]:
+                del self._memory[key]
+        self.invalidations += 1
+        return removed
+    
+    def stats(self) -> Dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups * 100, 1) if lookups else 0,
+            "invalidations": self.invalidations,
+            "stale_sets": self.stale_sets,
+            "vocabulary": self.vocabulary.stats()
+        }
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def invalidate_user_interest_embeddings(user_id: str, db_path: str = DEFAULT_INTEREST_EMBEDDINGS_PATH) -> int:
+    """Drop a user's cached interest embeddings (called when their interests are edited)"""
+    if not os.path.exists(db_path):
+        return 0
+    cache = InterestEmbeddingCache(db_path)
+    try:
+        return cache.invalidate(user_id)
+    finally:
+        cache.close()
@@ -383,11 +383,14 @@ class InterestLearner:
     def _refresh_ai_pipeline(self):
         """Refresh the AI pipeline to use updated interest weights"""
         try:
-            from ai_pipeline import CostOptimisedAI
+            from ai_resources import registry
             
-            # The AI pipeline will automatically load updated interests from database
-            # when initialized, so we just need to signal that embeddings should be refreshed
-            print("🔄 Interest weights updated - AI pipeline will use new weights on next run")
+            # The shared pipeline of this process (if loaded) picks up the new weights now; others
+            # load updated interests from the database when initialized
+            if registry.is_loaded("ai_pipeline"):
+                registry.get("ai_pipeline").refresh_interests()
+            else:
+                print("🔄 Interest weights updated - AI pipeline will use new weights on next run")
             
         except ImportError:
             print("⚠️ AI pipeline not available for refresh")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Global Keyword Embedding Vocabulary
+Every unique normalised interest keyword is embedded once into a memory-mapped float32 matrix with a
+keyword -> row index, so users share rows instead of holding their own copies and a new process gets
+every known keyword's embedding without a model call
+"""
+
+import os
+import json
+import threading
+from typing import Callable, Dict, Iterable, List
+
+import numpy as np
+
+# Appends from concurrent processes (scraper, dashboard workers) are serialised with a file lock on POSIX
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+DEFAULT_VOCABULARY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".ai_cache", "keyword_vocabulary")
+
+def normalise_keyword(keyword: str) -> str:
+    # all-MiniLM-L6-v2 is uncased, so case folding loses nothing
+    return " ".join(keyword.lower().split())
+
+class KeywordVocabulary:
+    def __init__(self, vocab_dir: str = DEFAULT_VOCABULARY_DIR, model_name: str = ""):
+        """Open the vocabulary (index.json + embeddings.f32); a different model starts a fresh one"""
+        self.vocab_dir = vocab_dir
+        self.model_name = model_name
+        self.index_file = os.path.join(vocab_dir, "index.json")
+        self.matrix_file = os.path.join(vocab_dir, "embeddings.f32")
+        os.makedirs(vocab_dir, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self.keywords = []  # Row -> normalised keyword
+        self.rows = {}  # Normalised keyword -> row
+        self.dim = 0
+        self.matrix = None
+        self._reload()
+        
+        # Metrics
+        self.lookups = 0
+        self.encoded = 0
+    
+    def _reload(self):
+        """Re-read the index and re-map the matrix (picks up rows appended by other processes)"""
+        index = {}
+        if os.path.exists(self.index_file):
+            try:
+                with open(self.index_file, "r", encoding="utf-8") as f:
+                    index = json.load(f)
+            except Exception as e:
+                print(f"⚠️ Error loading keyword vocabulary index: {e}")
+        if index.get("model") != self.model_name:
+            index = {}
+        
+        self.keywords = index.get("keywords", [])
+        self.dim = index.get("dim", 0)
+        if self.keywords and (not os.path.exists(self.matrix_file) or
+                              os.path.getsize(self.matrix_file) < len(self.keywords) * self.dim * 4):
+            print("⚠️ Keyword vocabulary matrix is missing rows, rebuilding it")
+            self.keywords = []
+        self.rows = {keyword: row for row, keyword in enumerate(self.keywords)}
+        self.matrix = None
+        if self.keywords:
+            self.matrix = np.memmap(self.matrix_file, dtype=np.float32, mode="r", shape=(len(self.keywords), self.dim))
+    
+    def row_ids(self, keywords: Iterable[str], encode: Callable[[List[str]], np.ndarray]) -> List[int]:
+        """Matrix rows of the keywords, embedding (in one batch) only those not in the vocabulary yet"""
+        normalised = [normalise_keyword(keyword) for keyword in keywords]
+        self.lookups += len(normalised)
+        missing = [keyword for keyword in dict.fromkeys(normalised) if keyword not in self.rows]
+        if missing:
+            self._append(missing, encode)
+        return [self.rows[keyword] for keyword in normalised]
+    
+    def _append(self, keywords: List[str], encode: Callable[[List[str]], np.ndarray]):
+        with self._lock, open(os.path.join(self.vocab_dir, ".lock"), "w") as lock_file:
+            if FCNTL_AVAILABLE:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            # Another process may have added some of them meanwhile
+            self._reload()
+            keywords = [keyword for keyword in keywords if keyword not in self.rows]
+            if not keywords:
+                return
+            
+            embeddings = np.ascontiguousarray(encode(keywords), dtype=np.float32)
+            self.encoded += len(keywords)
+            if not self.keywords:
+                # First rows (or a model change): start a new matrix
+                self.dim = embeddings.shape[1]
+                open(self.matrix_file, "wb").close()
+            with open(self.matrix_file, "r+b") as f:
+                # Rows beyond the index (from an interrupted append) are overwritten
+                f.seek(len(self.keywords) * self.dim * 4)
+                f.write(embeddings.tobytes())
+                f.truncate()
+            
+            # The index is replaced atomically after the rows it points to are on disk
+            tmp_file = self.index_file + ".tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump({"model": self.model_name, "dim": self.dim, "keywords": self.keywords + keywords}, f)
+            os.replace(tmp_file, self.index_file)
+            self._reload()
+    
+    def matches(self, keywords: List[str], row_ids: List[int]) -> bool:
+        """Whether the rows still hold these keywords (a rebuilt vocabulary renumbers its rows)"""
+        if row_ids and max(row_ids) >= len(self.keywords):
+            self._reload()
+        return len(keywords) == len(row_ids) and all(
+            0 <= row < len(self.keywords) and self.keywords[row] == normalise_keyword(keyword)
+            for keyword, row in zip(keywords, row_ids)
+        )
+    
+    def vectors(self, row_ids: List[int]) -> np.ndarray:
+        """Embeddings of the given rows as an (n, dim) float32 array"""
+        if not row_ids:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        if self.matrix is None or max(row_ids) >= len(self.keywords):
+            self._reload()
+        return np.asarray(self.matrix[row_ids])
+    
+    def stats(self) -> Dict:
+        return {
+            "keywords": len(self.keywords),
+            "dim": self.dim,
+            "matrix_bytes": len(self.keywords) * self.dim * 4,
+            "lookups": self.lookups,
+            "encoded": self.encoded
+        }
@@ -28,8 +28,11 @@ def get_all_users_with_interests(db: DatabaseManager) -> List[Tuple[User, List[U
     
     return users_with_interests
 
-def store_multi_user_results(db: DatabaseManager, overall_summary: Dict):
-    """Store processed stories in database with user-specific relevance data"""
+def store_multi_user_results(db: DatabaseManager, overall_summary: Dict, ai=None):
+    """
+    Store processed stories in database with user-specific relevance data
+    With the run's AI pipeline, the story embeddings are stored too (reused from this run's encoding)
+    """
     print("💾 Storing processed stories in database...")
     
     scrape_date = overall_summary.get('scrape_date', datetime.now().isoformat())[:10]
@@ -63,6 +66,23 @@ def store_multi_user_results(db: DatabaseManager, overall_summary: Dict):
         db.import_json_data(temp_filename)
         print(f"✅ Imported {len(stories_only)} stories for date {scrape_date}")
         
+        # Store story vectors once at ingest so onboarding and recalculation never re-encode them
+        if ai:
+            try:
+                stored = ai.store_story_embeddings(db, [
+                    {'id': db_story.id, 'title': db_story.title, 'url': db_story.url}
+                    for db_story in db.get_stories_by_date(scrape_date)
+                ])
+                print(f"✅ Stored embeddings for {stored} stories")
+                
+                # Incremental insert into the similar-stories index
+                from ai_pipeline import EMBEDDING_MODEL_NAME, STORY_EMBEDDING_VERSION
+                from ann_index import open_story_index, sync_story_index
+                sync_story_index(open_story_index(EMBEDDING_MODEL_NAME, STORY_EMBEDDING_VERSION),
+                                 db, EMBEDDING_MODEL_NAME, STORY_EMBEDDING_VERSION)
+            except Exception as e:
+                print(f"⚠️ Could not store story embeddings or update the story index: {e}")
+        
         # Now store user-specific relevance data for each user
         print("💾 Storing user-specific relevance data...")
         for user_data in overall_summary['users_digest_data']:
@@ -130,7 +150,7 @@ def main():
         overall_summary = scraper.process_multi_user_daily_stories(users_with_interests)
         
         # Store results in database
-        store_multi_user_results(db, overall_summary)
+        store_multi_user_results(db, overall_summary, ai=scraper.ai)
         
         # Send personalised emails
         print("\n📧 Sending personalised email digests...")
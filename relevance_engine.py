@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Vectorised Relevance Engine
+Scores every story against every user's interests at once: normalised story embeddings S and all users'
+keyword embeddings K are stacked, S·Kᵀ is one BLAS call, and a segmented max/argmax per user gives each
+user's best similarity and best-matching keyword for every story
+With precision "float16" or "int8" the stacked keywords are held (and scored) in that form instead
+"""
+
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from embedding_quantisation import (DEFAULT_EMBEDDING_PRECISION, QuantisedMatrix, cosine_scores_float16,
+                                    cosine_scores_int8)
+
+RELEVANCE_THRESHOLD = 0.25  # Same threshold as CostOptimisedAI.is_relevant_story_local
+AI_REFINEMENT_BAND = (0.3, 0.5)  # Scores in this range are re-checked with OpenAI
+
+def _normalise_rows(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+class RelevanceTable:
+    def __init__(self, user_keys: List[str], scores: np.ndarray, best_columns: np.ndarray,
+                 keywords: List[str], categories: List[str], threshold: float):
+        """
+        Stories × users results: scores[i, j] is story i's best similarity to user j's interests
+        and best_columns[i, j] the column of K (keywords/categories) it came from, -1 for none
+        """
+        self.user_keys = user_keys
+        self.scores = scores
+        self.best_columns = best_columns
+        self.keywords = keywords
+        self.categories = categories
+        self.threshold = threshold
+        self.relevant = scores > threshold
+        self._columns = {user_key: column for column, user_key in enumerate(user_keys)}
+    
+    def for_user(self, user_key: str, story_index: int) -> Tuple[bool, float, str]:
+        """(is_relevant, score, reasoning) exactly as is_relevant_story_local reports them"""
+        column = self._columns[user_key]
+        score = float(self.scores[story_index, column])
+        best_column = int(self.best_columns[story_index, column])
+        best_match = self.keywords[best_column] if best_column >= 0 else ""
+        best_category = self.categories[best_column] if best_column >= 0 else ""
+        reasoning = f"Best match: '{best_match}' ({best_category}) - similarity: {score:.3f}"
+        return bool(self.relevant[story_index, column]), score, reasoning
+    
+    def needs_ai_refinement(self) -> np.ndarray:
+        low, high = AI_REFINEMENT_BAND
+        return (self.scores >= low) & (self.scores <= high)
+
+class RelevanceEngine:
+    def __init__(self, threshold: float = RELEVANCE_THRESHOLD, precision: str = DEFAULT_EMBEDDING_PRECISION):
+        self.threshold = threshold
+        self.precision = precision
+        self.keyword_matrix_bytes = 0  # Size of the stacked keyword matrix in the last score() call
+    
+    def _keyword_block(self, embeddings: np.ndarray):
+        """A user's normalised keyword rows in the engine's precision"""
+        block = _normalise_rows(embeddings)
+        if self.precision == "int8":
+            return QuantisedMatrix.from_vectors(block)
+        if self.precision == "float16":
+            return block.astype(np.float16)
+        return block
+    
+    def _similarities(self, story_embeddings: np.ndarray, blocks: List) -> np.ndarray:
+        """Cosine similarity of every story with every stacked keyword"""
+        S = _normalise_rows(story_embeddings)
+        if self.precision == "int8":
+            K = QuantisedMatrix.stack(blocks)
+            self.keyword_matrix_bytes = K.nbytes
+            return cosine_scores_int8(QuantisedMatrix.from_vectors(S), K)
+        K = np.vstack(blocks)
+        self.keyword_matrix_bytes = K.nbytes
+        if self.precision == "float16":
+            return cosine_scores_float16(S.astype(np.float16), K)
+        # One BLAS call for every (story, keyword) cosine similarity
+        return S @ K.T
+    
+    def score(self, story_embeddings: np.ndarray, users: List[Tuple[str, Dict]]) -> RelevanceTable:
+        """
+        Score stories against users
+        users: (user_key, {category: {'embeddings', 'keywords', 'weight'}}) as built by the AI pipeline
+        """
+        # Stack every user's keywords into K, remembering which user, category and keyword each column is
+        blocks, weights, keywords, categories, segment_starts, user_keys = [], [], [], [], [], []
+        empty_users = []
+        column = 0
+        for user_key, interest_embeddings in users:
+            user_blocks = [(category, data) for category, data in interest_embeddings.items() if len(data['keywords'])]
+            if not user_blocks:
+                empty_users.append(user_key)
+                continue
+            user_keys.append(user_key)
+            segment_starts.append(column)
+            for category, data in user_blocks:
+                blocks.append(self._keyword_block(np.asarray(data['embeddings']).reshape(len(data['keywords']), -1)))
+                weights.extend([data['weight']] * len(data['keywords']))
+                keywords.extend(data['keywords'])
+                categories.extend([category] * len(data['keywords']))
+                column += len(data['keywords'])
+        
+        num_stories = len(story_embeddings)
+        if not user_keys or not num_stories:
+            shape = (num_stories, len(user_keys) + len(empty_users))
+            return RelevanceTable(user_keys + empty_users, np.zeros(shape, dtype=np.float32),
+                                  np.full(shape, -1), keywords, categories, self.threshold)
+        
+        # Every (story, keyword) cosine similarity at once, weighted per keyword
+        similarities = self._similarities(story_embeddings, blocks) * np.asarray(weights, dtype=np.float32)
+        
+        # Segmented max per user, then the first column reaching it for the best keyword
+        starts = np.asarray(segment_starts)
+        best = np.maximum.reduceat(similarities, starts, axis=1)
+        column_user = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, similarities.shape[1])))
+        column_index = np.broadcast_to(np.arange(similarities.shape[1]), similarities.shape)
+        candidates = np.where(similarities >= best[:, column_user], column_index, similarities.shape[1])
+        best_columns = np.minimum.reduceat(candidates, starts, axis=1)
+        
+        # Scores never go below 0 and then name no keyword, matching the loop that started from 0.0
+        scores = np.maximum(best, 0.0)
+        best_columns = np.where(best > 0, best_columns, -1)
+        
+        if empty_users:
+            scores = np.hstack([scores, np.zeros((num_stories, len(empty_users)), dtype=scores.dtype)])
+            best_columns = np.hstack([best_columns, np.full((num_stories, len(empty_users)), -1)])
+        return RelevanceTable(user_keys + empty_users, scores, best_columns, keywords, categories, self.threshold)
+
+def benchmark_relevance_engine(num_users: int = 2000, num_stories: int = 30, keywords_per_user: int = 18,
+                               dim: int = 384, loop_users: Optional[int] = 200):
+    """Time the matrix engine against the per-user, per-story, per-category cosine_similarity loop"""
+    from sklearn.metrics.pairwise import cosine_similarity
+    
+    rng = np.random.default_rng(0)
+    stories = rng.standard_normal((num_stories, dim)).astype(np.float32)
+    users = []
+    for user in range(num_users):
+        embeddings = rng.standard_normal((keywords_per_user, dim)).astype(np.float32)
+        half = keywords_per_user // 2
+        users.append((f"user{user}", {
+            "high_priority": {"embeddings": embeddings[:half], "keywords": [f"k{i}" for i in range(half)], "weight": 1.0},
+            "medium_priority": {"embeddings": embeddings[half:], "keywords": [f"k{i}" for i in range(half, keywords_per_user)],
+                                "weight": 1.0}
+        }))
+    
+    start = time.perf_counter()
+    table = RelevanceEngine().score(stories, users)
+    engine_seconds = time.perf_counter() - start
+    
+    loop_users = min(loop_users or num_users, num_users)
+    start = time.perf_counter()
+    for user_index, (_, interest_embeddings) in enumerate(users[:loop_users]):
+        for story_index in range(num_stories):
+            max_similarity = 0.0
+            for data in interest_embeddings.values():
+                max_similarity = max(max_similarity, float(np.max(cosine_similarity(stories[story_index:story_index + 1],
+                                                                                    data['embeddings'])[0])))
+            assert abs(max_similarity - table.scores[story_index, user_index]) < 1e-4
+    loop_seconds = (time.perf_counter() - start) * num_users / loop_users
+    
+    print(f"📊 {num_users} users × {num_stories} stories ({keywords_per_user} keywords each, dim {dim})")
+    print(f"   matrix engine: {engine_seconds * 1000:8.1f} ms")
+    print(f"   python loop:   {loop_seconds * 1000:8.1f} ms" + (" (extrapolated)" if loop_users < num_users else ""))
+    print(f"   speed-up:      {loop_seconds / engine_seconds:8.1f}x (scores identical)")
+
+if __name__ == "__main__":
+    benchmark_relevance_engine(num_users=int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
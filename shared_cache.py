@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Database-Backed Shared AI Cache
+Stores AI results (summaries, comment analyses, relevance refinements) in the app's SQL database via
+DatabaseManager, so the cron scraper, the dashboard and every replica share one warm cache.
+A small in-memory LRU (L1) in front keeps repeat lookups off the database
+"""
+
+import copy
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from summary_cache import CachePolicy
+
+class SharedAICache:
+    def __init__(self, db_manager, namespace: str, policy: Optional[CachePolicy] = None,
+                 l1_max_entries: int = 1000, l1_ttl_seconds: float = 300):
+        """
+        Dict-like cache over the ai_cache table for one namespace (same interface as SummaryCache)
+        L1 entries are trusted for l1_ttl_seconds, after which writes from other processes become visible
+        """
+        self.db = db_manager
+        self.namespace = namespace
+        self.policy = policy or CachePolicy(max_entries=0, max_bytes=0, ttl_days=0, compact_interval=0)
+        self.l1_max_entries = l1_max_entries
+        self.l1_ttl_seconds = l1_ttl_seconds
+        self._l1 = OrderedDict()  # key -> (loaded_at, entry)
+        self._lock = threading.Lock()
+        
+        # Metrics
+        self.l1_hits = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+        
+        self._last_compaction = time.time()
+        self.compact()
+    
+    def _is_expired(self, entry: Dict) -> bool:
+        if not self.policy.ttl_days or not entry.get('cached_at'):
+            return False
+        return datetime.fromisoformat(entry['cached_at']) < datetime.now() - timedelta(days=self.policy.ttl_days)
+    
+    def _l1_get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            cached = self._l1.get(key)
+            if not cached:
+                return None
+            loaded_at, entry = cached
+            if time.time() - loaded_at > self.l1_ttl_seconds:
+                del self._l1[key]
+                return None
+            self._l1.move_to_end(key)
+            return entry
+    
+    def _l1_put(self, key: str, entry: Dict):
+        with self._lock:
+            self._l1[key] = (time.time(), entry)
+            self._l1.move_to_end(key)
+            while len(self._l1) > self.l1_max_entries:
+                self._l1.popitem(last=False)
+    
+    def _read(self, key: str) -> Optional[Dict]:
+        entry = self._l1_get(key)
+        if entry is not None:
+            self.l1_hits += 1
+        else:
+            try:
+                entry = self.db.get_ai_cache_entry(self.namespace, key)
+            except Exception as e:
+                # A database hiccup costs an API call, it must not break the pipeline
+                self.errors += 1
+                print(f"⚠️ Shared AI cache read failed ({self.namespace}): {e}")
+                return None
+            if entry is None:
+                return None
+            self._l1_put(key, entry)
+        return None if self._is_expired(entry) else entry
+    
+    def get(self, key: str, default=None) -> Optional[Dict]:
+        entry = self._read(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        # Callers may modify the entry (and its nested results) before writing it back, keep the L1 copy intact
+        return copy.deepcopy(entry)
+    
+    def __getitem__(self, key: str) -> Dict:
+        entry = self.get(key)
+        if entry is None:
+            raise KeyError(key)
+        return entry
+    
+    def __setitem__(self, key: str, entry: Dict):
+        entry = copy.deepcopy(entry)
+        self._l1_put(key, entry)
+        try:
+            self.db.set_ai_cache_entry(self.namespace, key, entry)
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ Shared AI cache write failed ({self.namespace}): {e}")
+        self._maybe_compact()
+    
+    def _maybe_compact(self):
+        """Compact on writes, at most once per compact_interval (there is no background thread to do it)"""
+        if self.policy.compact_interval <= 0:
+            return
+        with self._lock:
+            if time.time() - self._last_compaction < self.policy.compact_interval:
+                return
+            self._last_compaction = time.time()
+        self.compact()
+    
+    def __contains__(self, key: str) -> bool:
+        return self._read(key) is not None
+    
+    def __delitem__(self, key: str):
+        with self._lock:
+            self._l1.pop(key, None)
+        if not self.db.delete_ai_cache_entry(self.namespace, key):
+            raise KeyError(key)
+    
+    def pop(self, key: str, *default):
+        entry = self._read(key)
+        if entry is None:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        del self[key]
+        return entry
+    
+    def __len__(self) -> int:
+        try:
+            return self.db.count_ai_cache_entries(self.namespace)
+        except Exception:
+            return len(self._l1)
+    
+    def compact(self):
+        """Drop entries past the TTL and beyond max_entries (oldest writes first) from the shared table"""
+        if not self.policy.ttl_days and not self.policy.max_entries:
+            return
+        older_than = None
+        if self.policy.ttl_days:
+            older_than = (datetime.now() - timedelta(days=self.policy.ttl_days)).isoformat()
+        try:
+            removed = self.db.prune_ai_cache(self.namespace, older_than=older_than,
+                                             max_entries=self.policy.max_entries)
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ Shared AI cache prune failed ({self.namespace}): {e}")
+            return
+        self.evictions += removed
+        if removed:
+            print(f"🧹 Shared AI cache ({self.namespace}): {removed} old entries removed")
+    
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "database",
+            "namespace": self.namespace,
+            "entries": len(self),
+            "l1_entries": len(self._l1),
+            "max_entries": self.policy.max_entries,
+            "ttl_days": self.policy.ttl_days,
+            "hits": self.hits,
+            "l1_hits": self.l1_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0,
+            "evictions": self.evictions,
+            "errors": self.errors
+        }
+    
+    def close(self):
+        with self._lock:
+            self._l1.clear()
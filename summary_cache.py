@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Indexed On-Disk Summary Cache
+Dict-like article summary cache on SQLite in WAL mode: O(1) keyed inserts and lookups,
+atomic per-entry writes and no full load at startup. Migrates the legacy pickle file automatically.
+Bounded by a CachePolicy: TTL expiry, entry/byte limits with LRU or LFU eviction and background compaction
+"""
+
+import os
+import json
+import time
+import pickle
+import sqlite3
+import weakref
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional
+
+@dataclass
+class CachePolicy:
+    """Size, age and eviction limits for an AI cache (0 disables a limit)"""
+    max_entries: int = 5000
+    max_bytes: int = 50 * 1024 * 1024
+    ttl_days: float = 30
+    eviction: str = "lru"  # 'lru' (least recently used) or 'lfu' (least frequently used)
+    compact_interval: int = 3600  # Seconds between background compactions
+    
+    @classmethod
+    def from_env(cls, prefix: str = "ARTICLE_CACHE") -> "CachePolicy":
+        defaults = cls()
+        return cls(
+            max_entries=int(os.getenv(f"{prefix}_MAX_ENTRIES", defaults.max_entries)),
+            max_bytes=int(float(os.getenv(f"{prefix}_MAX_MB", defaults.max_bytes / (1024 * 1024))) * 1024 * 1024),
+            ttl_days=float(os.getenv(f"{prefix}_TTL_DAYS", defaults.ttl_days)),
+            eviction=os.getenv(f"{prefix}_EVICTION", defaults.eviction).lower(),
+            compact_interval=int(os.getenv(f"{prefix}_COMPACT_INTERVAL", defaults.compact_interval))
+        )
+
+class _CompactionScheduler:
+    """
+    One background thread for every open SummaryCache in the process, compacting each database file at
+    most once per compact_interval. Caches are held weakly, so one that is never closed is still freed
+    (and its connection with it) instead of being kept alive by its own compaction thread
+    """
+    POLL_SECONDS = 60
+    
+    def __init__(self):
+        self._caches = weakref.WeakSet()
+        self._last_run = {}  # db_path -> when it was last compacted
+        self._lock = threading.Lock()
+        self._thread = None
+    
+    def register(self, cache: "SummaryCache"):
+        with self._lock:
+            self._caches.add(cache)
+            self._last_run.setdefault(cache.db_path, time.time())
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="summary-cache-compaction", daemon=True)
+                self._thread.start()
+    
+    def unregister(self, cache: "SummaryCache"):
+        with self._lock:
+            self._caches.discard(cache)
+    
+    def _due(self) -> List["SummaryCache"]:
+        now = time.time()
+        due = []
+        with self._lock:
+            for cache in list(self._caches):
+                if now - self._last_run.get(cache.db_path, 0) >= cache.policy.compact_interval:
+                    self._last_run[cache.db_path] = now
+                    due.append(cache)
+        return due
+    
+    def _loop(self):
+        while True:
+            with self._lock:
+                intervals = [cache.policy.compact_interval for cache in self._caches]
+            time.sleep(min([self.POLL_SECONDS] + intervals))
+            for cache in self._due():
+                try:
+                    cache.compact()
+                except Exception as e:
+                    print(f"⚠️ Summary cache compaction failed: {e}")
+            cache = None  # Do not keep the last cache alive while sleeping
+
+_compaction_scheduler = _CompactionScheduler()
+
+class SummaryCache:
+    def __init__(self, db_path: str, legacy_pickle: Optional[str] = None,
+                 key_func: Optional[Callable[[str], str]] = None, policy: Optional[CachePolicy] = None):
+        """
+        Open (or create) the cache database
+        If legacy_pickle exists it is imported once (re-keyed with key_func from each entry's 'url')
+        and renamed to <file>.migrated
+        """
+        self.db_path = db_path
+        self.policy = policy or CachePolicy(max_entries=0, max_bytes=0, ttl_days=0, compact_interval=0)
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        # WAL: readers never block the writer and a crash mid-write cannot corrupt committed entries
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS summaries (
+                cache_key TEXT PRIMARY KEY,
+                url TEXT,
+                entry TEXT NOT NULL,
+                cached_at TEXT
+            )
+        """)
+        # Bookkeeping for eviction, added in place to databases created before the policy existed
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(summaries)")}
+        for column, ddl in (("size_bytes", "INTEGER DEFAULT 0"), ("last_access", "REAL DEFAULT 0"),
+                            ("access_count", "INTEGER DEFAULT 0")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE summaries ADD COLUMN {column} {ddl}")
+        self._conn.execute("UPDATE summaries SET size_bytes = LENGTH(entry) WHERE size_bytes = 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_summaries_cached_at ON summaries(cached_at)")
+        self._conn.commit()
+        
+        if legacy_pickle and os.path.exists(legacy_pickle):
+            self._migrate_pickle(legacy_pickle, key_func)
+        
+        # Running totals so limits are checked without scanning the table on every write
+        self._entries, self._bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM summaries"
+        ).fetchone()
+        # Reads only record their access here; it reaches the database on the next eviction or compaction
+        self._pending_access = {}
+        
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.compactions = 0
+        
+        # Compacted by the process-wide scheduler thread, not a thread per cache
+        self._closed = False
+        if self.policy.compact_interval > 0:
+            _compaction_scheduler.register(self)
+    
+    def _migrate_pickle(self, pickle_path: str, key_func: Optional[Callable[[str], str]]):
+        try:
+            with open(pickle_path, 'rb') as f:
+                legacy = pickle.load(f)
+        except Exception as e:
+            print(f"⚠️ Could not migrate legacy article cache {pickle_path}: {e}")
+            return
+        
+        rows = {}
+        for key, entry in legacy.items():
+            if key_func and entry.get('url'):
+                key = key_func(entry['url'])
+            # Variants of one URL collapse into the most recently cached entry
+            if key not in rows or entry.get('cached_at', '') > rows[key].get('cached_at', ''):
+                rows[key] = entry
+        
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO summaries (cache_key, url, entry, cached_at, size_bytes, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(key, entry.get('url'), data, entry.get('cached_at'), len(data), now)
+                 for key, entry, data in ((key, entry, json.dumps(entry)) for key, entry in rows.items())]
+            )
+        os.replace(pickle_path, pickle_path + ".migrated")
+        print(f"✅ Migrated {len(rows)} cached summaries from {os.path.basename(pickle_path)} to {os.path.basename(self.db_path)}")
+    
+    def _is_expired(self, entry: Dict) -> bool:
+        if not self.policy.ttl_days or not entry.get('cached_at'):
+            return False
+        return datetime.fromisoformat(entry['cached_at']) < datetime.now() - timedelta(days=self.policy.ttl_days)
+    
+    def _read(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT entry FROM summaries WHERE cache_key = ?", (key,)).fetchone()
+        if not row:
+            return None
+        entry = json.loads(row[0])
+        # Past its TTL the entry is as good as gone; compaction deletes it
+        return None if self._is_expired(entry) else entry
+    
+    def get(self, key: str, default=None) -> Optional[Dict]:
+        entry = self._read(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        with self._lock:
+            _, count = self._pending_access.get(key, (0, 0))
+            self._pending_access[key] = (time.time(), count + 1)
+        return entry
+    
+    def __getitem__(self, key: str) -> Dict:
+        entry = self.get(key)
+        if entry is None:
+            raise KeyError(key)
+        return entry
+    
+    def __setitem__(self, key: str, entry: Dict):
+        data = json.dumps(entry)
+        # Single-row transaction: the entry is either fully written or not at all
+        with self._lock, self._conn:
+            previous = self._conn.execute("SELECT size_bytes FROM summaries WHERE cache_key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries (cache_key, url, entry, cached_at, size_bytes, last_access, access_count) "
+                "VALUES (?, ?, ?, ?, ?, ?, COALESCE((SELECT access_count FROM summaries WHERE cache_key = ?), 0))",
+                (key, entry.get('url'), data, entry.get('cached_at'), len(data), time.time(), key)
+            )
+            if previous:
+                self._bytes += len(data) - previous[0]
+            else:
+                self._entries += 1
+                self._bytes += len(data)
+            over_limit = ((self.policy.max_entries and self._entries > self.policy.max_entries) or
+                          (self.policy.max_bytes and self._bytes > self.policy.max_bytes))
+        if over_limit:
+            self.evict()
+    
+    def __contains__(self, key: str) -> bool:
+        return self._read(key) is not None
+    
+    def __delitem__(self, key: str):
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT size_bytes FROM summaries WHERE cache_key = ?", (key,)).fetchone()
+            if not row:
+                raise KeyError(key)
+            self._conn.execute("DELETE FROM summaries WHERE cache_key = ?", (key,))
+            self._pending_access.pop(key, None)
+            self._entries -= 1
+            self._bytes -= row[0]
+    
+    def pop(self, key: str, *default):
+        entry = self._read(key)
+        if entry is None:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        del self[key]
+        return entry
+    
+    def __len__(self) -> int:
+        return self._entries
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+    
+    def keys(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT cache_key FROM summaries")]
+    
+    def items(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT cache_key, entry FROM summaries").fetchall()
+        return [(key, json.loads(entry)) for key, entry in rows]
+    
+    def values(self):
+        return [entry for _, entry in self.items()]
+    
+    def _flush_access(self):
+        """Write buffered read timestamps and counts (caller holds the lock)"""
+        if self._pending_access:
+            self._conn.executemany(
+                "UPDATE summaries SET last_access = ?, access_count = access_count + ? WHERE cache_key = ?",
+                [(accessed, count, key) for key, (accessed, count) in self._pending_access.items()]
+            )
+            self._pending_access.clear()
+    
+    def evict(self) -> int:
+        """Remove expired entries, then least recently (LRU) or least frequently (LFU) used ones until within limits"""
+        removed = 0
+        with self._lock, self._conn:
+            self._flush_access()
+            if self.policy.ttl_days:
+                cutoff = (datetime.now() - timedelta(days=self.policy.ttl_days)).isoformat()
+                expired = self._conn.execute("DELETE FROM summaries WHERE cached_at < ?", (cutoff,)).rowcount
+                self.expired += expired
+                removed += expired
+            
+            self._entries, self._bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM summaries"
+            ).fetchone()
+            excess_entries = max(0, self._entries - self.policy.max_entries) if self.policy.max_entries else 0
+            excess_bytes = max(0, self._bytes - self.policy.max_bytes) if self.policy.max_bytes else 0
+            if excess_entries or excess_bytes:
+                order = "access_count, last_access" if self.policy.eviction == "lfu" else "last_access"
+                victims = []
+                for key, size in self._conn.execute(f"SELECT cache_key, size_bytes FROM summaries ORDER BY {order}"):
+                    if excess_entries <= 0 and excess_bytes <= 0:
+                        break
+                    victims.append((key,))
+                    excess_entries -= 1
+                    excess_bytes -= size
+                    self._entries -= 1
+                    self._bytes -= size
+                self._conn.executemany("DELETE FROM summaries WHERE cache_key = ?", victims)
+                self.evictions += len(victims)
+                removed += len(victims)
+        return removed
+    
+    def compact(self):
+        """Evict, then checkpoint the WAL and reclaim free pages so the file shrinks on disk"""
+        if self._closed:
+            return
+        removed = self.evict()
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            free_pages, total_pages = (self._conn.execute("PRAGMA freelist_count").fetchone()[0],
+                                       self._conn.execute("PRAGMA page_count").fetchone()[0])
+            if total_pages and free_pages / total_pages > 0.25:
+                self._conn.execute("VACUUM")
+        self.compactions += 1
+        if removed:
+            print(f"🧹 Summary cache compacted: {removed} entries removed ({self._entries} kept)")
+    
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "local",
+            "entries": self._entries,
+            "bytes": self._bytes,
+            "max_entries": self.policy.max_entries,
+            "max_bytes": self.policy.max_bytes,
+            "ttl_days": self.policy.ttl_days,
+            "eviction": self.policy.eviction,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "compactions": self.compactions
+        }
+    
+    def close(self):
+        _compaction_scheduler.unregister(self)
+        with self._lock:
+            self._closed = True
+            self._flush_access()
+            self._conn.commit()
+            self._conn.close()
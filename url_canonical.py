@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Canonical URL Normalisation for Cache Keys
+Collapses tracking parameters, scheme/host/trailing-slash variants and known aliases
+(rel=canonical targets, redirects) onto one canonical URL per article
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+import pickle
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Set
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, urljoin
+
+# Query parameters that only track where a click came from
+# ('ref' and 'source' are left alone: GitHub and others use them for real content)
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid", "yclid", "_ga",
+                   "ref_src", "ref_url", "si", "s_cid", "cmpid", "_hsenc", "_hsmi", "mkt_tok", "trk", "spm"}
+TRACKING_PREFIXES = ("utm_", "pk_", "hmb_", "oly_", "vero_", "__s")
+
+# Aliases may cross hosts only from or to these (link shorteners by default, more via URL_ALIAS_HOSTS)
+KNOWN_ALIAS_HOSTS = {"t.co", "bit.ly", "buff.ly", "dlvr.it", "goo.gl", "lnkd.in", "ow.ly", "tinyurl.com"}
+KNOWN_ALIAS_HOSTS.update(host.strip().lower() for host in os.getenv('URL_ALIAS_HOSTS', '').split(",") if host.strip())
+# Redirects to sign-in or consent walls say nothing about where the article lives
+LOGIN_PATH_PATTERN = re.compile(r"/(login|log-in|signin|sign-in|auth|consent|account|subscribe|paywall)\b", re.I)
+
+LINK_TAG_PATTERN = re.compile(r"<link\b[^>]*>", re.I)
+REL_CANONICAL_PATTERN = re.compile(r"""\brel\s*=\s*["']?canonical\b""", re.I)
+HREF_PATTERN = re.compile(r"""\bhref\s*=\s*["']([^"']+)["']""", re.I)
+
+DEFAULT_ALIAS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".ai_cache", "url_aliases.json")
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonical form of a URL for cache keys: https, lower-case host without www. or default port,
+    no fragment, no tracking parameters, sorted query, no duplicate or trailing slashes
+    """
+    raw_url = (url or "").strip()
+    try:
+        parts = urlsplit(raw_url)
+        port = parts.port
+    except ValueError:
+        return raw_url  # Malformed host or out-of-range port, keyed as given
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https"):
+        return raw_url
+    
+    host = (parts.hostname or "").lower().rstrip(".")
+    if host.startswith("www."):
+        host = host[4:]
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+    
+    path = re.sub(r"/{2,}", "/", parts.path) or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+def extract_rel_canonical(html: str, base_url: str) -> Optional[str]:
+    """The page's <link rel="canonical"> target (resolved against base_url), if it declares one"""
+    # The canonical link lives in <head>, no need to scan the whole document
+    head = (html or "")[:200000]
+    end_of_head = head.lower().find("</head>")
+    if end_of_head != -1:
+        head = head[:end_of_head]
+    for link_tag in LINK_TAG_PATTERN.findall(head):
+        if REL_CANONICAL_PATTERN.search(link_tag):
+            href = HREF_PATTERN.search(link_tag)
+            if href:
+                return urljoin(base_url, href.group(1).strip())
+    return None
+
+class UrlAliasMap:
+    def __init__(self, alias_file: str = DEFAULT_ALIAS_FILE,
+                 known_hosts: Optional[Set[str]] = None):
+        """Persisted alias -> canonical map (both sides stored in canonicalize_url form)"""
+        self.alias_file = alias_file
+        self.known_hosts = KNOWN_ALIAS_HOSTS if known_hosts is None else known_hosts
+        self._lock = threading.Lock()
+        self.aliases = self._load()
+    
+    def _load(self) -> Dict[str, str]:
+        if os.path.exists(self.alias_file):
+            try:
+                with open(self.alias_file, "r", encoding="utf-8") as f:
+                    aliases = json.load(f)
+                # Drop aliases recorded before targets were checked (e.g. every post -> the site root)
+                return {alias: target for alias, target in aliases.items() if self.is_valid_alias(alias, target)}
+            except Exception as e:
+                print(f"⚠️ Error loading URL alias map: {e}")
+        return {}
+    
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.alias_file)), exist_ok=True)
+            tmp_file = self.alias_file + ".tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(self.aliases, f, indent=2, sort_keys=True)
+            os.replace(tmp_file, self.alias_file)
+        except Exception as e:
+            print(f"⚠️ Error saving URL alias map: {e}")
+    
+    def resolve(self, url: str) -> str:
+        """Canonical URL for a link, following recorded aliases"""
+        canonical = canonicalize_url(url)
+        seen = {canonical}
+        while canonical in self.aliases:
+            canonical = self.aliases[canonical]
+            if canonical in seen:
+                break
+            seen.add(canonical)
+        return canonical
+    
+    def is_valid_alias(self, alias: str, target: str) -> bool:
+        """
+        Whether target can stand for alias: an https article path (not the site root or a sign-in/consent
+        page) on the same host, unless one of the two hosts is known to alias across hosts
+        """
+        if not target.startswith("https://"):
+            return False
+        target_parts = urlsplit(target)
+        if target_parts.path in ("", "/") or LOGIN_PATH_PATTERN.search(target_parts.path):
+            return False
+        alias_host = urlsplit(alias).netloc
+        return alias_host == target_parts.netloc or bool({alias_host, target_parts.netloc} & self.known_hosts)
+    
+    def record(self, alias_url: str, target_url: str) -> bool:
+        """Remember that alias_url is the same article as target_url; returns True if the map changed"""
+        alias = canonicalize_url(alias_url)
+        target = self.resolve(target_url)
+        if alias == target or not self.is_valid_alias(alias, target) or self.resolve(alias) == target:
+            return False
+        with self._lock:
+            self.aliases[alias] = target
+            self._save()
+        return True
+
+def load_historical_urls(scrape_glob: Optional[str] = None, summary_cache: Optional[str] = None) -> List[str]:
+    """Article URLs in the order they were seen: the summary cache by cached_at, then saved scrapes by date"""
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    summary_cache = summary_cache or os.path.join(base_dir, ".ai_cache", "article_summaries.db")
+    scrape_glob = scrape_glob or os.path.join(base_dir, "outputs", "scrapes", "*.json")
+    
+    urls = []
+    legacy_pickle = os.path.join(os.path.dirname(summary_cache), "article_summaries.pkl")
+    if os.path.exists(summary_cache):
+        with sqlite3.connect(summary_cache) as conn:
+            urls.extend(row[0] for row in conn.execute(
+                "SELECT url FROM summaries WHERE url IS NOT NULL ORDER BY cached_at"))
+    elif os.path.exists(legacy_pickle):
+        # Summary cache not yet migrated to SQLite
+        with open(legacy_pickle, "rb") as f:
+            entries = sorted(pickle.load(f).values(), key=lambda entry: entry.get("cached_at", ""))
+        urls.extend(entry["url"] for entry in entries if entry.get("url"))
+    
+    for scrape_file in sorted(glob.glob(scrape_glob)):
+        try:
+            with open(scrape_file, "r", encoding="utf-8") as f:
+                stories = json.load(f).get("stories", [])
+        except Exception as e:
+            print(f"⚠️ Skipping unreadable scrape {os.path.basename(scrape_file)}: {e}")
+            continue
+        urls.extend(story["url"] for story in stories
+                    if story.get("url") and not story["url"].startswith("https://news.ycombinator.com"))
+    return urls
+
+def measure_cache_hit_rate(urls: List[str]) -> Dict:
+    """Replay URLs through a summary cache keyed by the raw URL and by the canonical URL"""
+    raw_seen, canonical_seen = set(), set()
+    raw_hits = canonical_hits = 0
+    for url in urls:
+        canonical = canonicalize_url(url)
+        raw_hits += url in raw_seen
+        canonical_hits += canonical in canonical_seen
+        raw_seen.add(url)
+        canonical_seen.add(canonical)
+    
+    total = len(urls) or 1
+    return {
+        "lookups": len(urls),
+        "raw_keys": len(raw_seen),
+        "canonical_keys": len(canonical_seen),
+        "raw_hit_rate": round(raw_hits / total * 100, 1),
+        "canonical_hit_rate": round(canonical_hits / total * 100, 1),
+        "extra_hits": canonical_hits - raw_hits
+    }
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "measure":
+        history = load_historical_urls()
+        print(f"📊 Summary cache hit rate over {len(history)} historical article lookups: "
+              f"{measure_cache_hit_rate(history)}")
+    else:
+        for raw_url in sys.argv[1:]:
+            print(f"{raw_url} -> {canonicalize_url(raw_url)}")